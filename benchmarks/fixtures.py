@@ -0,0 +1,200 @@
+"""
+API responses of the benchmarks, scaled up to any number of orders, levels, currencies or trades. The make_*
+functions return new copies, as the clients convert satoshi columns in place.
+"""
+import copy
+
+BALANCE_RESPONSE = {
+    u'Status': 200,
+    u'Description': u'OK',
+    u'Responses': [{
+        u'MsgType': u'U3',
+        u'4': {u'BRL': 100000000, u'BRL_locked': 200000000, u'BTC': 300000000, u'BTC_locked': 400000000},
+        u'ClientID': 90856083,
+        u'BalanceReqID': 1467403164
+    }]
+}
+
+EXECUTION_REPORT = {
+    u'OrderID': 1459144180001,
+    u'ExecID': 202294,
+    u'ExecType': u'0',
+    u'OrdStatus': u'0',
+    u'CumQty': 0,
+    u'Symbol': u'BTCBRL',
+    u'OrderQty': 3130000,
+    u'LastShares': 0,
+    u'LastPx': 0,
+    u'CxlQty': 0,
+    u'TimeInForce': u'1',
+    u'LeavesQty': 3130000,
+    u'MsgType': u'8',
+    u'ExecSide': u'1',
+    u'OrdType': u'2',
+    u'Price': 217500000000,
+    u'Side': u'1',
+    u'ClOrdID': 1467403664,
+    u'AvgPx': 0
+}
+
+ORDER_STATUS_COLUMNS = [
+    u'ClOrdID',
+    u'OrderID',
+    u'CumQty',
+    u'OrdStatus',
+    u'LeavesQty',
+    u'CxlQty',
+    u'AvgPx',
+    u'Symbol',
+    u'Side',
+    u'OrdType',
+    u'OrderQty',
+    u'Price',
+    u'OrderDate',
+    u'Volume',
+    u'TimeInForce'
+]
+
+ORDER_STATUS_ROW = [
+    u'2961106',
+    1459144231834,
+    0,
+    u'0',
+    3130000,
+    0,
+    0,
+    u'BTCBRL',
+    u'1',
+    u'2',
+    3130000,
+    217500000000,
+    u'2016-07-06 13:44:53',
+    0,
+    u'1'
+]
+
+TICKER = {
+    'vol': 100.0,
+    'pair': 'BTCBRL',
+    'low': 2000.00,
+    'vol_brl': 25000.00000005,
+    'sell': 2200.00,
+    'high': 2500.00,
+    'buy': 2100.0,
+    'last': 2150.0,
+}
+
+ORDER_BOOK = {
+    'bids': [[2100.0, 1.50000005, 1], [2096.07, 12.0, 90824262], [2096.06, 4.8612554, 90803493]],
+    'pair': 'BTCBRL',
+    'asks': [[2200.0, 2.50000005, 2], [2125.9, 0.708, 90824262], [2125.91, 4.55290567, 90800515]]
+}
+
+TRADES = [
+    {'tid': 1, 'date': 1467037014, 'price': 2300.0, 'amount': 1.0, 'side': 'sell'},
+    {'tid': 2, 'date': 1467037288, 'price': 2302.5, 'amount': 1.0, 'side': 'buy'},
+]
+
+
+def make_balance_response(currencies=None):
+    """
+    :param currencies: number of currencies of the broker, the four of the original response when None
+    :type currencies: int
+    :rtype: dict
+    """
+    response = copy.deepcopy(BALANCE_RESPONSE)
+    if currencies is not None:
+        response[u'Responses'][0][u'4'] = {
+            u'C{:03d}{}'.format(index // 2, u'_locked' if index % 2 else u''): (index + 1) * 100000000
+            for index in range(currencies)
+        }
+    return response
+
+
+def make_order_response(orders=1, side=u'1', balance=None):
+    """
+    Response of a place or cancel order message, with one execution report per order and a balance update.
+
+    :type orders: int
+    :param side: consts.OrderSide of the orders
+    :type side: basestring
+    :param balance: balance update of the broker, the locked BRL of a buy order when None
+    :type balance: dict
+    :rtype: dict
+    """
+    reports = []
+    for index in range(orders):
+        report = dict(EXECUTION_REPORT, Side=side)
+        report[u'OrderID'] += index
+        report[u'ClOrdID'] += index
+        reports.append(report)
+    balance = {u'BRL_locked': 5500000000} if balance is None else balance
+    return {
+        u'Status': 200,
+        u'Description': u'OK',
+        u'Responses': reports + [{u'MsgType': u'U3', u'4': dict(balance), u'ClientID': 90856083}],
+    }
+
+
+def make_order_status_response(orders=1):
+    """
+    Response of a get orders message with one U5 row per order.
+
+    :type orders: int
+    :rtype: dict
+    """
+    rows = []
+    for index in range(orders):
+        row = list(ORDER_STATUS_ROW)
+        row[0] = str(int(row[0]) + index)
+        row[1] += index
+        rows.append(row)
+    return {
+        u'Status': 200,
+        u'Description': u'OK',
+        u'Responses': [{
+            u'OrdListGrp': rows,
+            u'PageSize': 20,
+            u'OrdersReqID': 1467837196,
+            u'MsgType': u'U5',
+            u'Page': 0,
+            u'Columns': list(ORDER_STATUS_COLUMNS),
+        }]
+    }
+
+
+def make_ticker():
+    return dict(TICKER)
+
+
+def make_order_book(levels=3):
+    """
+    :param levels: levels of each side. The first three are the ones of the original response.
+    :type levels: int
+    :rtype: dict
+    """
+    order_book = copy.deepcopy(ORDER_BOOK)
+    for index in range(3, levels):
+        order_book['bids'].append([round(2096.06 - index * 0.01, 2), 1.0 + index % 7, 90800000 + index])
+        order_book['asks'].append([round(2125.91 + index * 0.01, 2), 1.0 + index % 5, 90900000 + index])
+    del order_book['bids'][levels:]
+    del order_book['asks'][levels:]
+    return order_book
+
+
+def make_trades(count=2):
+    """
+    :param count: number of trades. The first two are the ones of the original response.
+    :type count: int
+    :rtype: list[dict]
+    """
+    trades = copy.deepcopy(TRADES)
+    for index in range(2, count):
+        trades.append({
+            'tid': index + 1,
+            'date': 1467037288 + index,
+            'price': round(2302.5 + (index % 11 - 5) * 0.5, 2),
+            'amount': 0.1 * (index % 9 + 1),
+            'side': 'buy' if index % 2 else 'sell',
+        })
+    return trades[:count]
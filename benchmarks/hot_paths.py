@@ -0,0 +1,211 @@
+"""
+Timings and allocations of the CPU bound hot paths of the clients, compared against a stored baseline.
+
+Run it from the repository root with: python -m benchmarks.hot_paths
+Store the current results as the new baseline with: python -m benchmarks.hot_paths --save-baseline
+
+The responses are API responses scaled up to large order lists, balances and books. The exit status is 1 when a
+benchmark is slower, or allocates more memory at its peak, than the baseline by more than the tolerances, so it can
+gate a release. Peak memory depends on the Python version and on NumPy, so the baseline file keeps one baseline per
+environment and results are only compared with the one of the current environment. Timings also depend on the
+machine, so compare against a baseline saved on the same machine.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks import fixtures
+from blinktrade import clients, consts
+from blinktrade.nonces import MonotonicNonceProvider
+from blinktrade.orderbook import LocalOrderBook, OrderBook
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_TOLERANCE = 1.5
+DEFAULT_MEMORY_TOLERANCE = 1.1
+
+
+def make_client():
+    return clients.AuthClient(
+        consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+        nonce_provider=MonotonicNonceProvider(),
+    )
+
+
+def get_benchmarks(client):
+    """
+    :return: name -> (function, function making its arguments, calls per repetition)
+    :rtype: dict
+    """
+    nonce = client._get_nonce()
+    order_status_item = fixtures.make_order_status_response(5000)['Responses'][0]
+    broker = fixtures.make_balance_response(currencies=64)['Responses'][0]['4']
+    order_book = fixtures.make_order_book(5000)
+    local_order_book = LocalOrderBook(pair='BTCBRL')
+    local_order_book.update(fixtures.make_order_book(5000))
+    return {
+        'get_nonce': (client._get_nonce, tuple, 10000),
+        'get_signature': (client._get_signature, lambda: (nonce,), 10000),
+        'parse_order_response (1000 orders)': (
+            client._parse_order_response, lambda: (fixtures.make_order_response(1000),), 5,
+        ),
+        'make_placed_order_from_order_status_response (5000 orders)': (
+            lambda item: list(client._make_placed_order_from_order_status_response(item)),
+            lambda: (dict(order_status_item),), 5,
+        ),
+        'make_order_table (5000 orders)': (
+            client._make_order_table, lambda: (fixtures.make_order_status_response(5000),), 5,
+        ),
+        'make_balance_from_broker_dict (64 currencies)': (
+            client._make_balance_from_broker_dict, lambda: (broker,), 2000,
+        ),
+        'order_book_from_response (5000 levels)': (
+            lambda response: OrderBook.from_response(response).vwap('asks', 100.0), lambda: (order_book,), 20,
+        ),
+        'local_order_book_update (5000 levels)': (
+            local_order_book.update, lambda: (fixtures.make_order_book(5000),), 5,
+        ),
+    }
+
+
+def measure(func, make_args, number, repeat=5):
+    """
+    Best time of a call over repeat repetitions of number calls, with the arguments made before the timer starts
+    and the garbage collector disabled as timeit does, and the memory allocated by one call.
+
+    :rtype: dict
+    """
+    best = None
+    for _ in range(repeat):
+        arguments = [make_args() for _ in range(number)]
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            for args in arguments:
+                func(*args)
+            elapsed = (time.perf_counter() - started) / number
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    args = make_args()
+    tracemalloc.start()
+    try:
+        func(*args)
+        allocated, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': best, 'allocated_bytes': allocated, 'peak_bytes': peak}
+
+
+def run(names=None, repeat=5, scale=1.0):
+    """
+    :param names: benchmarks to run, all of them when None
+    :type names: list[basestring]
+    :param scale: multiplies the number of calls of each repetition, lower it for a quick smoke run
+    :type scale: float
+    :rtype: dict
+    """
+    results = {}
+    for name, (func, make_args, number) in sorted(get_benchmarks(make_client()).items()):
+        if names is None or name in names:
+            results[name] = measure(func, make_args, max(int(number * scale), 1), repeat)
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, memory_tolerance=DEFAULT_MEMORY_TOLERANCE):
+    """
+    :return: (name, metric, ratio to the baseline) of each benchmark beyond the tolerance of a metric
+    :rtype: list[tuple]
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        for metric, metric_tolerance in (('seconds', tolerance), ('peak_bytes', memory_tolerance)):
+            ratio = float(result[metric]) / max(baseline[name][metric], 1)
+            if ratio > metric_tolerance:
+                regressions.append((name, metric, ratio))
+    return regressions
+
+
+def get_environment():
+    """
+    Key of the baseline of the running interpreter.
+
+    :rtype: basestring
+    """
+    return '{} {} {} {}'.format(
+        platform.python_implementation(), '.'.join(platform.python_version_tuple()[:2]), platform.machine(),
+        'numpy {}'.format(numpy.__version__) if numpy is not None else 'no numpy',
+    )
+
+
+def _load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def load_baseline(path=BASELINE_PATH, environment=None):
+    """
+    :return: baseline of the environment, empty when none was saved for it
+    :rtype: dict
+    """
+    return _load_baselines(path).get(environment or get_environment(), {})
+
+
+def save_baseline(results, path=BASELINE_PATH, environment=None):
+    baselines = _load_baselines(path)
+    baselines[environment or get_environment()] = results
+    with open(path, 'w') as baseline_file:
+        json.dump(baselines, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write('\n')
+
+
+def report(results, baseline):
+    print('{:<60} {:>12} {:>10} {:>12}'.format('benchmark', 'time', 'baseline', 'peak memory'))
+    for name, result in sorted(results.items()):
+        ratio = '{:.2f}x'.format(result['seconds'] / baseline[name]['seconds']) if name in baseline else '-'
+        print('{:<60} {:>9.1f} us {:>10} {:>9.1f} KB'.format(
+            name, result['seconds'] * 1e6, ratio, result['peak_bytes'] / 1024.0,
+        ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline JSON file')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='allowed slowdown ratio')
+    parser.add_argument('--memory-tolerance', type=float, default=DEFAULT_MEMORY_TOLERANCE,
+                        help='allowed peak memory growth ratio')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('names', nargs='*', help='benchmarks to run, all of them by default')
+    options = parser.parse_args(argv)
+
+    results = run(options.names or None, options.repeat)
+    baseline = load_baseline(options.baseline)
+    if not baseline and not options.save_baseline:
+        print('No baseline for {}, save one with --save-baseline'.format(get_environment()))
+    report(results, baseline)
+    if options.save_baseline:
+        save_baseline(results, options.baseline)
+        return 0
+    regressions = compare(results, baseline, options.tolerance, options.memory_tolerance)
+    for name, metric, ratio in regressions:
+        print('REGRESSION: {} {} is {:.2f}x the baseline'.format(name, metric, ratio))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
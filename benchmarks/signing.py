@@ -0,0 +1,67 @@
+"""
+Per-request CPU cost of AuthClient._send_request, before the network: nonce, signature, headers, URL and body.
+
+Run it from the repository root with: python -m benchmarks.signing
+"""
+import hashlib
+import hmac
+import json
+import timeit
+
+from blinktrade import clients, consts
+from blinktrade.nonces import MonotonicNonceProvider
+
+
+class NullTransport(object):
+    content = b'{}'
+
+    def post(self, url, **kwargs):
+        return self
+
+    @staticmethod
+    def json():
+        return {}
+
+
+def make_client():
+    return clients.AuthClient(
+        consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+        transport=NullTransport(), nonce_provider=MonotonicNonceProvider(),
+    )
+
+
+def send_request_without_fast_path(client, msg):
+    """
+    _send_request as it was before the precomputed HMAC state, header template, URL and body template.
+    """
+    nonce = client._get_nonce()
+    signature = hmac.new(
+        bytearray(client.secret, 'utf-8'), bytearray(nonce, 'utf-8'), digestmod=hashlib.sha256
+    ).hexdigest()
+    headers = {
+        'user-agent': 'blinktrade_tools/0.1',
+        'Content-Type': 'application/json',
+        'APIKey': client.key,
+        'Nonce': nonce,
+        'Signature': signature
+    }
+    url = '{domain}/tapi/{version}/message'.format(domain=client.environment_server, version=client.API_VERSION)
+    body = json.dumps(msg).encode('utf-8')
+    return client.transport.post(url, data=body, verify=True, headers=headers).json()
+
+
+def run(number=100000):
+    client = make_client()
+    msg = client._make_place_order_msg(consts.OrderSide.BUY, consts.OrderType.LIMITED_ORDER, 2175, 0.0313)
+    results = {
+        'without fast path': timeit.timeit(lambda: send_request_without_fast_path(client, msg), number=number),
+        'with fast path': timeit.timeit(lambda: client._send_request(msg), number=number),
+        'nonce only': timeit.timeit(client._get_nonce, number=number),
+    }
+    for name, seconds in results.items():
+        print('{:<20} {:8.2f} us/request'.format(name, seconds / number * 1e6))
+    return results
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,36 @@
+import asyncio
+import logging
+
+from blinktrade.cache import MarketDataCache
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMarketDataCache(MarketDataCache):
+    """
+    MarketDataCache for AsyncOpenClient, whose fetch functions return awaitables. Refreshes run as tasks of the
+    current loop.
+    """
+    async def get(self, key, requested_info, fetch):
+        """
+        :type key: tuple
+        :type requested_info: basestring
+        :param fetch: callable returning an awaitable
+        :type fetch: callable
+        """
+        entry, must_refresh = self._lookup(key)
+        if entry is None:
+            value = await fetch()
+            self._store(key, requested_info, value)
+            return value
+        if must_refresh:
+            asyncio.ensure_future(self._refresh(key, requested_info, fetch))
+        return entry.value
+
+    async def _refresh(self, key, requested_info, fetch):
+        try:
+            self._store(key, requested_info, await fetch())
+        except Exception:
+            logger.exception('Unable to refresh market data for %s', key)
+        finally:
+            self._finish_refresh(key)
@@ -0,0 +1,200 @@
+import collections
+from functools import partial
+
+from blinktrade import consts
+from blinktrade.async_pagination import AsyncPageIterator
+from blinktrade.async_transports import AsyncHttpTransport
+from blinktrade.clients import AuthClient, OpenClient
+from blinktrade.decoders import JsonArrayStreamParser
+from blinktrade.records import Trade
+
+
+class AsyncOpenClient(OpenClient):
+    """
+    asyncio version of OpenClient. get_ticker, get_order_book and get_trade_list return awaitables. The cache and
+    the hedging policy, when given, must be an AsyncMarketDataCache and an AsyncHedgingPolicy.
+    """
+    TRANSPORT_CLASS = AsyncHttpTransport
+
+    def iter_order_book(self):
+        """
+        :return: async iterator of (side, [price, quantity, user_id]) pairs
+        :rtype: MarketDataStream
+        """
+        return self._iter_market_data(consts.MarketInformation.ORDER_BOOK, '', keys=['bids', 'asks'])
+
+    def iter_trade_list(self, since_ts=0):
+        """
+        :type since_ts: long
+        :return: async iterator of trades
+        :rtype: MarketDataStream
+        """
+        return self._iter_market_data(
+            consts.MarketInformation.TRADES, '?since={}'.format(since_ts), make_item=partial(self._make_record, Trade),
+        )
+
+    def _iter_market_data(self, requested_info, params, keys=None, make_item=None):
+        url = self._get_market_data_url(requested_info, params)
+        return MarketDataStream(partial(self.transport.get_stream, url), keys, self.STREAM_CHUNK_SIZE, make_item)
+
+    async def _get_market_data(self, requested_info, params=''):
+        url = self._get_market_data_url(requested_info, params)
+        key = self._get_cache_key(requested_info, params)
+        fetch = partial(self._coalesce, key, partial(self._fetch_market_data, url, requested_info))
+        if self.cache is None:
+            data = await fetch()
+        else:
+            data = await self.cache.get(key, requested_info, fetch)
+        return self._parse_market_data(requested_info, data)
+
+    async def _fetch_market_data(self, url, requested_info=None):
+        if self.hedging is not None:
+            return await self.hedging.call(partial(self._send_market_data_request, url, requested_info), requested_info)
+        return await self._send_market_data_request(url, requested_info)
+
+    async def _send_market_data_request(self, url, requested_info=None):
+        if self.instrumentation is not None:
+            info = self.instrumentation.start(requested_info, None, 'GET', url)
+            return await _decode_instrumented(self, info, partial(self.transport.get, url))
+        response = await self.transport.get(url)
+        return self.json_decoder(await response.read())
+
+
+class AsyncAuthClient(AuthClient):
+    """
+    asyncio version of AuthClient. Every public method returns an awaitable and the responses are parsed exactly as
+    in AuthClient. Read-only calls are coalesced when an AsyncSingleFlight is given and the scheduler, when given,
+    must be an AsyncRequestScheduler. An order cache to be reconciled with this client must be an AsyncOpenOrderCache.
+    """
+    TRANSPORT_CLASS = AsyncHttpTransport
+    PAGE_ITERATOR_CLASS = AsyncPageIterator
+
+    async def get_balance(self, max_staleness=None):
+        balance = self._get_cached_balance(max_staleness)
+        if balance is not None:
+            return balance
+        version = self._get_balance_cache_version()
+        msg, response = await self._coalesce(self._get_coalescing_key('balance'), self._request_balance)
+        return self._cache_balance(self._parse_balance_response(response, msg), version)
+
+    async def _request_balance(self):
+        msg = self._make_balance_msg()
+        return msg, await self._send_request(msg)
+
+    async def cancel_order(self, order_id):
+        response = await self._send_request(self._make_cancel_order_msg(order_id))
+        return self._handle_order_response(response)
+
+    async def _place_order(self, order_side, order_type, price, quantity):
+        response = await self._send_request(self._make_place_order_msg(order_side, order_type, price, quantity))
+        return self._handle_order_response(response)
+
+    async def _get_orders(self, orders_filter, page, page_size, as_table=False, as_page=False):
+        key = self._get_coalescing_key('orders', tuple(orders_filter), page, page_size)
+        response = await self._coalesce(key, partial(self._request_orders, orders_filter, page, page_size))
+        return self._handle_orders_response(response, as_table, as_page)
+
+    async def _request_orders(self, orders_filter, page, page_size):
+        return await self._send_request(self._make_get_orders_msg(orders_filter, page, page_size))
+
+    async def _send_request(self, msg):
+        if self.scheduler is not None:
+            return await self.scheduler.run(msg.get('MsgType'), partial(self._send_message, msg))
+        return await self._send_message(msg)
+
+    async def _send_message(self, msg):
+        if self.instrumentation is not None:
+            return await self._send_instrumented_request(msg)
+        headers = self._get_request_headers()
+        response = await self.transport.post(self._get_tapi_url(), data=self._serialize_msg(msg), headers=headers)
+        return self.json_decoder(await response.read())
+
+    async def _send_instrumented_request(self, msg):
+        url = self._get_tapi_url()
+        info = self._start_tapi_request(msg, url)
+        body = self._serialize_msg(msg)
+        send = partial(self.transport.post, url, data=body, headers=self._get_request_headers())
+        info.request_size = len(body)
+        info.mark('prepare')
+        return await _decode_instrumented(self, info, send)
+
+
+async def _decode_instrumented(client, info, send):
+    """
+    asyncio version of AbstractClient._decode_instrumented.
+    """
+    try:
+        response = await send()
+        info.mark('transport')
+        content = await response.read()
+        info.set_response(getattr(response, 'status', None), content, getattr(response, 'timings', None))
+        data = client.json_decoder(content)
+        info.mark('decode')
+        return data
+    except Exception as exc:
+        info.error = exc
+        raise
+    finally:
+        client.instrumentation.finish(info)
+
+
+class MarketDataStream(object):
+    """
+    Async iterator over the items of a market data response, parsed while the body is being received.
+
+    Trades are returned as they are. With keys, as for the order book, (key, item) pairs are returned. The connection
+    goes back to the pool once the body is read to the end, so a stream that may be left early must be used as an
+    async context manager or closed with aclose.
+    """
+    def __init__(self, open_response, keys, chunk_size, make_item=None):
+        """
+        :param open_response: coroutine function returning the aiohttp.ClientResponse with the body still unread
+        :type open_response: callable
+        :type keys: list[basestring]
+        :type chunk_size: int
+        :param make_item: applied to each trade before it is returned
+        :type make_item: callable
+        """
+        self._open_response = open_response
+        self._make_item = make_item
+        self._parser = JsonArrayStreamParser(keys)
+        self._chunk_size = chunk_size
+        self._response = None
+        self._items = collections.deque()
+        self._finished = False
+
+    def __aiter__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self):
+        self._finished = True
+        self._items.clear()
+        self._release()
+
+    async def __anext__(self):
+        if self._response is None and not self._finished:
+            self._response = await self._open_response()
+        try:
+            while not self._items:
+                if self._finished:
+                    raise StopAsyncIteration
+                chunk = await self._response.content.read(self._chunk_size)
+                self._finished = not chunk
+                self._items.extend(self._parser.feed(chunk, final=self._finished))
+        except BaseException:
+            self._release()
+            raise
+        key, item = self._items.popleft()
+        if self._parser.keys is not None:
+            return key, item
+        return self._make_item(item) if self._make_item is not None else item
+
+    def _release(self):
+        if self._response is not None:
+            self._response.release()
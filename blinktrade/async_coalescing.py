@@ -0,0 +1,33 @@
+import asyncio
+
+
+class AsyncSingleFlight(object):
+    """
+    asyncio version of blinktrade.coalescing.SingleFlight. Waiters share the future of the coroutine that is already
+    running.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight = {}
+
+    async def do(self, key, fetch):
+        """
+        :type key: tuple
+        :param fetch: callable returning an awaitable
+        :type fetch: callable
+        """
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.calls += 1
+        future = self._in_flight[key] = asyncio.ensure_future(fetch())
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                del self._in_flight[key]
+            else:
+                future.add_done_callback(lambda _: self._in_flight.pop(key, None))
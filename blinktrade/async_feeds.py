@@ -0,0 +1,46 @@
+import asyncio
+
+from blinktrade.async_transports import aiohttp
+from blinktrade.feeds import TradeFeed
+
+
+class AsyncTradeFeed(TradeFeed):
+    """
+    TradeFeed for AsyncOpenClient, consumed with async for.
+    """
+    RETRY_EXCEPTIONS = TradeFeed.RETRY_EXCEPTIONS + (asyncio.TimeoutError, OSError) + (
+        (aiohttp.ClientError,) if aiohttp is not None else ()
+    )
+
+    def __init__(self, client, since=0, poll_interval=1.0, max_backoff=60.0, backoff_factor=2.0, window_size=1000,
+                 retry_exceptions=None, sleep=asyncio.sleep):
+        super(AsyncTradeFeed, self).__init__(
+            client, since, poll_interval, max_backoff, backoff_factor, window_size, retry_exceptions, sleep
+        )
+
+    def __iter__(self):
+        raise TypeError('AsyncTradeFeed must be consumed with async for')
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while self.running:
+            if self._pending:
+                return self._pending.popleft()
+            self._pending.extend(await self._poll_or_wait())
+        raise StopAsyncIteration
+
+    async def _poll_or_wait(self):
+        try:
+            trades = await self.poll()
+        except self.retry_exceptions:
+            self.failures += 1
+            await self.sleep(self.get_backoff())
+            return []
+        self.failures = 0
+        await self.sleep(self.poll_interval)
+        return trades
+
+    async def poll(self):
+        return self._get_new_trades(await self.client.get_trade_list(self.since))
@@ -0,0 +1,64 @@
+import asyncio
+import itertools
+import time
+
+from blinktrade import hedging
+from blinktrade.async_transports import aiohttp
+from blinktrade.hedging import HedgingPolicy
+
+CONNECTION_ERRORS = hedging.CONNECTION_ERRORS + (asyncio.TimeoutError,)
+if aiohttp is not None:
+    CONNECTION_ERRORS += (aiohttp.ClientConnectionError,)
+
+
+class AsyncHedgingPolicy(HedgingPolicy):
+    """
+    asyncio version of HedgingPolicy, for AsyncOpenClient. The slower request is cancelled once one answers.
+    """
+    RETRY_EXCEPTIONS = CONNECTION_ERRORS
+
+    async def call(self, fetch, key=None):
+        """
+        :param fetch: coroutine function sending the request and returning its decoded response
+        :type fetch: callable
+        """
+        for attempt in itertools.count():
+            try:
+                return await self._call_hedged(fetch, key)
+            except self.retry_exceptions:
+                if attempt >= self.max_retries:
+                    raise
+                self.retried += 1
+            await asyncio.sleep(self.get_backoff(attempt))
+
+    async def _call_hedged(self, fetch, key):
+        started = time.perf_counter()
+        primary = winner = asyncio.ensure_future(self._timed(fetch, key))
+        pending = set()
+        try:
+            done, _ = await asyncio.wait([winner], timeout=self.get_delay(key))
+            if not done:
+                self.hedged += 1
+                hedge = asyncio.ensure_future(self._timed(fetch, key))
+                pending = {winner, hedge}
+                winner = None
+                while winner is None:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    winner = self._get_winner(done, pending)
+                if winner is hedge:
+                    self.hedges_won += 1
+                    if primary in pending:
+                        # the cancelled primary took at least this long, which the percentile must not miss
+                        self._record_latency(key, time.perf_counter() - started)
+        finally:
+            for future in pending:
+                future.cancel()
+            if winner is not None and not winner.done():
+                winner.cancel()
+        return winner.result()
+
+    async def _timed(self, fetch, key):
+        started = time.perf_counter()
+        result = await fetch()
+        self._record_latency(key, time.perf_counter() - started)
+        return result
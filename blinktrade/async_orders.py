@@ -0,0 +1,21 @@
+from blinktrade.orders import OpenOrderCache
+
+
+class AsyncOpenOrderCache(OpenOrderCache):
+    """
+    OpenOrderCache reconciled with an AsyncAuthClient.
+    """
+    async def reconcile(self, client, page_size=50):
+        """
+        :type client: blinktrade.async_clients.AsyncAuthClient
+        :type page_size: int
+        :rtype: list[blinktrade.orders.OrderChange]
+        """
+        started_version, started_at = self._start_reconcile()
+        try:
+            pending_orders = []
+            async for order in client.iter_pending_orders(page_size):
+                pending_orders.append(order)
+            return self._finish_reconcile(pending_orders, started_version, started_at)
+        finally:
+            self._end_reconcile()
@@ -0,0 +1,47 @@
+import asyncio
+from collections import deque
+
+from blinktrade.pagination import PageIterator
+
+
+class AsyncPageIterator(PageIterator):
+    """
+    PageIterator for coroutine fetch functions, consumed with async for.
+
+    The next prefetch pages are requested concurrently as tasks. Once a short page arrives, the speculative requests
+    for the pages after it are cancelled.
+    """
+    def __iter__(self):
+        raise TypeError('AsyncPageIterator must be consumed with async for')
+
+    def __aiter__(self):
+        self._next_page = self.first_page
+        self._tasks = deque()
+        self._items = deque()
+        self._finished = False
+        return self
+
+    async def __anext__(self):
+        while not self._items:
+            if self._finished:
+                raise StopAsyncIteration
+            await self._fetch_next_page()
+        return self._items.popleft()
+
+    async def _fetch_next_page(self):
+        while len(self._tasks) < max(1, self.prefetch + 1):
+            self._tasks.append(asyncio.ensure_future(self.fetch_page(self._next_page, self.page_size)))
+            self._next_page += 1
+        try:
+            items = await self._tasks.popleft()
+        except BaseException:
+            self._cancel_pending_tasks()
+            raise
+        self._items.extend(items)
+        if self._is_last_page(items):
+            self._cancel_pending_tasks()
+
+    def _cancel_pending_tasks(self):
+        self._finished = True
+        while self._tasks:
+            self._tasks.popleft().cancel()
@@ -0,0 +1,34 @@
+import asyncio
+
+from blinktrade.scheduling import RequestScheduler
+
+
+class AsyncRequestScheduler(RequestScheduler):
+    """
+    asyncio version of RequestScheduler, for the AsyncAuthClient instances of a key running on the same loop.
+    """
+    async def run(self, msg_type, send):
+        """
+        :param send: coroutine function sending the message
+        :type send: callable
+        """
+        with self._lock:
+            entry = self._enqueue(msg_type)
+            entry.event = asyncio.Event()
+        try:
+            while True:
+                with self._lock:
+                    wait = self._dispatch()
+                    if entry.granted:
+                        break
+                    entry.event.clear()
+                try:
+                    await asyncio.wait_for(entry.event.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._lock:
+                self._remove(entry)
+            raise
+        self._record_wait(entry)
+        return await send()
@@ -0,0 +1,33 @@
+import asyncio
+
+from blinktrade.async_clients import AsyncOpenClient
+from blinktrade.snapshots import MarketSnapshotClient
+
+
+class AsyncMarketSnapshotClient(MarketSnapshotClient):
+    """
+    asyncio version of MarketSnapshotClient. Concurrency is bounded by a semaphore instead of a thread pool.
+    """
+    OPEN_CLIENT_CLASS = AsyncOpenClient
+
+    def _make_default_transport(self):
+        return AsyncOpenClient.TRANSPORT_CLASS(pool_size=self.max_workers)
+
+    async def get_snapshot(self, since_ts=0):
+        """
+        :type since_ts: long
+        :rtype: dict
+        """
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def fetch(func, args):
+            async with semaphore:
+                return await func(*args)
+
+        keys, coroutines = [], []
+        for currency, client in self.clients.items():
+            for name, func, args in self._get_requests(client, since_ts):
+                keys.append((currency, name))
+                coroutines.append(fetch(func, args))
+        results = await asyncio.gather(*coroutines)
+        return self._make_snapshot(dict(zip(keys, results)))
@@ -0,0 +1,129 @@
+import time
+from functools import partial
+
+from blinktrade.decoders import get_accept_encoding
+from blinktrade.transports import HttpTransport
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+class AsyncHttpTransport(object):
+    """
+    asyncio counterpart of HttpTransport backed by a pooled aiohttp.ClientSession.
+
+    The session is created lazily on the first request, so the transport can be built outside of a running loop.
+    Responses are returned with their body already read, so reading them again does not hold a connection. They get
+    a timings dict, as with HttpTransport, that also has the seconds spent waiting for a pooled connection (queue),
+    resolving the host (dns) and opening the TCP/TLS connection (connect) when the session was created here.
+    """
+    DEFAULT_POOL_SIZE = 100
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=HttpTransport.DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=HttpTransport.DEFAULT_READ_TIMEOUT, session=None):
+        """
+        :type pool_size: int
+        :type connect_timeout: float
+        :type read_timeout: float
+        :type session: aiohttp.ClientSession
+        """
+        if aiohttp is None:
+            raise ImportError('AsyncHttpTransport requires aiohttp. Install it with: pip install blinktrade[async]')
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(connect=connect_timeout, sock_read=read_timeout)
+        self.session = session
+
+    def _get_session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size)
+            self.session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout, headers={'Accept-Encoding': get_accept_encoding()},
+                trace_configs=[self._make_trace_config()],
+            )
+        return self.session
+
+    async def get(self, url, **kwargs):
+        """
+        :type url: basestring
+        :rtype: aiohttp.ClientResponse
+        """
+        return await self._request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        """
+        :type url: basestring
+        :rtype: aiohttp.ClientResponse
+        """
+        kwargs.pop('verify', None)
+        return await self._request('POST', url, **kwargs)
+
+    async def get_stream(self, url, **kwargs):
+        """
+        GET whose body is left unread, to be consumed from response.content. The caller must release the response.
+
+        :type url: basestring
+        :rtype: aiohttp.ClientResponse
+        """
+        return await self._get_session().get(url, **kwargs)
+
+    async def _request(self, method, url, **kwargs):
+        marks = {}
+        kwargs.setdefault('trace_request_ctx', marks)
+        async with self._get_session().request(method, url, **kwargs) as response:
+            await response.read()
+            marks['read_end'] = time.perf_counter()
+            response.timings = self._get_timings(marks)
+            return response
+
+    @staticmethod
+    def _make_trace_config():
+        trace_config = aiohttp.TraceConfig()
+        signals = [
+            (trace_config.on_request_start, 'start'),
+            (trace_config.on_connection_queued_start, 'queue_start'),
+            (trace_config.on_connection_queued_end, 'queue_end'),
+            (trace_config.on_dns_resolvehost_start, 'dns_start'),
+            (trace_config.on_dns_resolvehost_end, 'dns_end'),
+            (trace_config.on_connection_create_start, 'connect_start'),
+            (trace_config.on_connection_create_end, 'connect_end'),
+            (trace_config.on_request_headers_sent, 'headers_sent'),
+            (trace_config.on_request_end, 'request_end'),
+        ]
+        for signal, name in signals:
+            signal.append(partial(_mark_trace, name))
+        return trace_config
+
+    @staticmethod
+    def _get_timings(marks):
+        def between(start, end):
+            return marks[end] - marks[start] if start in marks and end in marks else None
+
+        timings = {
+            'queue': between('queue_start', 'queue_end'),
+            'dns': between('dns_start', 'dns_end'),
+            'connect': between('connect_start', 'connect_end'),
+            'wait': between('headers_sent' if 'headers_sent' in marks else 'start', 'request_end'),
+            'download': between('request_end', 'read_end'),
+        }
+        if timings['connect'] is not None and timings['dns'] is not None:
+            # the connection creation includes the name resolution
+            timings['connect'] -= timings['dns']
+        return {phase: seconds for phase, seconds in timings.items() if seconds is not None}
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+async def _mark_trace(name, session, trace_config_ctx, params):
+    marks = trace_config_ctx.trace_request_ctx
+    if isinstance(marks, dict):
+        marks[name] = time.perf_counter()
@@ -0,0 +1,100 @@
+import threading
+import time
+
+
+class BalanceCache(object):
+    """
+    Last known balance of an account at its broker, so get_balance can be answered without calling the exchange.
+
+    AuthClient replaces the snapshot with every get_balance response and merges the balance updates (U3) that come
+    along with order responses. Those updates only carry the currencies that changed, and the other currencies can
+    still change through fills and deposits, so the age of the snapshot is counted from the last get_balance
+    response. A snapshot older than max_staleness is not served.
+    """
+    DEFAULT_MAX_STALENESS = 5.0
+
+    def __init__(self, max_staleness=DEFAULT_MAX_STALENESS, clock=time.monotonic):
+        """
+        :param max_staleness: seconds after the last get_balance response the snapshot is still served
+        :type max_staleness: float
+        """
+        self.max_staleness = max_staleness
+        self.clock = clock
+        self.version = 0
+        self.synced_at = None
+        self.updated_at = None
+        self.hits = 0
+        self.misses = 0
+        self._balance = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, max_staleness=None):
+        """
+        :param max_staleness: overrides the max_staleness of the cache, 0 never serves the snapshot
+        :type max_staleness: float
+        :return: copy of the snapshot, None when there is no snapshot or it is too old
+        :rtype: dict
+        """
+        max_staleness = self.max_staleness if max_staleness is None else max_staleness
+        with self._lock:
+            age = self._get_age()
+            if age is None or age >= max_staleness:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return dict(self._balance)
+
+    def get_age(self):
+        """
+        :return: seconds since the last get_balance response, None before the first one
+        :rtype: float
+        """
+        with self._lock:
+            return self._get_age()
+
+    def _get_age(self):
+        return self.clock() - self.synced_at if self.synced_at is not None else None
+
+    def update(self, balance, partial=False, base_version=None):
+        """
+        :param balance: balance of the broker as returned by AuthClient
+        :type balance: collections.Mapping
+        :param partial: True for balance updates, which only carry the currencies that changed
+        :type partial: bool
+        :param base_version: version of the cache when the get_balance request was sent. Currencies updated since
+            then keep their newer values.
+        :type base_version: int
+        """
+        with self._lock:
+            self.version += 1
+            now = self.clock()
+            if partial:
+                self._balance.update(balance)
+                self._versions.update(dict.fromkeys(balance, self.version))
+            else:
+                newer = {
+                    currency: self._balance[currency] for currency, version in self._versions.items()
+                    if base_version is not None and version > base_version and currency in self._balance
+                }
+                self._balance = dict(balance)
+                self._balance.update(newer)
+                self._versions = dict.fromkeys(self._balance, self.version)
+                self.synced_at = now
+            self.updated_at = now
+
+    def invalidate(self):
+        with self._lock:
+            self.synced_at = None
+
+    def get_stats(self):
+        """
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'version': self.version,
+                'age': self._get_age(),
+            }
@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from blinktrade import consts
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry(object):
+    __slots__ = ('value', 'expires_at')
+
+    def __init__(self, value, expires_at):
+        self.value = value
+        self.expires_at = expires_at
+
+
+class MarketDataCache(object):
+    """
+    Bounded LRU cache for market data responses with a TTL per endpoint.
+
+    With stale_while_revalidate enabled an expired entry is still returned immediately, while a single background
+    refresh per key fetches the new value. Cached values are shared between callers and must not be mutated.
+    """
+    DEFAULT_TTLS = {
+        consts.MarketInformation.TICKER: 1.0,
+        consts.MarketInformation.ORDER_BOOK: 0.5,
+        consts.MarketInformation.TRADES: 1.0,
+    }
+
+    def __init__(self, ttls=None, max_size=256, stale_while_revalidate=False, max_stale=None, clock=time.time):
+        """
+        :param ttls: seconds an entry stays fresh, by consts.MarketInformation value
+        :type ttls: dict
+        :param max_size: number of entries kept before the least recently used one is evicted
+        :type max_size: int
+        :type stale_while_revalidate: bool
+        :param max_stale: seconds after expiration an entry can still be served stale. None means forever.
+        :type max_stale: float
+        """
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self.max_size = max_size
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_stale = max_stale
+        self.clock = clock
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get_stats(self):
+        """
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, key, requested_info, fetch):
+        """
+        Returns the cached value of key or calls fetch() to get it.
+
+        :type key: tuple
+        :param requested_info: consts.MarketInformation value used to choose the TTL
+        :type requested_info: basestring
+        :type fetch: callable
+        """
+        entry, must_refresh = self._lookup(key)
+        if entry is None:
+            value = fetch()
+            self._store(key, requested_info, value)
+            return value
+        if must_refresh:
+            thread = threading.Thread(target=self._refresh, args=(key, requested_info, fetch))
+            thread.daemon = True
+            thread.start()
+        return entry.value
+
+    def _lookup(self, key):
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            if now < entry.expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry, False
+            can_serve_stale = self.max_stale is None or now < entry.expires_at + self.max_stale
+            if not self.stale_while_revalidate or not can_serve_stale:
+                del self._entries[key]
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            self.stale_hits += 1
+            must_refresh = key not in self._refreshing
+            self._refreshing.add(key)
+            return entry, must_refresh
+
+    def _store(self, key, requested_info, value):
+        expires_at = self.clock() + self.ttls.get(requested_info, 0)
+        with self._lock:
+            self._entries[key] = CacheEntry(value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _refresh(self, key, requested_info, fetch):
+        try:
+            self._store(key, requested_info, fetch())
+        except Exception:
+            logger.exception('Unable to refresh market data for %s', key)
+        finally:
+            self._finish_refresh(key)
+
+    def _finish_refresh(self, key):
+        with self._lock:
+            self._refreshing.discard(key)
@@ -0,0 +1,191 @@
+from collections import deque
+
+from blinktrade import consts
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+class Candle(object):
+    __slots__ = ('start', 'open', 'high', 'low', 'close', 'volume', 'notional', 'count')
+
+    def __init__(self, start, price, amount):
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.volume = amount
+        self.notional = price * amount
+        self.count = 1
+
+    def add(self, price, amount):
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += amount
+        self.notional += price * amount
+        self.count += 1
+
+    @property
+    def vwap(self):
+        return self.notional / self.volume if self.volume else self.close
+
+    def to_dict(self):
+        return {
+            'start': self.start,
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume,
+            'vwap': self.vwap,
+            'count': self.count,
+        }
+
+
+class CandleAggregator(object):
+    """
+    Builds OHLCV candles of several resolutions incrementally, one trade at a time.
+
+    Trades are expected in trade id order, as yielded by blinktrade.feeds.TradeFeed. Each trade touches a single
+    candle per resolution, so keeping the candles up to date costs O(new trades).
+    """
+    def __init__(self, resolutions=(1, 60, 3600), max_candles=1000):
+        """
+        :param resolutions: candle sizes in seconds
+        :type resolutions: tuple[int]
+        :param max_candles: number of closed candles kept per resolution
+        :type max_candles: int
+        """
+        self.resolutions = tuple(resolutions)
+        self._candles = {resolution: deque(maxlen=max_candles) for resolution in self.resolutions}
+
+    def add_trade(self, trade):
+        """
+        :param trade: trade as returned by OpenClient.get_trade_list
+        :type trade: dict
+        """
+        timestamp, price, amount = trade['date'], trade['price'], trade['amount']
+        for resolution in self.resolutions:
+            candles = self._candles[resolution]
+            start = timestamp - timestamp % resolution
+            candle = self._find_candle(candles, start)
+            if candle is not None:
+                candle.add(price, amount)
+            elif not candles or start > candles[-1].start:
+                candles.append(Candle(start, price, amount))
+
+    def add_trades(self, trades):
+        """
+        :type trades: collections.Iterable[dict]
+        """
+        for trade in trades:
+            self.add_trade(trade)
+
+    @staticmethod
+    def _find_candle(candles, start):
+        # late trades usually belong to the last couple of candles, so search from the end
+        for candle in reversed(candles):
+            if candle.start == start:
+                return candle
+            if candle.start < start:
+                return None
+        return None
+
+    def get_candles(self, resolution):
+        """
+        Candles of a resolution from the oldest to the current one.
+
+        :type resolution: int
+        :rtype: list[Candle]
+        """
+        return list(self._candles[resolution])
+
+    def get_current_candle(self, resolution):
+        """
+        :type resolution: int
+        :rtype: Candle
+        """
+        candles = self._candles[resolution]
+        return candles[-1] if candles else None
+
+
+def build_candles(dates, prices, amounts, resolution):
+    """
+    Builds every candle of a resolution from columns of trades sorted by date, in a single pass.
+
+    With NumPy the whole computation is vectorized: bucket boundaries come from a diff of the bucketed dates and
+    open/high/low/close/volume are reduceat calls over those boundaries.
+
+    :param dates: trade timestamps in seconds
+    :param prices: trade prices
+    :param amounts: trade amounts
+    :type resolution: int
+    :return: {'start', 'open', 'high', 'low', 'close', 'volume', 'vwap', 'count'} columns
+    :rtype: dict
+    """
+    if numpy is not None:
+        return _build_candles_with_numpy(dates, prices, amounts, resolution)
+    aggregator = CandleAggregator(resolutions=(resolution,), max_candles=None)
+    for date, price, amount in zip(dates, prices, amounts):
+        aggregator.add_trade({'date': date, 'price': price, 'amount': amount})
+    candles = [candle.to_dict() for candle in aggregator.get_candles(resolution)]
+    names = ('start', 'open', 'high', 'low', 'close', 'volume', 'vwap', 'count')
+    return {name: [candle[name] for candle in candles] for name in names}
+
+
+def _build_candles_with_numpy(dates, prices, amounts, resolution):
+    dates = numpy.asarray(dates, dtype=numpy.int64)
+    prices = numpy.asarray(prices)
+    amounts = numpy.asarray(amounts)
+    if not len(dates):
+        empty = numpy.array([])
+        return {name: empty for name in ('start', 'open', 'high', 'low', 'close', 'volume', 'vwap', 'count')}
+
+    buckets = dates - dates % resolution
+    starts = numpy.concatenate(([0], numpy.flatnonzero(numpy.diff(buckets)) + 1))
+    ends = numpy.concatenate((starts[1:], [len(dates)]))
+    volume = numpy.add.reduceat(amounts, starts)
+    notional = numpy.add.reduceat(prices.astype(numpy.float64) * amounts.astype(numpy.float64), starts)
+    closes = prices[ends - 1]
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        vwap = numpy.where(volume > 0, notional / volume, closes)
+    return {
+        'start': buckets[starts],
+        'open': prices[starts],
+        'high': numpy.maximum.reduceat(prices, starts),
+        'low': numpy.minimum.reduceat(prices, starts),
+        'close': closes,
+        'volume': volume,
+        'vwap': vwap,
+        'count': ends - starts,
+    }
+
+
+def build_candles_from_store(store, resolution, start_timestamp=None, end_timestamp=None):
+    """
+    Builds candles straight from the columns of a TradeStore, converting satoshis back to currency units.
+
+    :type store: blinktrade.stores.TradeStore
+    :type resolution: int
+    :rtype: dict
+    """
+    start, stop = store.get_range(start_timestamp, end_timestamp)
+    dates = store.get_column('date')[start:stop]
+    prices = store.get_column('price')[start:stop]
+    amounts = store.get_column('amount')[start:stop]
+    if numpy is not None:
+        return build_candles(
+            dates,
+            numpy.asarray(prices, dtype=numpy.float64) / consts.SATOSHI_PRECISION,
+            numpy.asarray(amounts, dtype=numpy.float64) / consts.SATOSHI_PRECISION,
+            resolution,
+        )
+    return build_candles(
+        dates,
+        [float(price) / consts.SATOSHI_PRECISION for price in prices],
+        [float(amount) / consts.SATOSHI_PRECISION for amount in amounts],
+        resolution,
+    )
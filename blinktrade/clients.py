@@ -1,30 +1,55 @@
-from datetime import datetime
 import hashlib
 import hmac
-import time
+import json
 from abc import ABCMeta
 from functools import partial
 
-import requests
-
 from blinktrade import consts, exceptions
+from blinktrade.decoders import JsonArrayStreamParser, get_json_decoder
+from blinktrade.ids import get_default_id_generator
+from blinktrade.instrumentation import TAPI_ENDPOINT
+from blinktrade.nonces import get_monotonic_nonce_provider
+from blinktrade.pagination import Page, PageIterator
+from blinktrade.records import Balance, Order, Ticker, Trade
+from blinktrade.satoshis import to_satoshis, validate_satoshis
+from blinktrade.tables import OrderTable
+from blinktrade.transports import HttpTransport
 
 
 class AbstractClient(object):
     __metaclass__ = ABCMeta
 
     API_VERSION = 'v1'
+    TRANSPORT_CLASS = HttpTransport
 
-    def __init__(self, environment_type, currency, broker):
+    def __init__(self, environment_type, currency, broker, transport=None, single_flight=None, json_decoder=None,
+                 use_records=False, instrumentation=None):
         """
         :type environment_type: basestring
         :type currency: basestring
         :type broker: basestring
+        :param transport: object exposing get/post like HttpTransport. Pass the same instance to several clients to
+            share its connection pool.
+        :type transport: blinktrade.transports.HttpTransport
+        :param single_flight: coalesces identical read-only calls that are in flight at the same time
+        :type single_flight: blinktrade.coalescing.SingleFlight
+        :param json_decoder: function decoding the response bodies, defaults to the fastest installed decoder
+        :type json_decoder: callable
+        :param use_records: return tickers, trades, balances and orders as slotted records, which take less memory
+            than dicts and still support the dict accessors
+        :type use_records: bool
+        :param instrumentation: hooks and latency histograms for every request
+        :type instrumentation: blinktrade.instrumentation.Instrumentation
         """
         self.environment_type = self.validate_environment_type(environment_type)
         self.environment_server = consts.ENVIRONMENT_TO_SERVER_MAP[self.environment_type]
         self.currency = self.validate_currency(currency)
         self.broker = self.validate_broker(broker)
+        self.transport = transport or self.TRANSPORT_CLASS()
+        self.single_flight = single_flight
+        self.json_decoder = json_decoder or get_json_decoder()
+        self.use_records = use_records
+        self.instrumentation = instrumentation
 
     @staticmethod
     def validate_environment_type(env):
@@ -44,8 +69,54 @@ class AbstractClient(object):
             raise ValueError('Invalid Broker. Valid options are: {}'.format(consts.BROKERS_CHOICES))
         return broker
 
+    def _coalesce(self, key, fetch):
+        if self.single_flight is None:
+            return fetch()
+        return self.single_flight.do(key, fetch)
+
+    def _decode_response(self, response):
+        return self.json_decoder(response.content)
+
+    def _decode_instrumented(self, info, send):
+        """
+        Sends the request with send and decodes its response, recording each phase in info.
+        """
+        try:
+            response = send()
+            info.mark('transport')
+            content = response.content
+            info.set_response(getattr(response, 'status_code', None), content, getattr(response, 'timings', None))
+            data = self.json_decoder(content)
+            info.mark('decode')
+            return data
+        except Exception as exc:
+            info.error = exc
+            raise
+        finally:
+            self.instrumentation.finish(info)
+
+    def _make_record(self, record_class, data):
+        return record_class.from_dict(data) if self.use_records else data
+
 
 class OpenClient(AbstractClient):
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, environment_type, currency, broker, transport=None, cache=None, single_flight=None,
+                 json_decoder=None, use_records=False, instrumentation=None, hedging=None):
+        """
+        :param cache: optional cache for market data responses, it can be shared between clients
+        :type cache: blinktrade.cache.MarketDataCache
+        :param hedging: optional policy hedging and retrying the market data requests. Streamed requests are not
+            hedged.
+        :type hedging: blinktrade.hedging.HedgingPolicy
+        """
+        super(OpenClient, self).__init__(
+            environment_type, currency, broker, transport, single_flight, json_decoder, use_records, instrumentation,
+        )
+        self.cache = cache
+        self.hedging = hedging
+
     def get_ticker(self):
         """
         :rtype: dict
@@ -65,32 +136,165 @@ class OpenClient(AbstractClient):
         """
         return self._get_market_data(consts.MarketInformation.TRADES, '?since={}'.format(since_ts))
 
+    def iter_order_book(self):
+        """
+        Streams the order book, yielding each level as soon as it is received instead of decoding the whole body.
+
+        :return: (side, [price, quantity, user_id]) pairs, side being 'bids' or 'asks'
+        :rtype: collections.Iterator[tuple]
+        """
+        return self._iter_market_data(consts.MarketInformation.ORDER_BOOK, '', keys=['bids', 'asks'])
+
+    def iter_trade_list(self, since_ts=0):
+        """
+        Streams the trades since since_ts, yielding each trade as soon as it is received.
+
+        :type since_ts: long
+        :rtype: collections.Iterator[dict]
+        """
+        items = self._iter_market_data(consts.MarketInformation.TRADES, '?since={}'.format(since_ts))
+        return (self._make_record(Trade, trade) for _, trade in items)
+
+    def _iter_market_data(self, requested_info, params, keys=None):
+        url = self._get_market_data_url(requested_info, params)
+        response = self.transport.get(url, stream=True)
+        try:
+            parser = JsonArrayStreamParser(keys)
+            for chunk in response.iter_content(self.STREAM_CHUNK_SIZE):
+                for item in parser.feed(chunk):
+                    yield item
+            for item in parser.feed(b'', final=True):
+                yield item
+        finally:
+            response.close()
+
     def _get_market_data(self, requested_info, params=''):
-        url = '{domain}/api/{version}/{currency}/{type}{params}'.format(
+        url = self._get_market_data_url(requested_info, params)
+        key = self._get_cache_key(requested_info, params)
+        fetch = partial(self._coalesce, key, partial(self._fetch_market_data, url, requested_info))
+        data = fetch() if self.cache is None else self.cache.get(key, requested_info, fetch)
+        return self._parse_market_data(requested_info, data)
+
+    def _parse_market_data(self, requested_info, data):
+        if not self.use_records:
+            return data
+        if requested_info == consts.MarketInformation.TICKER:
+            return Ticker.from_dict(data)
+        if requested_info == consts.MarketInformation.TRADES:
+            return [Trade.from_dict(trade) for trade in data]
+        return data
+
+    def _fetch_market_data(self, url, requested_info=None):
+        if self.hedging is not None:
+            return self.hedging.call(partial(self._send_market_data_request, url, requested_info), requested_info)
+        return self._send_market_data_request(url, requested_info)
+
+    def _send_market_data_request(self, url, requested_info=None):
+        if self.instrumentation is None:
+            return self._decode_response(self.transport.get(url))
+        info = self.instrumentation.start(requested_info, None, 'GET', url)
+        return self._decode_instrumented(info, partial(self.transport.get, url))
+
+    def _get_cache_key(self, requested_info, params):
+        return self.environment_type, self.currency, requested_info, params
+
+    def _get_market_data_url(self, requested_info, params=''):
+        return '{domain}/api/{version}/{currency}/{type}{params}'.format(
             domain=self.environment_server,
             version=self.API_VERSION,
             currency=self.currency,
             type=requested_info,
             params=params,
         )
-        return requests.get(url).json()
 
 
 class AuthClient(AbstractClient):
     SATOSHI_COLUMNS = ['CumQty', 'OrderQty', 'CxlQty', 'LeavesQty', 'Price', 'Volume', 'LastPx', 'AvgPx']
-
-    def __init__(self, environment_type, currency, broker, key, secret):
-        super(AuthClient, self).__init__(environment_type, currency, broker)
+    PAGE_ITERATOR_CLASS = PageIterator
+    MARKET_ORDER_PRICE = 0.01
+    _TEMPLATE_CODES = frozenset([consts.OrderSide.BUY, consts.OrderSide.SELL, consts.OrderType.MARKET,
+                                 consts.OrderType.LIMITED_ORDER])
+
+    def __init__(self, environment_type, currency, broker, key, secret, transport=None, single_flight=None,
+                 id_generator=None, nonce_provider=None, json_decoder=None, use_records=False, satoshi_mode=False,
+                 instrumentation=None, scheduler=None, order_cache=None, balance_cache=None):
+        """
+        :param id_generator: source of ClOrdID and request ids, defaults to the process wide SnowflakeIdGenerator
+        :type id_generator: blinktrade.ids.SnowflakeIdGenerator
+        :param nonce_provider: source of request nonces, defaults to the process wide MonotonicNonceProvider of the
+            key. Use a SharedNonceProvider when several processes share the key.
+        :type nonce_provider: blinktrade.nonces.MonotonicNonceProvider
+        :param satoshi_mode: take prices and quantities as integer satoshis and return them, as well as balances,
+            as the integer satoshis of the response instead of floats. Use blinktrade.satoshis to convert amounts.
+        :type satoshi_mode: bool
+        :param scheduler: rate limits the messages and sends them by priority, share it between the clients of the
+            key. Messages are sent as soon as they are made when None.
+        :type scheduler: blinktrade.scheduling.RequestScheduler
+        :param order_cache: kept up to date with the orders of every order response
+        :type order_cache: blinktrade.orders.OpenOrderCache
+        :param balance_cache: answers get_balance while its snapshot is fresh enough. It is kept up to date with
+            get_balance responses and the balance updates of order responses.
+        :type balance_cache: blinktrade.balances.BalanceCache
+        """
+        super(AuthClient, self).__init__(
+            environment_type, currency, broker, transport, single_flight, json_decoder, use_records, instrumentation,
+        )
         self.key = key
         self.secret = secret
+        self._id_generator = id_generator
+        self.nonce_provider = nonce_provider or get_monotonic_nonce_provider(key)
+        self.satoshi_mode = satoshi_mode
+        self.scheduler = scheduler
+        self.order_cache = order_cache
+        self.balance_cache = balance_cache
+        self._hmac = hmac.new(bytearray(self.secret, 'utf-8'), digestmod=hashlib.sha256)
+        self._headers = {
+            'user-agent': 'blinktrade_tools/0.1',
+            'Content-Type': 'application/json',
+            'APIKey': self.key,
+        }
+        self._tapi_url = (None, None)
+        self._place_order_template = self._make_place_order_template()
 
-    def get_balance(self):
-        msg = {
+    def get_balance(self, max_staleness=None):
+        """
+        :param max_staleness: overrides the max_staleness of the balance cache, 0 always calls the exchange
+        :type max_staleness: float
+        """
+        balance = self._get_cached_balance(max_staleness)
+        if balance is not None:
+            return balance
+        version = self._get_balance_cache_version()
+        msg, response = self._coalesce(self._get_coalescing_key('balance'), self._request_balance)
+        return self._cache_balance(self._parse_balance_response(response, msg), version)
+
+    def _request_balance(self):
+        msg = self._make_balance_msg()
+        return msg, self._send_request(msg)
+
+    def _get_cached_balance(self, max_staleness):
+        if self.balance_cache is None:
+            return None
+        balance = self.balance_cache.get(max_staleness)
+        return self._make_record(Balance, balance) if balance is not None else None
+
+    def _get_balance_cache_version(self):
+        return self.balance_cache.version if self.balance_cache is not None else None
+
+    def _cache_balance(self, balance, version):
+        if self.balance_cache is not None:
+            self.balance_cache.update(balance, base_version=version)
+        return balance
+
+    def _make_balance_msg(self):
+        return {
             'MsgType': consts.MessageType.BALANCE,
             'BalanceReqID': self._get_unique_id(),
         }
-        response = self._send_request(msg)
-        broker = [broker[self.broker] for broker in response['Responses'] if broker.get(str(self.broker))]
+
+    def _parse_balance_response(self, response, msg=None):
+        responses = self._get_correlated_responses(msg, response) if msg else response['Responses']
+        broker = [broker[self.broker] for broker in responses if broker.get(str(self.broker))]
         broker = broker[0] if broker else {}
         return self._make_balance_from_broker_dict(broker)
 
@@ -99,37 +303,90 @@ class AuthClient(AbstractClient):
         :type broker: dict
         :return: trading_system.blinktrade.beans.Balance
         """
-        return {currency: self._get_decimal_value(value) for currency, value in broker.items()}
+        balance = {currency: self._get_decimal_value(value) for currency, value in broker.items()}
+        return self._make_record(Balance, balance)
 
     def buy_bitcoins_with_limited_order(self, price, quantity):
         return self._place_order(consts.OrderSide.BUY, consts.OrderType.LIMITED_ORDER, price, quantity)
 
     def buy_bitcoins_with_market_order(self, quantity):
-        return self._place_order(consts.OrderSide.BUY, consts.OrderType.MARKET, price=0.01, quantity=quantity)
+        return self._place_order(
+            consts.OrderSide.BUY, consts.OrderType.MARKET, price=self._get_market_order_price(), quantity=quantity,
+        )
 
     def sell_bitcoins_with_limited_order(self, price, quantity):
         return self._place_order(consts.OrderSide.SELL, consts.OrderType.LIMITED_ORDER, price, quantity)
 
     def sell_bitcoins_with_market_order(self, quantity):
-        return self._place_order(consts.OrderSide.SELL, consts.OrderType.LIMITED_ORDER, price=0.01, quantity=quantity)
+        return self._place_order(
+            consts.OrderSide.SELL, consts.OrderType.LIMITED_ORDER, price=self._get_market_order_price(),
+            quantity=quantity,
+        )
+
+    def _get_market_order_price(self):
+        return to_satoshis(self.MARKET_ORDER_PRICE) if self.satoshi_mode else self.MARKET_ORDER_PRICE
 
     def cancel_order(self, order_id):
-        msg = {
+        response = self._send_request(self._make_cancel_order_msg(order_id))
+        return self._handle_order_response(response)
+
+    def _make_cancel_order_msg(self, order_id):
+        return {
             'MsgType': consts.MessageType.CANCEL_ORDER,
             'ClOrdID': order_id,
         }
-        response = self._send_request(msg)
-        self._validate_response(response)
-        return self._parse_order_response(response)
 
-    def get_pending_orders(self, page=0, page_size=50):
-        return self._get_orders(orders_filter=['has_leaves_qty eq 1'], page=page, page_size=page_size)
+    def get_pending_orders(self, page=0, page_size=50, as_table=False):
+        """
+        :param as_table: return the orders as a columnar OrderTable instead of a list of dicts
+        :type as_table: bool
+        :rtype: list[dict] | blinktrade.tables.OrderTable
+        """
+        return self._get_orders(
+            orders_filter=['has_leaves_qty eq 1'], page=page, page_size=page_size, as_table=as_table,
+        )
+
+    def get_executed_orders(self, page=0, page_size=50, as_table=False):
+        """
+        :param as_table: return the orders as a columnar OrderTable instead of a list of dicts
+        :type as_table: bool
+        :rtype: list[dict] | blinktrade.tables.OrderTable
+        """
+        return self._get_orders(
+            orders_filter=['has_cum_qty eq 1'], page=page, page_size=page_size, as_table=as_table,
+        )
+
+    def iter_pending_orders(self, page_size=50, prefetch=1):
+        """
+        Iterates over every pending order, fetching the next pages in background.
+
+        :type page_size: int
+        :param prefetch: number of pages fetched ahead of the one being consumed
+        :type prefetch: int
+        :rtype: blinktrade.pagination.PageIterator
+        """
+        return self._iter_orders(['has_leaves_qty eq 1'], page_size, prefetch)
+
+    def iter_executed_orders(self, page_size=50, prefetch=1):
+        """
+        Iterates over every executed order, fetching the next pages in background.
+
+        :type page_size: int
+        :type prefetch: int
+        :rtype: blinktrade.pagination.PageIterator
+        """
+        return self._iter_orders(['has_cum_qty eq 1'], page_size, prefetch)
 
-    def get_executed_orders(self, page=0, page_size=50):
-        return self._get_orders(orders_filter=['has_cum_qty eq 1'], page=page, page_size=page_size)
+    def _iter_orders(self, orders_filter, page_size, prefetch):
+        fetch_page = partial(self._get_orders, orders_filter, as_page=True)
+        return self.PAGE_ITERATOR_CLASS(fetch_page, page_size=page_size, prefetch=prefetch)
 
     def _place_order(self, order_side, order_type, price, quantity):
-        msg = {
+        response = self._send_request(self._make_place_order_msg(order_side, order_type, price, quantity))
+        return self._handle_order_response(response)
+
+    def _make_place_order_msg(self, order_side, order_type, price, quantity):
+        return {
             'MsgType': consts.MessageType.PLACE_ORDER,
             'ClOrdID': self._get_unique_id(),
             'Symbol': consts.CURRENCY_TO_SYMBOL_MAP[self.currency],
@@ -139,12 +396,24 @@ class AuthClient(AbstractClient):
             'OrderQty': self._get_satoshi_value(quantity),
             'BrokerID': self.broker,
         }
-        response = self._send_request(msg)
-        self._validate_response(response)
-        return self._parse_order_response(response)
 
-    def _get_orders(self, orders_filter, page, page_size):
-        msg = {
+    def _get_orders(self, orders_filter, page, page_size, as_table=False, as_page=False):
+        key = self._get_coalescing_key('orders', tuple(orders_filter), page, page_size)
+        response = self._coalesce(key, partial(self._request_orders, orders_filter, page, page_size))
+        return self._handle_orders_response(response, as_table, as_page)
+
+    def _request_orders(self, orders_filter, page, page_size):
+        return self._send_request(self._make_get_orders_msg(orders_filter, page, page_size))
+
+    def _get_coalescing_key(self, *args):
+        """
+        Key of a read-only tapi request. Only the raw response is shared: each client decodes it with its own
+        satoshi_mode and use_records and updates its own caches.
+        """
+        return (self.environment_type, self.broker, self.key) + args
+
+    def _make_get_orders_msg(self, orders_filter, page, page_size):
+        return {
             'MsgType': consts.MessageType.GET_ORDERS,
             'OrdersReqID': self._get_unique_id(),
             'Page': page,
@@ -152,9 +421,48 @@ class AuthClient(AbstractClient):
             'Filter': orders_filter,
 
         }
-        response = self._send_request(msg)
+
+    def _handle_order_response(self, response, with_balance=True):
+        self._validate_response(response)
+        orders = self._parse_order_response(response, with_balance)
+        if self.order_cache is not None:
+            self.order_cache.update_orders(orders)
+        return orders
+
+    def _handle_orders_response(self, response, as_table, as_page=False):
+        if as_page:
+            # pages only hold orders, and their size is the one applied by the server
+            return Page(self._handle_order_response(response, with_balance=False), self._get_page_size(response))
+        if not as_table:
+            return self._handle_order_response(response)
         self._validate_response(response)
-        return self._parse_order_response(response)
+        table = self._make_order_table(response)
+        if self.order_cache is not None:
+            self.order_cache.update_orders(table)
+        return table
+
+    @staticmethod
+    def _get_page_size(response):
+        for item in response['Responses']:
+            if item['MsgType'] == consts.MessageType.ORDER_STATUS_RESPONSE and 'PageSize' in item:
+                return item['PageSize']
+        return None
+
+    def _make_order_table(self, response):
+        responses = [r for r in response['Responses'] if r['MsgType'] == consts.MessageType.ORDER_STATUS_RESPONSE]
+        satoshi_columns = () if self.satoshi_mode else self.SATOSHI_COLUMNS
+        return OrderTable.from_order_status_responses(responses, satoshi_columns)
+
+    @staticmethod
+    def _get_correlated_responses(msg, response):
+        """
+        Items of the response that carry the id of the request, or every item when the server did not echo it back.
+        """
+        id_field = consts.REQUEST_ID_FIELDS.get(msg['MsgType'])
+        request_id = msg.get(id_field)
+        responses = response['Responses']
+        correlated = [item for item in responses if item.get(id_field) == request_id]
+        return correlated or responses
 
     @staticmethod
     def _validate_response(response):
@@ -162,10 +470,10 @@ class AuthClient(AbstractClient):
         if response_item.get('OrdStatus') == consts.OrderStatus.REJECTED:
             raise exceptions.OrderRejectedException('Unable to place the order', response_item)
 
-    def _parse_order_response(self, response):
+    def _parse_order_response(self, response, with_balance=True):
         order_list = self._get_orders_from_response(response)
         balance = self._get_balance_from_response(response)
-        return order_list + [balance] if balance else order_list
+        return order_list + [balance] if balance and with_balance else order_list
 
     def _get_orders_from_response(self, response):
         placed_orders_list = self._get_placed_order_from_response(response)
@@ -174,9 +482,14 @@ class AuthClient(AbstractClient):
 
     def _get_placed_order_from_response(self, response):
         order_list = [r for r in response['Responses'] if r['MsgType'] == consts.MessageType.PLACE_ORDER_RESPONSE]
-        return [self._parse_satoshi_columns(order) for order in order_list]
+        return [self._make_order(order) for order in order_list]
+
+    def _make_order(self, order):
+        return self._make_record(Order, self._parse_satoshi_columns(order))
 
     def _parse_satoshi_columns(self, order):
+        if self.satoshi_mode:
+            return order
         for column in self.SATOSHI_COLUMNS:
             if column in order:
                 order[column] = self._get_decimal_value(order[column])
@@ -194,7 +507,7 @@ class AuthClient(AbstractClient):
         partial_zip_func = partial(zip, keys)
         zipped_orders_list = map(partial_zip_func, values_list)
         dict_list = map(dict, zipped_orders_list)
-        return map(self._parse_satoshi_columns, dict_list)
+        return map(self._make_order, dict_list)
 
     def _get_balance_from_response(self, response):
         balance_list = [r for r in response['Responses'] if r['MsgType'] == consts.MessageType.BALANCE_RESPONSE]
@@ -202,50 +515,105 @@ class AuthClient(AbstractClient):
             return None
         balance = balance_list[0]
         broker = balance[str(self.broker)]
-        return self._make_balance_from_broker_dict(broker)
-
-    @staticmethod
-    def _get_unique_id():
-        return int(time.time())
-
-    @staticmethod
-    def _get_decimal_value(satoshi):
-        if satoshi is None:
-            return None
+        balance = self._make_balance_from_broker_dict(broker)
+        if self.balance_cache is not None:
+            self.balance_cache.update(balance, partial=True)
+        return balance
+
+    @property
+    def id_generator(self):
+        # the default generator claims a worker slot, so only processes that make requests take one
+        if self._id_generator is None:
+            self._id_generator = get_default_id_generator()
+        return self._id_generator
+
+    def _get_unique_id(self):
+        return self.id_generator.next_id()
+
+    def _get_decimal_value(self, satoshi):
+        if satoshi is None or self.satoshi_mode:
+            return satoshi
         return float(satoshi) / consts.SATOSHI_PRECISION
 
-    @staticmethod
-    def _get_satoshi_value(value):
+    def _get_satoshi_value(self, value):
+        if self.satoshi_mode:
+            return validate_satoshis(value)
         if value is None:
             return None
         return int(value * consts.SATOSHI_PRECISION)
 
     def _send_request(self, msg):
+        if self.scheduler is not None:
+            return self.scheduler.run(msg.get('MsgType'), partial(self._send_message, msg))
+        return self._send_message(msg)
+
+    def _send_message(self, msg):
+        if self.instrumentation is not None:
+            return self._send_instrumented_request(msg)
+        headers = self._get_request_headers()
+        body = self._serialize_msg(msg)
+        response = self.transport.post(self._get_tapi_url(), data=body, verify=True, headers=headers)
+        return self._decode_response(response)
+
+    def _send_instrumented_request(self, msg):
+        url = self._get_tapi_url()
+        info = self._start_tapi_request(msg, url)
+        body = self._serialize_msg(msg)
+        send = partial(self.transport.post, url, data=body, verify=True, headers=self._get_request_headers())
+        info.request_size = len(body)
+        info.mark('prepare')
+        return self._decode_instrumented(info, send)
+
+    def _start_tapi_request(self, msg, url):
+        return self.instrumentation.start(TAPI_ENDPOINT, msg.get('MsgType'), 'POST', url)
+
+    def _get_request_headers(self):
         nonce = self._get_nonce()
-        signature = self._get_signature(nonce)
-
-        headers = {
-            'user-agent': 'blinktrade_tools/0.1',
-            'Content-Type': 'application/json',
-            'APIKey': self.key,
-            'Nonce': nonce,
-            'Signature': signature
-        }
-        url = '{domain}/tapi/{version}/message'.format(
-            domain=self.environment_server, version=self.API_VERSION
+        headers = self._headers.copy()
+        headers['Nonce'] = nonce
+        headers['Signature'] = self._get_signature(nonce)
+        return headers
+
+    def _get_tapi_url(self):
+        server, url = self._tapi_url
+        if server != self.environment_server:
+            url = '{domain}/tapi/{version}/message'.format(domain=self.environment_server, version=self.API_VERSION)
+            self._tapi_url = (self.environment_server, url)
+        return url
+
+    def _make_place_order_template(self):
+        """
+        JSON of a place order message with the fields that never change for this client already encoded.
+        """
+        fixed_fields = json.dumps({
+            'MsgType': consts.MessageType.PLACE_ORDER,
+            'Symbol': consts.CURRENCY_TO_SYMBOL_MAP[self.currency],
+            'BrokerID': self.broker,
+        }, separators=(',', ':'))
+        return '{"ClOrdID":%d,"Side":"%s","OrdType":"%s","Price":%d,"OrderQty":%d,' + fixed_fields[1:]
+
+    def _serialize_msg(self, msg):
+        if self._can_use_place_order_template(msg):
+            return (self._place_order_template % (
+                msg['ClOrdID'], msg['Side'], msg['OrdType'], msg['Price'], msg['OrderQty'],
+            )).encode('utf-8')
+        return json.dumps(msg, separators=(',', ':')).encode('utf-8')
+
+    def _can_use_place_order_template(self, msg):
+        return (
+            msg.get('MsgType') == consts.MessageType.PLACE_ORDER and
+            len(msg) == 8 and
+            msg.get('Side') in self._TEMPLATE_CODES and
+            msg.get('OrdType') in self._TEMPLATE_CODES and
+            msg.get('Symbol') == consts.CURRENCY_TO_SYMBOL_MAP[self.currency] and
+            msg.get('BrokerID') == self.broker and
+            all(type(msg.get(field)) is int for field in ('ClOrdID', 'Price', 'OrderQty'))
         )
-        return requests.post(url, json=msg, verify=True, headers=headers).json()
 
-    @staticmethod
-    def _get_nonce():
-        dt = datetime.utcnow()
-        nonce = str(int(
-            (time.mktime(dt.utctimetuple()) + dt.microsecond / float(consts.NONCE_PRECISION)) *
-            consts.NONCE_PRECISION
-        ))
-        return nonce
+    def _get_nonce(self):
+        return self.nonce_provider.get_nonce()
 
     def _get_signature(self, nonce):
-        return hmac.new(
-            bytearray(self.secret, 'utf-8'), bytearray(nonce, 'utf-8'), digestmod=hashlib.sha256
-        ).hexdigest()
+        signature = self._hmac.copy()
+        signature.update(nonce.encode('utf-8'))
+        return signature.hexdigest()
@@ -16,6 +16,11 @@ ENVIRONMENT_TO_SERVER_MAP = {
     Environment.TEST: 'https://api.testnet.blinktrade.com',
 }
 
+ENVIRONMENT_TO_WEBSOCKET_MAP = {
+    Environment.PRODUCTION: 'wss://ws.blinktrade.com/trade/',
+    Environment.TEST: 'wss://api_testnet.blinktrade.com/trade/',
+}
+
 
 class Currency:
     AMERICAN_DOLLAR = 'USD'
@@ -66,9 +71,56 @@ class MessageType:
     POSITION = 'U42'
     PLACE_ORDER = 'D'
     PLACE_ORDER_RESPONSE = '8'
+    EXECUTION_REPORT = '8'
     ORDER_STATUS_RESPONSE = 'U5'
     TRADE_HISTORY = 'U32'
     TRADERS_RANK = 'U36'
+    HEARTBEAT = '1'
+    HEARTBEAT_RESPONSE = '0'
+    LOGIN = 'BE'
+    LOGIN_RESPONSE = 'BF'
+    MARKET_DATA_REQUEST = 'V'
+    MARKET_DATA_FULL_REFRESH = 'W'
+    MARKET_DATA_INCREMENTAL_REFRESH = 'X'
+    MARKET_DATA_REQUEST_REJECT = 'Y'
+    SECURITY_STATUS_REQUEST = 'e'
+    SECURITY_STATUS = 'f'
+
+
+REQUEST_ID_FIELDS = {
+    MessageType.BALANCE: 'BalanceReqID',
+    MessageType.CANCEL_ORDER: 'ClOrdID',
+    MessageType.GET_ORDERS: 'OrdersReqID',
+    MessageType.PLACE_ORDER: 'ClOrdID',
+    MessageType.HEARTBEAT: 'TestReqID',
+    MessageType.LOGIN: 'UserReqID',
+    MessageType.MARKET_DATA_REQUEST: 'MDReqID',
+    MessageType.SECURITY_STATUS_REQUEST: 'SecurityStatusReqID',
+}
+
+
+class SubscriptionRequestType:
+    SUBSCRIBE = '1'
+    UNSUBSCRIBE = '2'
+
+
+class MarketDataEntryType:
+    BID = '0'
+    OFFER = '1'
+    TRADE = '2'
+
+
+class MarketDataUpdateAction:
+    NEW = '0'
+    CHANGE = '1'
+    DELETE = '2'
+    DELETE_THRU = '3'
+
+
+class UserStatus:
+    LOGGED_IN = 1
+    NOT_LOGGED_IN = 2
+    INVALID_PASSWORD = 3
 
 
 class OrderSide:
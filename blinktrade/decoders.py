@@ -0,0 +1,163 @@
+import codecs
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+
+def _stdlib_loads(content):
+    if isinstance(content, bytes):
+        content = content.decode('utf-8')
+    return json.loads(content)
+
+
+def get_json_decoder(name=None):
+    """
+    Returns a function decoding a JSON body (bytes or str).
+
+    :param name: 'orjson', 'ujson' or 'json'. When None, orjson is used if it is installed and json otherwise.
+    :type name: basestring
+    :rtype: callable
+    """
+    if name is None:
+        name = 'orjson' if orjson is not None else 'json'
+    if name == 'orjson' and orjson is not None:
+        return orjson.loads
+    if name == 'ujson' and ujson is not None:
+        return ujson.loads
+    if name == 'json':
+        return _stdlib_loads
+    raise ValueError('JSON decoder {} is not available'.format(name))
+
+
+def get_accept_encoding():
+    """
+    Content encodings the transports can decompress, brotli only when a brotli module is installed.
+
+    :rtype: basestring
+    """
+    encodings = ['gzip', 'deflate']
+    try:
+        import brotli  # noqa: F401
+        encodings.append('br')
+    except ImportError:
+        pass
+    return ', '.join(encodings)
+
+
+class JsonArrayStreamParser(object):
+    """
+    Incremental parser yielding the items of large JSON arrays as the body arrives.
+
+    With keys=None the body must be an array and every item of it is returned with a None key. Otherwise the body
+    must be an object: the items of the arrays stored under keys are returned with their key, and the other values
+    are kept in fields. Only the item being parsed is buffered, never the whole body.
+    """
+    _WHITESPACE = re.compile(r'[ \t\n\r]*')
+    _START, _KEY, _NEXT_KEY, _COLON, _VALUE, _ITEM, _NEXT_ITEM, _DONE = range(8)
+
+    def __init__(self, keys=None):
+        """
+        :type keys: list[basestring]
+        """
+        self.keys = keys
+        self.fields = {}
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._state = self._START
+        self._key = None
+
+    def feed(self, chunk, final=False):
+        """
+        Parses a chunk of the body and returns the (key, item) pairs completed by it.
+
+        :type chunk: bytes
+        :param final: True for the last chunk, after which the body must be complete
+        :type final: bool
+        :rtype: list[tuple]
+        """
+        buffer = self._buffer + self._text_decoder.decode(chunk, final)
+        items = []
+        position = 0
+        while True:
+            position = self._WHITESPACE.match(buffer, position).end()
+            if position >= len(buffer):
+                break
+            char = buffer[position]
+            state = self._state
+            if state == self._START:
+                position = self._parse_start(char, position)
+            elif state in (self._KEY, self._NEXT_KEY):
+                if char == '}':
+                    self._state, position = self._DONE, position + 1
+                elif char == ',' and state == self._NEXT_KEY:
+                    self._state, position = self._KEY, position + 1
+                else:
+                    key, end = self._decode(buffer, position, final)
+                    if end is None:
+                        break
+                    self._key, self._state, position = key, self._COLON, end
+            elif state == self._COLON:
+                self._expect(char, ':')
+                self._state, position = self._VALUE, position + 1
+            elif state == self._VALUE:
+                if char == '[' and self._key in self.keys:
+                    self._state, position = self._ITEM, position + 1
+                    continue
+                value, end = self._decode(buffer, position, final)
+                if end is None:
+                    break
+                self.fields[self._key] = value
+                self._state, position = self._NEXT_KEY, end
+            elif state in (self._ITEM, self._NEXT_ITEM):
+                if char == ']':
+                    self._state = self._DONE if self.keys is None else self._NEXT_KEY
+                    position += 1
+                elif char == ',' and state == self._NEXT_ITEM:
+                    self._state, position = self._ITEM, position + 1
+                else:
+                    item, end = self._decode(buffer, position, final)
+                    if end is None:
+                        break
+                    items.append((self._key, item))
+                    self._state, position = self._NEXT_ITEM, end
+            else:
+                raise ValueError('Unexpected data after the end of the JSON body')
+        self._buffer = buffer[position:]
+        if final and (self._state != self._DONE or self._buffer.strip()):
+            raise ValueError('Incomplete JSON body')
+        return items
+
+    def _parse_start(self, char, position):
+        self._expect(char, '[' if self.keys is None else '{')
+        self._state = self._ITEM if self.keys is None else self._KEY
+        return position + 1
+
+    @staticmethod
+    def _expect(char, expected):
+        if char != expected:
+            raise ValueError('Expected {!r} but found {!r}'.format(expected, char))
+
+    def _decode(self, buffer, position, final):
+        """
+        Decodes the value starting at position. Returns a None end when the value is not complete yet.
+        """
+        try:
+            value, end = self._decoder.raw_decode(buffer, position)
+        except ValueError:
+            if final:
+                raise
+            return None, None
+        # a number at the very end of the buffer may still continue in the next chunk
+        if end >= len(buffer) and not final:
+            return None, None
+        return value, end
@@ -3,3 +3,17 @@ class OrderRejectedException(Exception):
         self.message = message
         self.details = details
         super(OrderRejectedException, self).__init__(message)
+
+
+class RequestQueueFullException(Exception):
+    def __init__(self, message, details):
+        self.message = message
+        self.details = details
+        super(RequestQueueFullException, self).__init__(message)
+
+
+class StreamLoginRejectedException(Exception):
+    def __init__(self, message, details):
+        self.message = message
+        self.details = details
+        super(StreamLoginRejectedException, self).__init__(message)
@@ -0,0 +1,96 @@
+import time
+from collections import deque
+
+import requests
+
+
+class TradeFeed(object):
+    """
+    Tails the trade tape of an OpenClient, yielding every new trade once.
+
+    The feed keeps the since cursor and a bounded window of the last trade ids it has seen, so duplicates returned
+    by overlapping polls are dropped and memory stays constant however long the feed runs. Failed polls are retried
+    with exponential back-off.
+    """
+    RETRY_EXCEPTIONS = (requests.RequestException, ValueError)
+
+    def __init__(self, client, since=0, poll_interval=1.0, max_backoff=60.0, backoff_factor=2.0, window_size=1000,
+                 retry_exceptions=None, sleep=time.sleep):
+        """
+        :type client: blinktrade.clients.OpenClient
+        :param since: timestamp of the first trades to be returned
+        :type since: long
+        :param poll_interval: seconds waited after every successful poll
+        :type poll_interval: float
+        :param max_backoff: maximum seconds to wait after consecutive failures
+        :type max_backoff: float
+        :type backoff_factor: float
+        :param window_size: number of trade ids remembered to drop duplicates
+        :type window_size: int
+        :type retry_exceptions: tuple
+        """
+        self.client = client
+        self.since = since
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.backoff_factor = backoff_factor
+        self.retry_exceptions = retry_exceptions or self.RETRY_EXCEPTIONS
+        self.sleep = sleep
+        self.failures = 0
+        self.running = True
+        self._seen_ids = set()
+        self._seen_window = deque()
+        self._window_size = window_size
+        self._pending = deque()
+
+    def stop(self):
+        self.running = False
+
+    def __iter__(self):
+        while self.running:
+            if not self._pending:
+                self._pending.extend(self._poll_or_wait())
+                continue
+            yield self._pending.popleft()
+
+    def _poll_or_wait(self):
+        try:
+            trades = self.poll()
+        except self.retry_exceptions:
+            self.failures += 1
+            self.sleep(self.get_backoff())
+            return []
+        self.failures = 0
+        self.sleep(self.poll_interval)
+        return trades
+
+    def poll(self):
+        """
+        Fetches trades since the cursor once and returns only the ones that were not seen yet.
+
+        :rtype: list[dict]
+        """
+        return self._get_new_trades(self.client.get_trade_list(self.since))
+
+    def get_backoff(self):
+        """
+        :rtype: float
+        """
+        return min(self.max_backoff, self.poll_interval * self.backoff_factor ** self.failures)
+
+    def _get_new_trades(self, trades):
+        new_trades = []
+        for trade in trades:
+            trade_id = trade['tid']
+            if trade_id in self._seen_ids:
+                continue
+            self._remember(trade_id)
+            new_trades.append(trade)
+            self.since = max(self.since, trade['date'])
+        return new_trades
+
+    def _remember(self, trade_id):
+        self._seen_ids.add(trade_id)
+        self._seen_window.append(trade_id)
+        if len(self._seen_window) > self._window_size:
+            self._seen_ids.discard(self._seen_window.popleft())
@@ -0,0 +1,178 @@
+import itertools
+import random
+import threading
+import time
+from concurrent import futures
+
+import requests
+
+from blinktrade.instrumentation import LatencyHistogram
+
+CONNECTION_ERRORS = (ConnectionError, requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+class HedgingPolicy(object):
+    """
+    Hedged requests with jittered retries, for idempotent requests only: OpenClient uses it for market data and
+    tapi messages never go through it.
+
+    When a request has not answered after the delay, a duplicate is sent and whichever answers first is used. The
+    delay is a percentile of the latencies seen so far for the same kind of request, clamped between min_delay and
+    max_delay, so only the slowest requests are hedged. Requests failing with a connection error are retried after
+    a random back-off of up to backoff * 2 ** attempt seconds, capped by max_backoff.
+
+    The synchronous requests run in a pool of max_workers threads. Latencies and the hedging delay are counted from
+    the moment a request starts running in a worker, so waiting for a free worker is not taken for a slow server,
+    and every request that answers records its latency, the slower one of a hedged pair included. A hedge still
+    waiting for a worker when the other request answers is cancelled. Size max_workers to twice the number of
+    threads calling the client.
+    """
+    DEFAULT_PERCENTILE = 95
+    DEFAULT_INITIAL_DELAY = 0.5
+    DEFAULT_MIN_SAMPLES = 20
+    RETRY_EXCEPTIONS = CONNECTION_ERRORS
+
+    def __init__(self, percentile=DEFAULT_PERCENTILE, initial_delay=DEFAULT_INITIAL_DELAY, min_delay=0.01,
+                 max_delay=2.0, min_samples=DEFAULT_MIN_SAMPLES, max_retries=2, backoff=0.1, max_backoff=2.0,
+                 retry_exceptions=None, max_workers=8):
+        """
+        :param percentile: latency percentile used as the hedging delay, between 0 and 100
+        :type percentile: float
+        :param initial_delay: hedging delay until min_samples latencies are known
+        :type initial_delay: float
+        :type min_delay: float
+        :type max_delay: float
+        :type min_samples: int
+        :param max_retries: retries after the first failed attempt, 0 disables them
+        :type max_retries: int
+        :param backoff: base of the exponential back-off, in seconds
+        :type backoff: float
+        :type max_backoff: float
+        :param retry_exceptions: exceptions that cause a retry, RETRY_EXCEPTIONS by default
+        :type retry_exceptions: tuple
+        :param max_workers: threads running the requests of the synchronous clients
+        :type max_workers: int
+        """
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_exceptions = self.RETRY_EXCEPTIONS if retry_exceptions is None else retry_exceptions
+        self.max_workers = max_workers
+        self.latencies = {}
+        self.hedged = 0
+        self.hedges_won = 0
+        self.retried = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def call(self, fetch, key=None):
+        """
+        :param fetch: sends the request and returns its decoded response
+        :type fetch: callable
+        :param key: kind of request, each one has its own latency percentile
+        :type key: collections.Hashable
+        """
+        for attempt in itertools.count():
+            try:
+                return self._call_hedged(fetch, key)
+            except self.retry_exceptions:
+                if attempt >= self.max_retries:
+                    raise
+                self.retried += 1
+            time.sleep(self.get_backoff(attempt))
+
+    def _call_hedged(self, fetch, key):
+        executor = self._get_executor()
+        running = threading.Event()
+        winner = executor.submit(self._timed, fetch, key, running)
+        running.wait()
+        done, _ = futures.wait([winner], self.get_delay(key))
+        if not done:
+            self.hedged += 1
+            hedge = executor.submit(self._timed, fetch, key, threading.Event())
+            pending = {winner, hedge}
+            winner = None
+            while winner is None:
+                done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                winner = self._get_winner(done, pending)
+            for future in pending:
+                future.cancel()
+            if winner is hedge:
+                self.hedges_won += 1
+        return winner.result()
+
+    def _timed(self, fetch, key, running):
+        running.set()
+        started = time.perf_counter()
+        result = fetch()
+        self._record_latency(key, time.perf_counter() - started)
+        return result
+
+    def get_delay(self, key=None):
+        """
+        :return: seconds to wait for a response before sending a duplicate request
+        :rtype: float
+        """
+        histogram = self.latencies.get(key)
+        if histogram is None or histogram.count < self.min_samples:
+            delay = self.initial_delay
+        else:
+            delay = histogram.get_percentile(self.percentile)
+        return min(max(delay, self.min_delay), self.max_delay)
+
+    def get_backoff(self, attempt):
+        """
+        :param attempt: failed attempts before this one, starting at 0
+        :type attempt: int
+        :rtype: float
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def get_stats(self):
+        """
+        :return: hedged requests, hedges that answered first, retries and the latency statistics of each key
+        :rtype: dict
+        """
+        return {
+            'hedged': self.hedged,
+            'hedges_won': self.hedges_won,
+            'retried': self.retried,
+            'latency': {key: histogram.get_stats() for key, histogram in list(self.latencies.items())},
+        }
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _record_latency(self, key, seconds):
+        histogram = self.latencies.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.latencies.setdefault(key, LatencyHistogram())
+        histogram.record(seconds)
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = futures.ThreadPoolExecutor(self.max_workers)
+        return self._executor
+
+    @staticmethod
+    def _get_winner(done, pending):
+        """
+        :return: the first successful request, the last failed one when none is left, otherwise None
+        """
+        failed = None
+        for future in done:
+            if future.exception() is None:
+                return future
+            failed = future
+        return failed if not pending else None
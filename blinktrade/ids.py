@@ -0,0 +1,145 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SnowflakeIdGenerator(object):
+    """
+    Generates unique integer ids made of a millisecond timestamp, a worker id and a per-millisecond sequence.
+
+    With the default layout an id fits in 53 bits, so it survives JSON round trips through any client, and each
+    worker can generate 128 ids per millisecond, after which it waits for the next millisecond. When no worker id
+    is given, the generator claims the first free worker slot of the user with a lock file, so processes of the
+    same user never share a worker id. When every slot is taken, it falls back to a worker id made from the process
+    id and logs a warning.
+    """
+    EPOCH = 1451606400000  # 2016-01-01 in milliseconds
+    TIMESTAMP_BITS = 41
+    WORKER_BITS = 5
+    SEQUENCE_BITS = 7
+    LOCK_FILE_PATTERN = 'blinktrade-id-worker-{}.lock'
+    LOCK_DIR_PATTERN = 'blinktrade-ids-{}'
+
+    def __init__(self, worker_id=None, lock_dir=None, clock=time.time, sleep=time.sleep):
+        """
+        :param worker_id: unique id of this generator on the host. Claimed from a lock file when None.
+        :type worker_id: int
+        :param lock_dir: directory of the worker lock files, defaults to a directory of the user in the system
+            temporary directory
+        :type lock_dir: basestring
+        """
+        self.max_worker_id = (1 << self.WORKER_BITS) - 1
+        self.max_sequence = (1 << self.SEQUENCE_BITS) - 1
+        self.lock_dir = lock_dir or self._get_default_lock_dir()
+        self.clock = clock
+        self.sleep = sleep
+        self._fixed_worker_id = worker_id
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._pid = None
+        self._last_timestamp = -1
+        self._sequence = 0
+        self.worker_id = None
+        self._claim_worker_id()
+
+    def _get_default_lock_dir(self):
+        user = os.getuid() if hasattr(os, 'getuid') else os.getpid()
+        return os.path.join(tempfile.gettempdir(), self.LOCK_DIR_PATTERN.format(user))
+
+    def _claim_worker_id(self):
+        self._pid = os.getpid()
+        if self._fixed_worker_id is not None:
+            if not 0 <= self._fixed_worker_id <= self.max_worker_id:
+                raise ValueError('Worker id must be between 0 and {}'.format(self.max_worker_id))
+            self.worker_id = self._fixed_worker_id
+            return
+        if fcntl is None:
+            self.worker_id = self._pid & self.max_worker_id
+            return
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+        try:
+            os.makedirs(self.lock_dir, 0o700)
+        except OSError:
+            pass
+        for worker_id in range(self.max_worker_id + 1):
+            lock_file = None
+            try:
+                lock_file = open(os.path.join(self.lock_dir, self.LOCK_FILE_PATTERN.format(worker_id)), 'a')
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except (IOError, OSError):
+                if lock_file is not None:
+                    lock_file.close()
+                continue
+            self._lock_file = lock_file
+            self.worker_id = worker_id
+            return
+        self.worker_id = self._pid & self.max_worker_id
+        logger.warning(
+            'All %s id worker slots of %s are in use, falling back to worker id %s of the process id',
+            self.max_worker_id + 1, self.lock_dir, self.worker_id,
+        )
+
+    def next_id(self):
+        """
+        :rtype: int
+        """
+        with self._lock:
+            if os.getpid() != self._pid:
+                # a forked child inherits the parent state and must not reuse its worker id
+                self._last_timestamp, self._sequence = -1, 0
+                self._claim_worker_id()
+
+            timestamp = self._get_timestamp()
+            if timestamp > self._last_timestamp:
+                self._last_timestamp, self._sequence = timestamp, 0
+            else:
+                # same millisecond or clock moved backwards: keep counting from the last timestamp
+                self._sequence += 1
+                if self._sequence > self.max_sequence:
+                    # never run ahead of the clock, or a process taking over the worker slot would reissue ids
+                    while timestamp <= self._last_timestamp:
+                        self.sleep(0.0001)
+                        timestamp = self._get_timestamp()
+                    self._last_timestamp, self._sequence = timestamp, 0
+
+            return (
+                (self._last_timestamp << (self.WORKER_BITS + self.SEQUENCE_BITS)) |
+                (self.worker_id << self.SEQUENCE_BITS) |
+                self._sequence
+            )
+
+    def _get_timestamp(self):
+        return int(self.clock() * 1000) - self.EPOCH
+
+    def close(self):
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+
+_default_id_generator = None
+_default_id_generator_lock = threading.Lock()
+
+
+def get_default_id_generator():
+    """
+    Returns the process wide id generator used by clients that are not given one.
+
+    :rtype: SnowflakeIdGenerator
+    """
+    global _default_id_generator
+    with _default_id_generator_lock:
+        if _default_id_generator is None:
+            _default_id_generator = SnowflakeIdGenerator()
+    return _default_id_generator
@@ -0,0 +1,237 @@
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+TAPI_ENDPOINT = 'tapi'
+
+
+class RequestInfo(object):
+    """
+    What is known about one request, filled in as it goes through the client.
+
+    timings holds the seconds spent in each phase: prepare (nonce, signature and body of tapi messages), transport
+    (the transport call), decode (JSON decoding) and total. The transports add finer phases when they can measure
+    them: wait (until the response headers) and download, plus queue, dns and connect (TCP and TLS) with aiohttp.
+    """
+    __slots__ = (
+        'endpoint', 'msg_type', 'method', 'url', 'status', 'request_size', 'response_size', 'timings', 'error',
+        'started_at', '_last_mark',
+    )
+
+    def __init__(self, endpoint, msg_type, method, url, clock=time.perf_counter):
+        """
+        :param endpoint: consts.MarketInformation value, or TAPI_ENDPOINT for authenticated messages
+        :type endpoint: basestring
+        :param msg_type: consts.MessageType of authenticated messages, None for market data
+        :type msg_type: basestring
+        :type method: basestring
+        :type url: basestring
+        """
+        self.endpoint = endpoint
+        self.msg_type = msg_type
+        self.method = method
+        self.url = url
+        self.status = None
+        self.request_size = None
+        self.response_size = None
+        self.timings = {}
+        self.error = None
+        self.started_at = self._last_mark = clock()
+
+    def mark(self, phase, clock=time.perf_counter):
+        """
+        Records the time since the previous mark as the duration of phase.
+
+        :type phase: basestring
+        """
+        now = clock()
+        self.timings[phase] = now - self._last_mark
+        self._last_mark = now
+
+    def set_response(self, status, content, timings=None):
+        """
+        :type status: int
+        :param content: response body
+        :type content: bytes
+        :param timings: phases measured by the transport
+        :type timings: dict
+        """
+        self.status = status
+        self.response_size = len(content)
+        if isinstance(timings, dict):
+            self.timings.update(timings)
+
+    def finish(self, clock=time.perf_counter):
+        self.timings['total'] = clock() - self.started_at
+
+
+class Instrumentation(object):
+    """
+    Hooks called before and after every request of the clients it is given to, plus a built-in latency recorder.
+
+    Pre-request hooks receive the RequestInfo before the request is sent and post-request hooks receive it once the
+    response is decoded or the request failed. Exceptions raised by hooks are logged and never reach the caller.
+    """
+    def __init__(self, recorder=None):
+        """
+        :param recorder: records the total time of each request, a new LatencyRecorder by default
+        :type recorder: LatencyRecorder
+        """
+        self.recorder = recorder if recorder is not None else LatencyRecorder()
+        self.pre_request_hooks = []
+        self.post_request_hooks = []
+
+    def add_pre_request_hook(self, hook):
+        """
+        :param hook: called with the RequestInfo
+        :type hook: callable
+        """
+        self.pre_request_hooks.append(hook)
+
+    def add_post_request_hook(self, hook):
+        """
+        :param hook: called with the RequestInfo
+        :type hook: callable
+        """
+        self.post_request_hooks.append(hook)
+
+    def start(self, endpoint, msg_type, method, url):
+        """
+        :rtype: RequestInfo
+        """
+        info = RequestInfo(endpoint, msg_type, method, url)
+        self._call_hooks(self.pre_request_hooks, info)
+        return info
+
+    def finish(self, info):
+        """
+        :type info: RequestInfo
+        """
+        info.finish()
+        self.recorder.record(info)
+        self._call_hooks(self.post_request_hooks, info)
+
+    @staticmethod
+    def _call_hooks(hooks, info):
+        for hook in hooks:
+            try:
+                hook(info)
+            except Exception:
+                logger.exception('Request hook %r failed', hook)
+
+
+class LatencyHistogram(object):
+    """
+    Log-linear histogram of latencies with a fixed array of counters, in the spirit of HdrHistogram.
+
+    Values are kept in microseconds: exactly below 32us and in 16 buckets per power of two above, so every
+    percentile is within 1/16 (6.25%) of the real value. Recording is a few integer operations under a lock.
+    """
+    SUB_BUCKETS = 16
+    _SUB_BUCKET_BITS = 4
+    _EXACT_LIMIT = 2 * SUB_BUCKETS
+    _MAX_SHIFT = 40
+
+    def __init__(self):
+        self.counts = [0] * (self._EXACT_LIMIT + self._MAX_SHIFT * self.SUB_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        """
+        :type seconds: float
+        """
+        index = self._get_index(int(seconds * 1e6))
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def _get_index(self, micros):
+        if micros < self._EXACT_LIMIT:
+            return max(micros, 0)
+        shift = min(micros.bit_length() - self._SUB_BUCKET_BITS - 1, self._MAX_SHIFT)
+        sub_bucket = min(micros >> shift, self._EXACT_LIMIT - 1) - self.SUB_BUCKETS
+        return self._EXACT_LIMIT + (shift - 1) * self.SUB_BUCKETS + sub_bucket
+
+    def _get_upper_bound(self, index):
+        if index < self._EXACT_LIMIT:
+            return index
+        shift, sub_bucket = divmod(index - self._EXACT_LIMIT, self.SUB_BUCKETS)
+        return ((self.SUB_BUCKETS + sub_bucket + 1) << (shift + 1)) - 1
+
+    def get_percentile(self, percentile):
+        """
+        :param percentile: between 0 and 100
+        :type percentile: float
+        :return: seconds, capped by the maximum recorded value. None when nothing was recorded.
+        :rtype: float
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            rank = max(int(math.ceil(percentile / 100.0 * self.count)), 1)
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= rank:
+                    return min(self._get_upper_bound(index) / 1e6, self.max)
+        return self.max  # pragma: no cover
+
+    def get_stats(self):
+        """
+        :return: count, mean, p50, p90, p99 and max, in seconds
+        :rtype: dict
+        """
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.get_percentile(50),
+            'p90': self.get_percentile(90),
+            'p99': self.get_percentile(99),
+            'max': self.max if self.count else None,
+        }
+
+
+class LatencyRecorder(object):
+    """
+    One LatencyHistogram of total request time per (endpoint, msg_type).
+    """
+    def __init__(self):
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, info):
+        """
+        :type info: RequestInfo
+        """
+        self.get_histogram(info.endpoint, info.msg_type).record(info.timings['total'])
+
+    def get_histogram(self, endpoint, msg_type=None):
+        """
+        :rtype: LatencyHistogram
+        """
+        key = (endpoint, msg_type)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(key, LatencyHistogram())
+        return histogram
+
+    def get_stats(self):
+        """
+        :return: LatencyHistogram.get_stats of each (endpoint, msg_type)
+        :rtype: dict
+        """
+        return {key: histogram.get_stats() for key, histogram in list(self.histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
@@ -0,0 +1,129 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from blinktrade import consts
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+def get_time_nonce():
+    """
+    Nonce candidate taken from the clock, with the same scale as the nonces the client has always sent.
+
+    :rtype: int
+    """
+    dt = datetime.utcnow()
+    return int(
+        (time.mktime(dt.utctimetuple()) + dt.microsecond / float(consts.NONCE_PRECISION)) * consts.NONCE_PRECISION
+    )
+
+
+class MonotonicNonceProvider(object):
+    """
+    Nonces that are strictly increasing for every thread of the process: the clock value, or the last nonce plus one
+    when the clock did not move or went backwards.
+    """
+    def __init__(self):
+        self._last_nonce = 0
+        self._lock = threading.Lock()
+
+    def get_nonce(self):
+        """
+        :rtype: str
+        """
+        candidate = get_time_nonce()
+        with self._lock:
+            self._last_nonce = max(candidate, self._last_nonce + 1)
+            return str(self._last_nonce)
+
+
+class SharedNonceProvider(object):
+    """
+    Nonces that are strictly increasing for every process of the host using the same API key.
+
+    The last nonce is kept in an 8 bytes memory-mapped file. Each nonce is a read-modify-write of that counter under
+    an flock, which costs a couple of system calls and no file I/O, as the page stays in memory.
+    """
+    FILE_PATTERN = 'blinktrade-nonce-{}.bin'
+    _COUNTER = struct.Struct('<Q')
+
+    def __init__(self, key, path=None):
+        """
+        :param key: API key, used to name the counter file so that every process using the key shares it
+        :type key: basestring
+        :param path: counter file, defaults to a file named after the key in the system temporary directory
+        :type path: basestring
+        """
+        if fcntl is None:
+            raise RuntimeError('SharedNonceProvider requires fcntl, which is not available on this platform')
+        self.path = path or os.path.join(
+            tempfile.gettempdir(), self.FILE_PATTERN.format(hashlib.sha256(key.encode('utf-8')).hexdigest()[:16])
+        )
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+        self._pid = None
+        self._open()
+
+    def _open(self):
+        self.close()
+        self._pid = os.getpid()
+        self._file = open(self.path, 'a+b')
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._file.fileno()).st_size < self._COUNTER.size:
+                self._file.truncate(self._COUNTER.size)
+        finally:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._file.fileno(), self._COUNTER.size)
+
+    def get_nonce(self):
+        """
+        :rtype: str
+        """
+        candidate = get_time_nonce()
+        with self._lock:
+            if os.getpid() != self._pid:
+                # flock is held per open file, so a forked child must not keep using the parent's one
+                self._open()
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            try:
+                nonce = max(candidate, self._COUNTER.unpack_from(self._map)[0] + 1)
+                self._COUNTER.pack_into(self._map, 0, nonce)
+            finally:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        return str(nonce)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+_monotonic_providers = {}
+_monotonic_providers_lock = threading.Lock()
+
+
+def get_monotonic_nonce_provider(key):
+    """
+    Returns the process wide MonotonicNonceProvider of an API key, so every client using the key shares it.
+
+    :type key: basestring
+    :rtype: MonotonicNonceProvider
+    """
+    with _monotonic_providers_lock:
+        if key not in _monotonic_providers:
+            _monotonic_providers[key] = MonotonicNonceProvider()
+        return _monotonic_providers[key]
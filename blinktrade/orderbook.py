@@ -0,0 +1,354 @@
+import array
+import bisect
+import itertools
+from collections import namedtuple
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+class BookSide(object):
+    """
+    One side of an order book stored as contiguous numeric arrays, sorted from the best level to the worst one.
+
+    NumPy arrays are used when NumPy is installed and array.array otherwise. Cumulative quantity and notional are
+    computed once, on the first query that needs them, so every query after that is a binary search.
+    """
+    BIDS = 'bids'
+    ASKS = 'asks'
+
+    def __init__(self, side, rows):
+        """
+        :param side: BookSide.BIDS or BookSide.ASKS
+        :type side: basestring
+        :param rows: [[price, quantity, user_id], ...] as returned by OpenClient.get_order_book
+        :type rows: list[list]
+        """
+        self.side = side
+        self.prices, self.quantities, self.user_ids = self._make_columns(side, rows)
+        self._search_keys = None
+        self._cumulative_quantities = None
+        self._cumulative_notionals = None
+
+    @staticmethod
+    def _make_columns(side, rows):
+        reverse = side == BookSide.BIDS
+        if numpy is not None:
+            matrix = numpy.array(rows, dtype=numpy.float64).reshape(-1, 3)
+            order = numpy.argsort(-matrix[:, 0] if reverse else matrix[:, 0], kind='stable')
+            matrix = matrix[order]
+            return matrix[:, 0].copy(), matrix[:, 1].copy(), matrix[:, 2].astype(numpy.int64)
+        rows = sorted(rows, key=lambda row: row[0], reverse=reverse)
+        return (
+            array.array('d', [row[0] for row in rows]),
+            array.array('d', [row[1] for row in rows]),
+            array.array('q', [int(row[2]) for row in rows]),
+        )
+
+    def __len__(self):
+        return len(self.prices)
+
+    @property
+    def search_keys(self):
+        """
+        Prices as an ascending sequence: asks prices as they are and bids prices negated.
+        """
+        if self._search_keys is None:
+            if self.side == BookSide.ASKS:
+                self._search_keys = self.prices
+            elif numpy is not None:
+                self._search_keys = -self.prices
+            else:
+                self._search_keys = array.array('d', [-price for price in self.prices])
+        return self._search_keys
+
+    @property
+    def cumulative_quantities(self):
+        if self._cumulative_quantities is None:
+            self._cumulative_quantities = _cumsum(self.quantities)
+        return self._cumulative_quantities
+
+    @property
+    def cumulative_notionals(self):
+        if self._cumulative_notionals is None:
+            if numpy is not None:
+                self._cumulative_notionals = numpy.cumsum(self.prices * self.quantities)
+            else:
+                self._cumulative_notionals = _cumsum(p * q for p, q in zip(self.prices, self.quantities))
+        return self._cumulative_notionals
+
+    @property
+    def best_price(self):
+        return float(self.prices[0]) if len(self) else None
+
+    def count_levels_to_price(self, price):
+        """
+        Number of levels at least as good as the given price.
+
+        :type price: float
+        :rtype: int
+        """
+        key = price if self.side == BookSide.ASKS else -price
+        return _searchsorted(self.search_keys, key, 'right')
+
+    def depth(self, levels=None, price=None):
+        """
+        Cumulative quantity of the first N levels or of every level up to a price. The whole side when both are None.
+
+        :type levels: int
+        :type price: float
+        :rtype: float
+        """
+        count = len(self)
+        if levels is not None:
+            count = min(count, levels)
+        if price is not None:
+            count = min(count, self.count_levels_to_price(price))
+        if count <= 0:
+            return 0.0
+        return float(self.cumulative_quantities[count - 1])
+
+    def vwap(self, quantity):
+        """
+        Average price paid to fill the given quantity against this side, or None if there is not enough liquidity.
+
+        :type quantity: float
+        :rtype: float
+        """
+        if quantity <= 0:
+            raise ValueError('Quantity must be greater than zero')
+        index = _searchsorted(self.cumulative_quantities, quantity, 'left')
+        if index >= len(self):
+            return None
+        quantity_before = float(self.cumulative_quantities[index - 1]) if index else 0.0
+        notional_before = float(self.cumulative_notionals[index - 1]) if index else 0.0
+        notional = notional_before + float(self.prices[index]) * (quantity - quantity_before)
+        return notional / quantity
+
+    def slippage(self, quantity):
+        """
+        Price distance between the best level and the average fill price of the given quantity. Always positive.
+
+        :type quantity: float
+        :rtype: float
+        """
+        vwap = self.vwap(quantity)
+        if vwap is None:
+            return None
+        return abs(vwap - self.best_price)
+
+
+class OrderBook(object):
+    """
+    Array-backed order book built from the dict returned by OpenClient.get_order_book.
+    """
+    def __init__(self, pair, bids, asks):
+        """
+        :type pair: basestring
+        :type bids: list[list]
+        :type asks: list[list]
+        """
+        self.pair = pair
+        self.bids = BookSide(BookSide.BIDS, bids)
+        self.asks = BookSide(BookSide.ASKS, asks)
+
+    @classmethod
+    def from_response(cls, response):
+        """
+        :type response: dict
+        :rtype: OrderBook
+        """
+        return cls(response.get('pair'), response.get('bids') or [], response.get('asks') or [])
+
+    def get_side(self, side):
+        """
+        :param side: BookSide.BIDS or BookSide.ASKS
+        :rtype: BookSide
+        """
+        if side == BookSide.BIDS:
+            return self.bids
+        if side == BookSide.ASKS:
+            return self.asks
+        raise ValueError('Invalid side. Valid options are: {}'.format([BookSide.BIDS, BookSide.ASKS]))
+
+    @property
+    def best_bid(self):
+        return self.bids.best_price
+
+    @property
+    def best_ask(self):
+        return self.asks.best_price
+
+    @property
+    def spread(self):
+        if self.best_bid is None or self.best_ask is None:
+            return None
+        return self.best_ask - self.best_bid
+
+    @property
+    def mid_price(self):
+        if self.best_bid is None or self.best_ask is None:
+            return None
+        return (self.best_ask + self.best_bid) / 2
+
+    def depth(self, side, levels=None, price=None):
+        return self.get_side(side).depth(levels, price)
+
+    def vwap(self, side, quantity):
+        return self.get_side(side).vwap(quantity)
+
+    def slippage(self, side, quantity):
+        return self.get_side(side).slippage(quantity)
+
+    def imbalance(self, levels=None):
+        """
+        (bid depth - ask depth) / (bid depth + ask depth) over the first N levels, between -1 and 1.
+
+        :type levels: int
+        :rtype: float
+        """
+        bid_depth = self.bids.depth(levels)
+        ask_depth = self.asks.depth(levels)
+        total = bid_depth + ask_depth
+        if not total:
+            return 0.0
+        return (bid_depth - ask_depth) / total
+
+
+class OrderBookDelta(namedtuple('OrderBookDelta', ['side', 'action', 'price', 'quantity'])):
+    """
+    Change of a single price level. quantity is the new aggregated quantity of the level, 0 when it was removed.
+    """
+    __slots__ = ()
+
+    ADD = 'add'
+    REMOVE = 'remove'
+    UPDATE = 'update'
+
+
+class LocalOrderBook(object):
+    """
+    Stateful order book that is fed with successive get_order_book snapshots and emits only the levels that changed.
+
+    Each side keeps the aggregated quantity per price in a dict and the prices in a sorted list, so applying a delta
+    costs a dict update plus a binary search, and the previous snapshot does not need to be kept around.
+    """
+    def __init__(self, pair=None):
+        """
+        :type pair: basestring
+        """
+        self.pair = pair
+        self.version = 0
+        self._quantities = {BookSide.BIDS: {}, BookSide.ASKS: {}}
+        self._prices = {BookSide.BIDS: [], BookSide.ASKS: []}
+
+    def sync(self, client):
+        """
+        :type client: blinktrade.clients.OpenClient
+        :rtype: list[OrderBookDelta]
+        """
+        return self.update(client.get_order_book())
+
+    def update(self, snapshot):
+        """
+        Applies a new snapshot and returns the level changes against the previous one.
+
+        :param snapshot: dict returned by OpenClient.get_order_book
+        :type snapshot: dict
+        :rtype: list[OrderBookDelta]
+        """
+        self.pair = snapshot.get('pair', self.pair)
+        deltas = []
+        for side in (BookSide.BIDS, BookSide.ASKS):
+            deltas.extend(self._update_side(side, snapshot.get(side) or []))
+        self.version += 1
+        return deltas
+
+    def _update_side(self, side, rows):
+        new_quantities = {}
+        for row in rows:
+            new_quantities[row[0]] = new_quantities.get(row[0], 0) + row[1]
+
+        quantities = self._quantities[side]
+        prices = self._prices[side]
+        deltas = []
+        for price in [price for price in quantities if price not in new_quantities]:
+            del quantities[price]
+            del prices[bisect.bisect_left(prices, price)]
+            deltas.append(OrderBookDelta(side, OrderBookDelta.REMOVE, price, 0))
+        for price, quantity in new_quantities.items():
+            previous_quantity = quantities.get(price)
+            if previous_quantity is None:
+                bisect.insort(prices, price)
+                deltas.append(OrderBookDelta(side, OrderBookDelta.ADD, price, quantity))
+            elif previous_quantity != quantity:
+                deltas.append(OrderBookDelta(side, OrderBookDelta.UPDATE, price, quantity))
+            quantities[price] = quantity
+        return deltas
+
+    def apply(self, deltas):
+        """
+        Applies deltas emitted by another LocalOrderBook, so a replica can be kept without full snapshots.
+
+        :type deltas: list[OrderBookDelta]
+        """
+        for delta in deltas:
+            quantities = self._quantities[delta.side]
+            prices = self._prices[delta.side]
+            if delta.action == OrderBookDelta.REMOVE:
+                del quantities[delta.price]
+                del prices[bisect.bisect_left(prices, delta.price)]
+                continue
+            if delta.price not in quantities:
+                bisect.insort(prices, delta.price)
+            quantities[delta.price] = delta.quantity
+        self.version += 1
+
+    def get_levels(self, side, levels=None):
+        """
+        Aggregated levels of a side from the best price to the worst one.
+
+        :type side: basestring
+        :type levels: int
+        :rtype: list[tuple]
+        """
+        prices = self._prices[side]
+        ordered_prices = reversed(prices) if side == BookSide.BIDS else iter(prices)
+        quantities = self._quantities[side]
+        return [(price, quantities[price]) for price in itertools.islice(ordered_prices, levels)]
+
+    @property
+    def best_bid(self):
+        prices = self._prices[BookSide.BIDS]
+        return prices[-1] if prices else None
+
+    @property
+    def best_ask(self):
+        prices = self._prices[BookSide.ASKS]
+        return prices[0] if prices else None
+
+    def to_order_book(self):
+        """
+        :rtype: OrderBook
+        """
+        return OrderBook(
+            self.pair,
+            [[price, quantity, 0] for price, quantity in self.get_levels(BookSide.BIDS)],
+            [[price, quantity, 0] for price, quantity in self.get_levels(BookSide.ASKS)],
+        )
+
+
+def _cumsum(values):
+    if numpy is not None:
+        return numpy.cumsum(values)
+    return array.array('d', itertools.accumulate(values))
+
+
+def _searchsorted(sorted_values, value, side):
+    if numpy is not None:
+        return int(numpy.searchsorted(sorted_values, value, side=side))
+    if side == 'left':
+        return bisect.bisect_left(sorted_values, value)
+    return bisect.bisect_right(sorted_values, value)
@@ -0,0 +1,241 @@
+import threading
+import time
+from collections import namedtuple
+
+from blinktrade import consts
+from blinktrade.tables import OrderRow
+
+OPEN_ORDER_STATUSES = frozenset([
+    consts.OrderStatus.NEW, consts.OrderStatus.PARTIALLY_FILL, consts.OrderStatus.PENDING_NEW,
+])
+
+
+class OrderChange(namedtuple('OrderChange', ['action', 'cl_ord_id', 'order'])):
+    """
+    Change of a single open order. order is the last known state, also when the order was removed.
+    """
+    __slots__ = ()
+
+    ADD = 'add'
+    REMOVE = 'remove'
+    UPDATE = 'update'
+
+
+class _Entry(object):
+    __slots__ = ('order', 'order_id', 'price_key', 'version')
+
+    def __init__(self, order, order_id, price_key, version):
+        self.order = order
+        self.order_id = order_id
+        self.price_key = price_key
+        self.version = version
+
+
+class OpenOrderCache(object):
+    """
+    Open orders of an account kept in process, so they can be read without polling get_pending_orders.
+
+    AuthClient updates it from the execution reports of every place and cancel order response and from the rows of
+    every get orders response. Orders are indexed by ClOrdID, by OrderID and by (Side, Price), so every lookup is a
+    dict access. Orders filled or cancelled by other means are only noticed by reconcile, which should be called every
+    reconcile_interval seconds, see is_reconcile_due.
+    """
+    DEFAULT_RECONCILE_INTERVAL = 30.0
+
+    def __init__(self, reconcile_interval=DEFAULT_RECONCILE_INTERVAL, clock=time.monotonic):
+        """
+        :param reconcile_interval: seconds between two reconciliations with get_pending_orders
+        :type reconcile_interval: float
+        """
+        self.reconcile_interval = reconcile_interval
+        self.clock = clock
+        self.version = 0
+        self.reconciled_at = None
+        self._entries = {}
+        self._cl_ord_ids = {}
+        self._by_price = {}
+        self._removed = {}
+        self._reconciles = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, cl_ord_id):
+        return str(cl_ord_id) in self._entries
+
+    def __iter__(self):
+        return iter([entry.order for entry in list(self._entries.values())])
+
+    def get(self, cl_ord_id):
+        """
+        :rtype: dict
+        """
+        entry = self._entries.get(str(cl_ord_id))
+        return entry.order if entry is not None else None
+
+    def get_by_order_id(self, order_id):
+        """
+        :rtype: dict
+        """
+        cl_ord_id = self._cl_ord_ids.get(order_id)
+        return self.get(cl_ord_id) if cl_ord_id is not None else None
+
+    def get_orders_at_price(self, side, price):
+        """
+        :param side: consts.OrderSide value
+        :type side: basestring
+        :type price: float | int
+        :return: open orders of the side at price, in the order they were first seen
+        :rtype: list[dict]
+        """
+        return list(self._by_price.get((side, price), {}).values())
+
+    def update(self, order):
+        """
+        Stores an order seen in a response, or removes it when it is no longer open.
+
+        :param order: execution report or order status row, as returned by AuthClient
+        :type order: collections.Mapping
+        :return: None when nothing changed
+        :rtype: OrderChange
+        """
+        with self._lock:
+            return self._update(order)
+
+    def update_orders(self, orders):
+        """
+        :param orders: items returned by AuthClient order methods. Balances are ignored.
+        :type orders: list
+        :rtype: list[OrderChange]
+        """
+        with self._lock:
+            changes = [self._update(order) for order in orders if 'OrdStatus' in order]
+        return [change for change in changes if change is not None]
+
+    def is_reconcile_due(self):
+        """
+        :rtype: bool
+        """
+        return self.reconciled_at is None or self.clock() - self.reconciled_at >= self.reconcile_interval
+
+    def reconcile(self, client, page_size=50):
+        """
+        Reads every pending order and removes the cached orders that are not pending anymore. Orders updated or
+        removed while the pending orders were being read are left as they are, as the listing may predate them.
+
+        :type client: blinktrade.clients.AuthClient
+        :type page_size: int
+        :rtype: list[OrderChange]
+        """
+        started_version, started_at = self._start_reconcile()
+        try:
+            pending_orders = list(client.iter_pending_orders(page_size))
+            return self._finish_reconcile(pending_orders, started_version, started_at)
+        finally:
+            self._end_reconcile()
+
+    def _start_reconcile(self):
+        with self._lock:
+            # removals are remembered while a reconciliation runs, so its listing cannot bring them back
+            self._reconciles += 1
+            return self.version, self.clock()
+
+    def _end_reconcile(self):
+        with self._lock:
+            self._reconciles -= 1
+            if not self._reconciles:
+                self._removed = {}
+
+    def _finish_reconcile(self, pending_orders, started_version, started_at):
+        with self._lock:
+            changes = []
+            pending_cl_ord_ids = set()
+            for order in pending_orders:
+                cl_ord_id = self._get_cl_ord_id(order)
+                pending_cl_ord_ids.add(cl_ord_id)
+                if self._get_version(cl_ord_id) <= started_version:
+                    changes.append(self._update(order))
+            for cl_ord_id, entry in list(self._entries.items()):
+                if cl_ord_id not in pending_cl_ord_ids and entry.version <= started_version:
+                    changes.append(self._remove(cl_ord_id))
+            self.reconciled_at = started_at
+        return [change for change in changes if change is not None]
+
+    def _get_version(self, cl_ord_id):
+        """
+        Version of the last update or removal of the order, 0 when it was never seen or is too old to matter.
+        """
+        entry = self._entries.get(cl_ord_id)
+        return entry.version if entry is not None else self._removed.get(cl_ord_id, 0)
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._cl_ord_ids = {}
+            self._by_price = {}
+            self._removed = {}
+            self.reconciled_at = None
+
+    def _update(self, order):
+        if isinstance(order, OrderRow):
+            order = order.to_dict()
+        cl_ord_id = self._get_cl_ord_id(order)
+        if cl_ord_id is None:
+            return None
+        if not self._is_open(order):
+            return self._remove(cl_ord_id)
+        previous = self._entries.get(cl_ord_id)
+        if cl_ord_id in self._removed or self._is_stale(order, previous):
+            # closed orders never reopen and filled quantities never shrink: the row predates what is known
+            return None
+
+        self.version += 1
+        if previous is not None:
+            self._unindex(cl_ord_id, previous)
+        entry = _Entry(order, order.get('OrderID'), (order.get('Side'), order.get('Price')), self.version)
+        self._entries[cl_ord_id] = entry
+        if entry.order_id is not None:
+            self._cl_ord_ids[entry.order_id] = cl_ord_id
+        self._by_price.setdefault(entry.price_key, {})[cl_ord_id] = order
+        return OrderChange(OrderChange.ADD if previous is None else OrderChange.UPDATE, cl_ord_id, order)
+
+    def _remove(self, cl_ord_id):
+        entry = self._entries.pop(cl_ord_id, None)
+        if entry is None:
+            return None
+        self.version += 1
+        self._unindex(cl_ord_id, entry)
+        if self._reconciles:
+            self._removed[cl_ord_id] = self.version
+        return OrderChange(OrderChange.REMOVE, cl_ord_id, entry.order)
+
+    def _unindex(self, cl_ord_id, entry):
+        if self._cl_ord_ids.get(entry.order_id) == cl_ord_id:
+            del self._cl_ord_ids[entry.order_id]
+        orders = self._by_price.get(entry.price_key)
+        if orders is not None:
+            orders.pop(cl_ord_id, None)
+            if not orders:
+                del self._by_price[entry.price_key]
+
+    def _get_cl_ord_id(self, order):
+        """
+        ClOrdID of the order, looked up by OrderID for execution reports that do not carry the original one.
+        """
+        order_id = order.get('OrderID')
+        if order_id in self._cl_ord_ids:
+            return self._cl_ord_ids[order_id]
+        cl_ord_id = order.get('ClOrdID')
+        return str(cl_ord_id) if cl_ord_id is not None else None
+
+    @staticmethod
+    def _is_stale(order, previous):
+        if previous is None:
+            return False
+        cum_qty, previous_cum_qty = order.get('CumQty'), previous.order.get('CumQty')
+        return cum_qty is not None and previous_cum_qty is not None and cum_qty < previous_cum_qty
+
+    @staticmethod
+    def _is_open(order):
+        return order.get('OrdStatus') in OPEN_ORDER_STATUSES and order.get('LeavesQty') != 0
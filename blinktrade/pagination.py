@@ -0,0 +1,101 @@
+import threading
+from queue import Full, Queue
+
+
+class Page(list):
+    """
+    Items of a page together with the page size applied by the server, which may be lower than the requested one.
+    """
+    def __init__(self, items=(), page_size=None):
+        """
+        :type items: collections.Iterable
+        :type page_size: int
+        """
+        super(Page, self).__init__(items)
+        self.page_size = page_size
+
+
+class PageIterator(object):
+    """
+    Iterates over every item of a paginated call, fetching the next pages in a background thread.
+
+    Up to prefetch pages are fetched while the caller is still consuming the current one, so network latency overlaps
+    with processing and memory is bounded to prefetch + 1 pages. Iteration stops after an empty page or a page
+    holding fewer items than its page size: the one of the Page when fetch_page returns one, page_size otherwise.
+    """
+    _DONE = object()
+
+    def __init__(self, fetch_page, page_size=50, prefetch=1, first_page=0):
+        """
+        :param fetch_page: callable receiving (page, page_size) and returning a list or a Page of items
+        :type fetch_page: callable
+        :type page_size: int
+        :param prefetch: number of pages fetched ahead. 0 fetches each page only when it is needed.
+        :type prefetch: int
+        :type first_page: int
+        """
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.first_page = first_page
+
+    def __iter__(self):
+        pages = self._iter_prefetched_pages() if self.prefetch > 0 else self._iter_pages()
+        for items in pages:
+            for item in items:
+                yield item
+
+    def _iter_pages(self):
+        page = self.first_page
+        while True:
+            items = self.fetch_page(page, self.page_size)
+            yield items
+            if self._is_last_page(items):
+                return
+            page += 1
+
+    def _is_last_page(self, items):
+        page_size = getattr(items, 'page_size', None) or self.page_size
+        return not items or len(items) < page_size
+
+    def _iter_prefetched_pages(self):
+        pages = Queue(maxsize=self.prefetch)
+        stopped = threading.Event()
+        worker = threading.Thread(target=self._fetch_pages, args=(pages, stopped))
+        worker.daemon = True
+        worker.start()
+        try:
+            while True:
+                items, error = pages.get()
+                if error is not None:
+                    raise error
+                if items is self._DONE:
+                    return
+                yield items
+        finally:
+            stopped.set()
+            while not pages.empty():
+                pages.get_nowait()
+
+    def _fetch_pages(self, pages, stopped):
+        page = self.first_page
+        while not stopped.is_set():
+            try:
+                items = self.fetch_page(page, self.page_size)
+            except Exception as e:
+                self._put(pages, (None, e), stopped)
+                return
+            self._put(pages, (items, None), stopped)
+            if self._is_last_page(items):
+                self._put(pages, (self._DONE, None), stopped)
+                return
+            page += 1
+
+    @staticmethod
+    def _put(pages, value, stopped):
+        while not stopped.is_set():
+            try:
+                pages.put(value, timeout=0.1)
+                return
+            except Full:
+                continue
@@ -0,0 +1,119 @@
+import threading
+from collections.abc import Mapping
+
+
+class Record(Mapping):
+    """
+    Compact read-mostly record with __slots__ and a dict compatible interface.
+
+    The API returns different keys for the same kind of result (the volume key of a ticker depends on the currency,
+    the balance keys on the currencies of the broker), so from_dict builds and caches one slotted subclass per set of
+    keys. Keys that cannot be slots, like the ones that are not identifiers, are kept in a small dict instead.
+    """
+    __slots__ = ('_extra',)
+    FIELDS = ()
+    _FIELD_SET = frozenset()
+    _BASE = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        :type data: dict
+        :rtype: Record
+        """
+        base = cls._BASE or cls
+        record_class = get_record_class(base, tuple(key for key in data if base._is_slot_name(key)))
+        record = record_class.__new__(record_class)
+        record._extra = None
+        for key, value in data.items():
+            record[key] = value
+        return record
+
+    @classmethod
+    def _is_slot_name(cls, key):
+        return isinstance(key, str) and key.isidentifier() and not hasattr(Record, key) and not key.startswith('_')
+
+    def __getitem__(self, key):
+        if key in self._FIELD_SET:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __iter__(self):
+        for field in self.FIELDS:
+            yield field
+        if self._extra is not None:
+            for key in self._extra:
+                yield key
+
+    def __len__(self):
+        return len(self.FIELDS) + (len(self._extra) if self._extra is not None else 0)
+
+    def to_dict(self):
+        """
+        :rtype: dict
+        """
+        return dict(self.items())
+
+    def __reduce__(self):
+        return _make_record, (self._BASE or type(self), self.to_dict())
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.to_dict())
+
+
+class Ticker(Record):
+    __slots__ = ()
+
+
+class Trade(Record):
+    __slots__ = ()
+
+
+class Balance(Record):
+    __slots__ = ()
+
+
+class Order(Record):
+    __slots__ = ()
+
+
+_record_classes = {}
+_record_classes_lock = threading.Lock()
+
+
+def get_record_class(base, fields):
+    """
+    Returns the subclass of base with a slot for each field, creating it on the first call.
+
+    :type base: type
+    :type fields: tuple[basestring]
+    :rtype: type
+    """
+    key = (base, fields)
+    record_class = _record_classes.get(key)
+    if record_class is None:
+        with _record_classes_lock:
+            record_class = _record_classes.get(key)
+            if record_class is None:
+                record_class = type(base.__name__, (base,), {
+                    '__slots__': fields,
+                    'FIELDS': fields,
+                    '_FIELD_SET': frozenset(fields),
+                    '_BASE': base,
+                })
+                _record_classes[key] = record_class
+    return record_class
+
+
+def _make_record(base, data):
+    return base.from_dict(data)
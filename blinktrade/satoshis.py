@@ -0,0 +1,50 @@
+import numbers
+from decimal import Decimal
+
+from blinktrade import consts
+
+_PRECISION = Decimal(consts.SATOSHI_PRECISION)
+
+
+def to_satoshis(value):
+    """
+    Exact conversion of an amount to integer satoshis.
+
+    Floats are converted through their shortest representation, so 0.0313 is 3130000 satoshis and not the 3129999
+    a float multiplication may truncate to. Amounts with more than 8 decimal places are rejected instead of rounded.
+
+    :type value: int | float | decimal.Decimal | basestring
+    :rtype: int
+    """
+    if value is None:
+        return None
+    if isinstance(value, numbers.Integral):
+        return int(value) * consts.SATOSHI_PRECISION
+    satoshis = Decimal(str(value) if isinstance(value, float) else value) * _PRECISION
+    if satoshis != satoshis.to_integral_value():
+        raise ValueError('{} has more than 8 decimal places'.format(value))
+    return int(satoshis)
+
+
+def from_satoshis(satoshis):
+    """
+    Exact conversion of integer satoshis to a Decimal amount.
+
+    :type satoshis: int
+    :rtype: decimal.Decimal
+    """
+    if satoshis is None:
+        return None
+    return Decimal(satoshis).scaleb(-8)
+
+
+def validate_satoshis(value):
+    """
+    :type value: int
+    :rtype: int
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, numbers.Integral):
+        raise TypeError('Expected integer satoshis, got {!r}. Convert it with to_satoshis'.format(value))
+    return int(value)
@@ -0,0 +1,217 @@
+import bisect
+import itertools
+import threading
+import time
+
+from blinktrade import consts, exceptions
+from blinktrade.instrumentation import LatencyHistogram
+
+DEFAULT_PRIORITIES = {
+    consts.MessageType.CANCEL_ORDER: 0,
+    consts.MessageType.PLACE_ORDER: 1,
+    consts.MessageType.GET_ORDERS: 2,
+    consts.MessageType.BALANCE: 2,
+}
+LOWEST_PRIORITY = 3
+
+
+class TokenBucket(object):
+    """
+    Allows rate requests per second on average and bursts of up to capacity requests. Not thread safe on its own.
+    """
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        """
+        :param rate: tokens added per second
+        :type rate: float
+        :param capacity: maximum number of tokens, rate by default
+        :type capacity: float
+        """
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated_at = clock()
+
+    def get_wait(self, now=None):
+        """
+        :return: seconds until a token is available, 0 when there is one now
+        :rtype: float
+        """
+        self._refill(self.clock() if now is None else now)
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def consume(self, now=None):
+        self._refill(self.clock() if now is None else now)
+        self._tokens -= 1
+
+    def _refill(self, now):
+        if now > self._updated_at:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+
+class _Entry(object):
+    __slots__ = ('sort_key', 'msg_type', 'queued_at', 'granted', 'event')
+
+    def __init__(self, sort_key, msg_type, queued_at):
+        self.sort_key = sort_key
+        self.msg_type = msg_type
+        self.queued_at = queued_at
+        self.granted = False
+        self.event = None
+
+    def __lt__(self, other):
+        return self.sort_key < other.sort_key
+
+
+class RequestScheduler(object):
+    """
+    Client side rate limiter of the tapi messages of one API key, to be shared by every client using the key.
+
+    Each message takes a token from the bucket of the key and, when a limit is configured for its MsgType, from the
+    bucket of the MsgType. While tokens are missing the messages wait in a bounded queue ordered by priority, by
+    default cancels first, then new orders, then order listings and balances. Messages of the same priority keep
+    their order, and a message whose MsgType bucket is empty does not hold back the ones behind it.
+    """
+    DEFAULT_RATE = 10.0
+    DEFAULT_MAX_QUEUE_DEPTH = 100
+
+    def __init__(self, rate=DEFAULT_RATE, burst=None, msg_type_limits=None, max_queue_depth=DEFAULT_MAX_QUEUE_DEPTH,
+                 priorities=None, clock=time.monotonic):
+        """
+        :param rate: messages per second allowed for the key
+        :type rate: float
+        :param burst: messages that can be sent at once after being idle, rate by default
+        :type burst: float
+        :param msg_type_limits: (rate, burst) of the MsgTypes with their own limit
+        :type msg_type_limits: dict
+        :param max_queue_depth: messages waiting at the same time before RequestQueueFullException is raised
+        :type max_queue_depth: int
+        :param priorities: priority of each MsgType, lower first. DEFAULT_PRIORITIES by default.
+        :type priorities: dict
+        """
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.msg_type_buckets = {
+            msg_type: TokenBucket(msg_type_rate, msg_type_burst, clock)
+            for msg_type, (msg_type_rate, msg_type_burst) in (msg_type_limits or {}).items()
+        }
+        self.max_queue_depth = max_queue_depth
+        self.priorities = DEFAULT_PRIORITIES if priorities is None else priorities
+        self.clock = clock
+        self.dispatched = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self.queue_waits = {}
+        self._queue = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+
+    def run(self, msg_type, send):
+        """
+        Waits for the turn of the message and calls send.
+
+        :param msg_type: consts.MessageType of the message
+        :type msg_type: basestring
+        :type send: callable
+        :return: what send returns
+        """
+        with self._condition:
+            entry = self._enqueue(msg_type)
+            try:
+                while not entry.granted:
+                    wait = self._dispatch()
+                    if not entry.granted:
+                        self._condition.wait(wait)
+            except BaseException:
+                self._remove(entry)
+                raise
+        self._record_wait(entry)
+        return send()
+
+    def get_depth(self):
+        """
+        :rtype: int
+        """
+        return len(self._queue)
+
+    def get_stats(self):
+        """
+        :return: current and maximum queue depth, dispatched and rejected messages and the queue wait statistics of
+            each MsgType
+        :rtype: dict
+        """
+        return {
+            'depth': self.get_depth(),
+            'max_depth': self.max_depth,
+            'dispatched': self.dispatched,
+            'rejected': self.rejected,
+            'queue_wait': {msg_type: histogram.get_stats() for msg_type, histogram in list(self.queue_waits.items())},
+        }
+
+    def _enqueue(self, msg_type):
+        if len(self._queue) >= self.max_queue_depth:
+            self.rejected += 1
+            raise exceptions.RequestQueueFullException(
+                'Too many messages waiting to be sent', {'depth': len(self._queue), 'msg_type': msg_type},
+            )
+        priority = self.priorities.get(msg_type, LOWEST_PRIORITY)
+        entry = _Entry((priority, next(self._sequence)), msg_type, self.clock())
+        bisect.insort(self._queue, entry)
+        self.max_depth = max(self.max_depth, len(self._queue))
+        return entry
+
+    def _remove(self, entry):
+        if entry in self._queue:
+            self._queue.remove(entry)
+            self._wake_all()
+
+    def _dispatch(self):
+        """
+        Grants every message that can be sent now, in priority order. Must be called with the lock held.
+
+        :return: seconds until the next message may be granted, None when the queue is empty
+        :rtype: float
+        """
+        now = self.clock()
+        next_wait = None
+        granted = False
+        for entry in list(self._queue):
+            wait = self.bucket.get_wait(now)
+            if wait > 0:
+                next_wait = wait if next_wait is None else min(next_wait, wait)
+                break
+            msg_type_bucket = self.msg_type_buckets.get(entry.msg_type)
+            if msg_type_bucket is not None:
+                wait = msg_type_bucket.get_wait(now)
+                if wait > 0:
+                    next_wait = wait if next_wait is None else min(next_wait, wait)
+                    continue
+                msg_type_bucket.consume(now)
+            self.bucket.consume(now)
+            self._queue.remove(entry)
+            self._grant(entry)
+            granted = True
+        if granted:
+            self._wake_all()
+        return next_wait
+
+    def _grant(self, entry):
+        entry.granted = True
+        self.dispatched += 1
+        if entry.event is not None:
+            entry.event.set()
+
+    def _wake_all(self):
+        self._condition.notify_all()
+        for entry in self._queue:
+            if entry.event is not None:
+                entry.event.set()
+
+    def _record_wait(self, entry):
+        histogram = self.queue_waits.get(entry.msg_type)
+        if histogram is None:
+            histogram = self.queue_waits.setdefault(entry.msg_type, LatencyHistogram())
+        histogram.record(max(self.clock() - entry.queued_at, 0.0))
@@ -0,0 +1,70 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from blinktrade import consts
+from blinktrade.clients import OpenClient
+from blinktrade.transports import HttpTransport
+
+
+class MarketSnapshotClient(object):
+    """
+    Fetches ticker, order book and trades of several markets at once.
+
+    Every request runs in a bounded thread pool over a single shared transport, so the wall-clock time of a snapshot
+    is close to the slowest request instead of the sum of all of them.
+    """
+    OPEN_CLIENT_CLASS = OpenClient
+
+    def __init__(self, environment_type, broker, currencies=None, max_workers=6, transport=None):
+        """
+        :type environment_type: basestring
+        :type broker: basestring
+        :param currencies: defaults to every currency in consts.CURRENCIES_CHOICES
+        :type currencies: list[basestring]
+        :param max_workers: maximum number of requests in flight
+        :type max_workers: int
+        :type transport: blinktrade.transports.HttpTransport
+        """
+        self.max_workers = max_workers
+        self.transport = transport or self._make_default_transport()
+        currencies = currencies or sorted(consts.CURRENCIES_CHOICES)
+        self.clients = {
+            currency: self.OPEN_CLIENT_CLASS(environment_type, currency, broker, transport=self.transport)
+            for currency in currencies
+        }
+
+    def _make_default_transport(self):
+        return HttpTransport(pool_size=self.max_workers)
+
+    def get_snapshot(self, since_ts=0):
+        """
+        :param since_ts: timestamp passed to get_trade_list
+        :type since_ts: long
+        :return: {'timestamp': float, 'markets': {currency: {'ticker': dict, 'order_book': dict, 'trades': list}}}
+        :rtype: dict
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                (currency, name): executor.submit(func, *args)
+                for currency, client in self.clients.items()
+                for name, func, args in self._get_requests(client, since_ts)
+            }
+            results = {key: future.result() for key, future in futures.items()}
+        return self._make_snapshot(results)
+
+    @staticmethod
+    def _get_requests(client, since_ts):
+        return [
+            ('ticker', client.get_ticker, ()),
+            ('order_book', client.get_order_book, ()),
+            ('trades', client.get_trade_list, (since_ts,)),
+        ]
+
+    def _make_snapshot(self, results):
+        markets = {currency: {} for currency in self.clients}
+        for (currency, name), result in results.items():
+            markets[currency][name] = result
+        return {
+            'timestamp': time.time(),
+            'markets': markets,
+        }
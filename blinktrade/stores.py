@@ -0,0 +1,218 @@
+import array
+import bisect
+import mmap
+import os
+
+from blinktrade import consts
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+class TradeStore(object):
+    """
+    Append-only trade archive stored as one fixed-width binary file per column.
+
+    Columns are read through memory maps without copying: get_column returns a memoryview (or a NumPy array over the
+    same buffer when NumPy is installed). A sparse index keeps the timestamp of every index_step-th trade in memory,
+    so range queries are two binary searches and never read the whole timestamp column.
+    """
+    COLUMNS = (
+        ('date', 'q'),
+        ('tid', 'q'),
+        ('price', 'q'),
+        ('amount', 'q'),
+        ('side', 'b'),
+    )
+    SIDE_TO_CODE = {'buy': int(consts.OrderSide.BUY), 'sell': int(consts.OrderSide.SELL)}
+    CODE_TO_SIDE = {code: side for side, code in SIDE_TO_CODE.items()}
+
+    def __init__(self, path, index_step=1024):
+        """
+        :param path: directory where the column files are kept. It is created if it does not exist.
+        :type path: basestring
+        :param index_step: number of trades between two entries of the sparse timestamp index
+        :type index_step: int
+        """
+        self.path = path
+        self.index_step = index_step
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self._files = {name: open(self._get_column_path(name), 'ab') for name, _ in self.COLUMNS}
+        self._maps = {}
+        self._mapped_length = 0
+        self._length = self._read_length()
+        self._truncate_columns()
+        self._index = []
+        self._last_tid = self._last_timestamp = 0
+        if self._length:
+            dates = self._get_memoryview('date')
+            self._index = [dates[row] for row in range(0, self._length, self.index_step)]
+            self._last_timestamp = dates[-1]
+            self._last_tid = self._get_memoryview('tid')[-1]
+
+    def _get_column_path(self, name):
+        return os.path.join(self.path, '{}.bin'.format(name))
+
+    def _read_length(self):
+        return min(
+            os.path.getsize(self._get_column_path(name)) // array.array(typecode).itemsize
+            for name, typecode in self.COLUMNS
+        )
+
+    def _map_columns(self):
+        self._close_maps()
+        for name, _ in self.COLUMNS:
+            with open(self._get_column_path(name), 'rb') as column_file:
+                self._maps[name] = mmap.mmap(column_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mapped_length = self._length
+
+    def _close_maps(self):
+        for column_map in self._maps.values():
+            try:
+                column_map.close()
+            except BufferError:
+                # a view returned by get_column still uses the map, which is unmapped with the last view
+                pass
+        self._maps = {}
+        self._mapped_length = 0
+
+    def _truncate_columns(self):
+        # an interrupted append can leave some columns longer than the others
+        for name, typecode in self.COLUMNS:
+            self._files[name].truncate(self._length * array.array(typecode).itemsize)
+
+    def _get_memoryview(self, name):
+        if self._mapped_length != self._length:
+            # the columns are remapped on the first read after appends rather than on every append
+            self._map_columns()
+        typecode = dict(self.COLUMNS)[name]
+        view = memoryview(self._maps[name]).cast(typecode)
+        return view[:self._length]
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def last_timestamp(self):
+        return self._last_timestamp
+
+    @property
+    def last_tid(self):
+        return self._last_tid
+
+    def get_column(self, name):
+        """
+        Zero-copy view of a column. Prices and amounts are in satoshis and sides are consts.OrderSide as int.
+
+        :type name: basestring
+        :rtype: memoryview | numpy.ndarray
+        """
+        if not self._length:
+            return memoryview(array.array(dict(self.COLUMNS)[name]))
+        view = self._get_memoryview(name)
+        if numpy is not None:
+            return numpy.frombuffer(view, dtype=numpy.dtype(view.format))
+        return view
+
+    def append(self, trades):
+        """
+        Appends the trades with an id greater than the last stored one and returns how many were written.
+
+        :param trades: trades as returned by OpenClient.get_trade_list
+        :type trades: list[dict]
+        :rtype: int
+        """
+        last_tid = self.last_tid
+        last_timestamp = self.last_timestamp
+        new_trades = sorted((trade for trade in trades if trade['tid'] > last_tid), key=lambda trade: trade['tid'])
+        if not new_trades:
+            return 0
+        if new_trades[0]['date'] < last_timestamp:
+            raise ValueError('Trades must be appended in timestamp order')
+
+        columns = {
+            'date': [trade['date'] for trade in new_trades],
+            'tid': [trade['tid'] for trade in new_trades],
+            'price': [self._get_satoshi_value(trade['price']) for trade in new_trades],
+            'amount': [self._get_satoshi_value(trade['amount']) for trade in new_trades],
+            'side': [self.SIDE_TO_CODE[trade['side']] for trade in new_trades],
+        }
+        for name, typecode in self.COLUMNS:
+            column_file = self._files[name]
+            column_file.write(array.array(typecode, columns[name]).tobytes())
+            column_file.flush()
+        first_row = self._length
+        next_indexed_row = -(-first_row // self.index_step) * self.index_step
+        self._index.extend(columns['date'][next_indexed_row - first_row::self.index_step])
+        self._length += len(new_trades)
+        self._last_tid = columns['tid'][-1]
+        self._last_timestamp = columns['date'][-1]
+        return len(new_trades)
+
+    def sync(self, client):
+        """
+        Fetches the trades since the last stored timestamp and appends the new ones.
+
+        :type client: blinktrade.clients.OpenClient
+        :rtype: int
+        """
+        return self.append(client.get_trade_list(self.last_timestamp))
+
+    def search(self, timestamp, side='left'):
+        """
+        Position of the first trade at or after (side='left') or strictly after (side='right') the timestamp.
+
+        :type timestamp: long
+        :type side: basestring
+        :rtype: int
+        """
+        bisect_func = bisect.bisect_left if side == 'left' else bisect.bisect_right
+        block = bisect_func(self._index, timestamp)
+        low = max(0, block - 1) * self.index_step
+        high = block * self.index_step if block < len(self._index) else self._length
+        return bisect_func(self._get_memoryview('date'), timestamp, low, high) if self._length else 0
+
+    def get_range(self, start_timestamp=None, end_timestamp=None):
+        """
+        Start and stop positions of the trades with start_timestamp <= date < end_timestamp.
+
+        :rtype: tuple
+        """
+        start = 0 if start_timestamp is None else self.search(start_timestamp)
+        stop = self._length if end_timestamp is None else self.search(end_timestamp)
+        return start, max(start, stop)
+
+    def iter_trades(self, start_timestamp=None, end_timestamp=None):
+        """
+        Yields the trades of a time range as dicts shaped like the ones returned by OpenClient.get_trade_list.
+
+        :rtype: collections.Iterable[dict]
+        """
+        start, stop = self.get_range(start_timestamp, end_timestamp)
+        views = {name: self._get_memoryview(name) for name, _ in self.COLUMNS} if self._length else {}
+        for row in range(start, stop):
+            yield {
+                'tid': views['tid'][row],
+                'date': views['date'][row],
+                'price': float(views['price'][row]) / consts.SATOSHI_PRECISION,
+                'amount': float(views['amount'][row]) / consts.SATOSHI_PRECISION,
+                'side': self.CODE_TO_SIDE[views['side'][row]],
+            }
+
+    @staticmethod
+    def _get_satoshi_value(value):
+        return int(round(value * consts.SATOSHI_PRECISION))
+
+    def close(self):
+        for column_file in self._files.values():
+            column_file.close()
+        self._close_maps()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
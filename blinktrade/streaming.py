@@ -0,0 +1,392 @@
+import asyncio
+import inspect
+import json
+import logging
+import time
+from collections import namedtuple
+
+from blinktrade import consts, exceptions
+from blinktrade.async_transports import aiohttp
+from blinktrade.clients import AuthClient
+from blinktrade.ids import get_default_id_generator
+from blinktrade.records import Ticker
+
+logger = logging.getLogger(__name__)
+
+_BOOK_SIDES = {
+    consts.MarketDataEntryType.BID: 'bids',
+    consts.MarketDataEntryType.OFFER: 'asks',
+}
+
+
+class StreamUpdate(namedtuple('StreamUpdate', ['kind', 'data'])):
+    """
+    One update received from the gateway. data is a ticker, the whole order book, an order or a balance, parsed as
+    the REST clients parse them.
+    """
+    __slots__ = ()
+
+    TICKER = 'ticker'
+    ORDER_BOOK = 'order_book'
+    EXECUTION_REPORT = 'execution_report'
+    BALANCE = 'balance'
+
+
+class StreamingClient(object):
+    """
+    Keeps a WebSocket connection to the BlinkTrade gateway and streams the ticker, the order book and, once logged
+    in, the execution reports and balance updates of the account.
+
+    Updates are passed to the callbacks added with add_callback and returned by async for. Errors other than
+    connection errors, such as a rejected login, end the stream and are raised by async for. Only the latest
+    max_queue_size updates are kept for async for, older ones are dropped when nobody consumes them. The connection
+    is reopened with exponential back-off whenever it drops, and the login and every subscription are sent again.
+
+    The order book is kept from the full and incremental refreshes and returned whole, with the levels as
+    [price, quantity, user_id] rows as in OpenClient.get_order_book. It is updated in place, copy it to keep it.
+    With an AuthClient, execution reports and balance updates are parsed by the client and update its order and
+    balance caches.
+    """
+    DEFAULT_HEARTBEAT_INTERVAL = 30.0
+    DEFAULT_MAX_QUEUE_SIZE = 1000
+    RECONNECT_EXCEPTIONS = (asyncio.TimeoutError, OSError) + ((aiohttp.ClientError,) if aiohttp is not None else ())
+    _CLOSED = object()
+
+    def __init__(self, client, username=None, password=None, url=None, session=None,
+                 heartbeat_interval=DEFAULT_HEARTBEAT_INTERVAL, reconnect_delay=1.0, max_reconnect_delay=30.0,
+                 backoff_factor=2.0, max_queue_size=DEFAULT_MAX_QUEUE_SIZE, sleep=asyncio.sleep):
+        """
+        :param client: gives the environment, currency, broker and parsing options. Execution reports are parsed
+            by it when it is an AuthClient.
+        :type client: blinktrade.clients.AbstractClient
+        :param username: login of the account, the API key for API logins. Market data needs no login.
+        :type username: basestring
+        :type password: basestring
+        :param url: gateway URL, the one of the environment of the client by default
+        :type url: basestring
+        :type session: aiohttp.ClientSession
+        :param heartbeat_interval: seconds between heartbeat messages
+        :type heartbeat_interval: float
+        :param reconnect_delay: seconds to wait before reconnecting, multiplied by backoff_factor after each failure
+        :type reconnect_delay: float
+        :type max_reconnect_delay: float
+        :type backoff_factor: float
+        :type max_queue_size: int
+        """
+        if aiohttp is None:
+            raise ImportError('StreamingClient requires aiohttp. Install it with: pip install blinktrade[async]')
+        self.client = client
+        self.username = username
+        self.password = password
+        self.url = url or consts.ENVIRONMENT_TO_WEBSOCKET_MAP[client.environment_type]
+        self.session = session
+        self.heartbeat_interval = heartbeat_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.backoff_factor = backoff_factor
+        self.max_queue_size = max_queue_size
+        self.sleep = sleep
+        self.symbol = consts.CURRENCY_TO_SYMBOL_MAP[client.currency]
+        self.satoshi_mode = getattr(client, 'satoshi_mode', False)
+        self.id_generator = getattr(client, 'id_generator', None) or get_default_id_generator()
+        self.subscriptions = {}
+        self.callbacks = {}
+        self.order_book = None
+        self.running = False
+        self.connections = 0
+        self.failures = 0
+        self.dropped = 0
+        self._owns_session = session is None
+        self._websocket = None
+        self._task = None
+        self._queue = None
+        self._error = None
+        self._handlers = {
+            consts.MessageType.SECURITY_STATUS: self._handle_security_status,
+            consts.MessageType.MARKET_DATA_FULL_REFRESH: self._handle_full_refresh,
+            consts.MessageType.MARKET_DATA_INCREMENTAL_REFRESH: self._handle_incremental_refresh,
+            consts.MessageType.MARKET_DATA_REQUEST_REJECT: self._handle_market_data_reject,
+            consts.MessageType.EXECUTION_REPORT: self._handle_execution_report,
+            consts.MessageType.BALANCE_RESPONSE: self._handle_balance,
+            consts.MessageType.LOGIN_RESPONSE: self._handle_login_response,
+        }
+
+    def add_callback(self, kind, callback):
+        """
+        :param kind: StreamUpdate kind
+        :type kind: basestring
+        :param callback: called with the data of every update of the kind. It can be a coroutine function.
+            Exceptions it raises are logged and do not stop the stream.
+        :type callback: callable
+        """
+        self.callbacks.setdefault(kind, []).append(callback)
+
+    async def subscribe_ticker(self):
+        await self._subscribe(StreamUpdate.TICKER, {
+            'MsgType': consts.MessageType.SECURITY_STATUS_REQUEST,
+            'SecurityStatusReqID': self.id_generator.next_id(),
+            'SubscriptionRequestType': consts.SubscriptionRequestType.SUBSCRIBE,
+            'Instruments': ['BLINK:{}'.format(self.symbol)],
+        })
+
+    async def subscribe_order_book(self, market_depth=0):
+        """
+        :param market_depth: levels of each side, 0 for the whole book
+        :type market_depth: int
+        """
+        await self._subscribe(StreamUpdate.ORDER_BOOK, {
+            'MsgType': consts.MessageType.MARKET_DATA_REQUEST,
+            'MDReqID': self.id_generator.next_id(),
+            'SubscriptionRequestType': consts.SubscriptionRequestType.SUBSCRIBE,
+            'MarketDepth': market_depth,
+            'MDUpdateType': '1',
+            'MDEntryTypes': [consts.MarketDataEntryType.BID, consts.MarketDataEntryType.OFFER],
+            'Instruments': [self.symbol],
+        })
+
+    async def unsubscribe(self, kind):
+        """
+        :param kind: StreamUpdate.TICKER or StreamUpdate.ORDER_BOOK
+        :type kind: basestring
+        """
+        msg = self.subscriptions.pop(kind, None)
+        if msg is not None and self._websocket is not None:
+            unsubscribe = dict(msg, SubscriptionRequestType=consts.SubscriptionRequestType.UNSUBSCRIBE)
+            await self._send(self._websocket, unsubscribe)
+
+    async def _subscribe(self, kind, msg):
+        self.subscriptions[kind] = msg
+        if self._websocket is not None:
+            await self._send(self._websocket, msg)
+
+    def start(self):
+        """
+        Connects in background. Called by async with and async for.
+        """
+        if self._task is None:
+            self.running = True
+            self._queue = asyncio.Queue(self.max_queue_size)
+            self._task = asyncio.ensure_future(self._run())
+
+    async def close(self):
+        self.running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def __aiter__(self):
+        self.start()
+        return self
+
+    async def __anext__(self):
+        update = await self._queue.get()
+        if update is self._CLOSED:
+            self._queue.put_nowait(self._CLOSED)
+            if self._error is not None:
+                raise self._error
+            raise StopAsyncIteration
+        return update
+
+    def get_backoff(self):
+        """
+        :rtype: float
+        """
+        return min(self.max_reconnect_delay, self.reconnect_delay * self.backoff_factor ** self.failures)
+
+    async def _run(self):
+        try:
+            while self.running:
+                try:
+                    await self._connect_and_listen()
+                except self.RECONNECT_EXCEPTIONS:
+                    logger.warning('Connection to %s failed', self.url, exc_info=True)
+                    self.failures += 1
+                if self.running:
+                    await self.sleep(self.get_backoff())
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self._error = exc
+        finally:
+            self.running = False
+            self._publish_closed()
+
+    async def _connect_and_listen(self):
+        async with self._get_session().ws_connect(self.url) as websocket:
+            self._websocket = websocket
+            self.connections += 1
+            heartbeat_errors = []
+            heartbeats = asyncio.ensure_future(self._send_heartbeats(websocket, heartbeat_errors))
+            try:
+                if self.username is not None:
+                    await self._send(websocket, self._make_login_msg())
+                for msg in list(self.subscriptions.values()):
+                    await self._send(websocket, msg)
+                async for message in websocket:
+                    if message.type == aiohttp.WSMsgType.TEXT:
+                        self.failures = 0
+                        await self._dispatch(self.client.json_decoder(message.data))
+                    elif message.type == aiohttp.WSMsgType.ERROR:
+                        break
+                if heartbeat_errors:
+                    raise heartbeat_errors[0]
+            finally:
+                self._websocket = None
+                await self._stop_heartbeats(heartbeats)
+
+    def _get_session(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+        return self.session
+
+    def _make_login_msg(self):
+        return {
+            'MsgType': consts.MessageType.LOGIN,
+            'UserReqID': self.id_generator.next_id(),
+            'BrokerID': int(self.client.broker),
+            'Username': self.username,
+            'Password': self.password,
+            'UserReqTyp': '1',
+        }
+
+    async def _send_heartbeats(self, websocket, errors):
+        try:
+            while True:
+                await asyncio.sleep(self.heartbeat_interval)
+                await self._send(websocket, {
+                    'MsgType': consts.MessageType.HEARTBEAT,
+                    'TestReqID': self.id_generator.next_id(),
+                    'SendTime': int(time.time() * 1000),
+                })
+        except Exception as exc:
+            # closing ends the listener, which raises the error so the connection is reopened
+            errors.append(exc)
+            await websocket.close()
+
+    @staticmethod
+    async def _stop_heartbeats(heartbeats):
+        heartbeats.cancel()
+        await asyncio.wait([heartbeats])
+        if not heartbeats.cancelled() and heartbeats.exception() is not None:
+            logger.warning('Heartbeats failed', exc_info=heartbeats.exception())
+
+    @staticmethod
+    async def _send(websocket, msg):
+        await websocket.send_str(json.dumps(msg))
+
+    async def _dispatch(self, msg):
+        handler = self._handlers.get(msg.get('MsgType'))
+        if handler is None:
+            return
+        for update in handler(msg):
+            await self._publish(update)
+
+    async def _publish(self, update):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(update)
+        for callback in self.callbacks.get(update.kind, ()):
+            try:
+                result = callback(update.data)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception('Stream callback %r failed on a %s update', callback, update.kind)
+
+    def _publish_closed(self):
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(self._CLOSED)
+
+    def _handle_security_status(self, msg):
+        ticker = {
+            'pair': msg.get('Symbol', self.symbol),
+            'last': self._get_value(msg.get('LastPx')),
+            'high': self._get_value(msg.get('HighPx')),
+            'low': self._get_value(msg.get('LowPx')),
+            'buy': self._get_value(msg.get('BestBid')),
+            'sell': self._get_value(msg.get('BestAsk')),
+            'vol': self._get_value(msg.get('SellVolume')),
+            'vol_{}'.format(self.client.currency.lower()): self._get_value(msg.get('BuyVolume')),
+        }
+        return [StreamUpdate(StreamUpdate.TICKER, self.client._make_record(Ticker, ticker))]
+
+    def _handle_full_refresh(self, msg):
+        self.order_book = {'pair': msg.get('Symbol', self.symbol), 'bids': [], 'asks': []}
+        for entry in msg.get('MDFullGrp', ()):
+            side = _BOOK_SIDES.get(entry.get('MDEntryType'))
+            if side is not None:
+                self.order_book[side].append(self._make_level(entry))
+        return [StreamUpdate(StreamUpdate.ORDER_BOOK, self.order_book)]
+
+    def _handle_incremental_refresh(self, msg):
+        if self.order_book is None:
+            return []
+        changed = False
+        for entry in msg.get('MDIncGrp', ()):
+            side = _BOOK_SIDES.get(entry.get('MDEntryType'))
+            if side is not None:
+                self._apply_book_entry(self.order_book[side], entry)
+                changed = True
+        return [StreamUpdate(StreamUpdate.ORDER_BOOK, self.order_book)] if changed else []
+
+    def _apply_book_entry(self, levels, entry):
+        """
+        Applies an incremental refresh entry. Its MDEntryPositionNo is the 1-based position of the level.
+        """
+        action = entry.get('MDUpdateAction')
+        index = entry.get('MDEntryPositionNo', 1) - 1
+        if action == consts.MarketDataUpdateAction.NEW:
+            levels.insert(index, self._make_level(entry))
+        elif action == consts.MarketDataUpdateAction.CHANGE:
+            levels[index:index + 1] = [self._make_level(entry)]
+        elif action == consts.MarketDataUpdateAction.DELETE:
+            del levels[index:index + 1]
+        elif action == consts.MarketDataUpdateAction.DELETE_THRU:
+            del levels[:index + 1]
+
+    def _make_level(self, entry):
+        return [self._get_value(entry.get('MDEntryPx')), self._get_value(entry.get('MDEntrySize')), entry.get('UserID')]
+
+    def _handle_market_data_reject(self, msg):
+        logger.warning('Market data request rejected: %r', msg)
+        return []
+
+    def _handle_execution_report(self, msg):
+        order = msg
+        if isinstance(self.client, AuthClient):
+            order = self.client._make_order(msg)
+            if self.client.order_cache is not None:
+                self.client.order_cache.update(order)
+        return [StreamUpdate(StreamUpdate.EXECUTION_REPORT, order)]
+
+    def _handle_balance(self, msg):
+        balance = msg
+        if isinstance(self.client, AuthClient):
+            if str(self.client.broker) not in msg:
+                return []
+            balance = self.client._get_balance_from_response({'Responses': [msg]})
+        return [StreamUpdate(StreamUpdate.BALANCE, balance)]
+
+    def _handle_login_response(self, msg):
+        if msg.get('UserStatus') != consts.UserStatus.LOGGED_IN:
+            raise exceptions.StreamLoginRejectedException(msg.get('UserStatusText') or 'Login rejected', msg)
+        return []
+
+    def _get_value(self, satoshis):
+        if satoshis is None or self.satoshi_mode:
+            return satoshis
+        return satoshis / float(consts.SATOSHI_PRECISION)
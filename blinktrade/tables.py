@@ -0,0 +1,139 @@
+from collections.abc import Mapping
+
+from blinktrade import consts
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+class OrderTable(object):
+    """
+    Orders of U5 order status responses stored by column instead of one dict per order.
+
+    The columns are transposed straight from Columns/OrdListGrp and the satoshi columns are converted in one
+    vectorized step, into NumPy arrays when NumPy is installed. Indexing by position returns an OrderRow, a read-only
+    mapping that is only created when it is asked for; indexing by column name returns the whole column.
+    """
+    def __init__(self, columns, data, length):
+        """
+        :type columns: list[basestring]
+        :param data: values of each column, all of them with the given length
+        :type data: dict
+        :type length: int
+        """
+        self.columns = columns
+        self._data = data
+        self._length = length
+        self._positions = {column: position for position, column in enumerate(columns)}
+
+    @classmethod
+    def from_order_status_responses(cls, responses, satoshi_columns=(), precision=consts.SATOSHI_PRECISION):
+        """
+        :param responses: U5 items of a response, with Columns and OrdListGrp
+        :type responses: list[dict]
+        :param satoshi_columns: columns converted from satoshis by dividing them by precision
+        :type satoshi_columns: list[basestring]
+        :type precision: int
+        :rtype: OrderTable
+        """
+        columns = []
+        for response in responses:
+            columns.extend(column for column in response['Columns'] if column not in columns)
+        data = {column: [] for column in columns}
+        length = 0
+        for response in responses:
+            rows = response['OrdListGrp']
+            transposed = dict(zip(response['Columns'], zip(*rows))) if rows else {}
+            for column in columns:
+                data[column].extend(transposed.get(column, (None,) * len(rows)))
+            length += len(rows)
+        for column in satoshi_columns:
+            if column in data:
+                data[column] = cls._convert_satoshis(data[column], precision)
+        return cls(columns, data, length)
+
+    @staticmethod
+    def _convert_satoshis(values, precision):
+        if numpy is not None and None not in values:
+            return numpy.array(values, dtype=numpy.float64) / precision
+        return [None if value is None else float(value) / precision for value in values]
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, item):
+        if isinstance(item, str):
+            return self._data[item]
+        if item < 0:
+            item += self._length
+        if not 0 <= item < self._length:
+            raise IndexError('OrderTable index out of range')
+        return OrderRow(self, item)
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield OrderRow(self, index)
+
+    def __contains__(self, column):
+        return column in self._positions
+
+    def get_column(self, column):
+        """
+        :type column: basestring
+        :return: NumPy array for converted satoshi columns when NumPy is installed, a list otherwise
+        """
+        return self._data[column]
+
+    def get_value(self, index, column):
+        value = self._data[column][index]
+        return value.item() if numpy is not None and isinstance(value, numpy.generic) else value
+
+    def to_dicts(self):
+        """
+        Orders as the list of dicts returned when the table option is not used.
+
+        :rtype: list[dict]
+        """
+        columns = [self._to_list(self._data[column]) for column in self.columns]
+        return [dict(zip(self.columns, values)) for values in zip(*columns)]
+
+    @staticmethod
+    def _to_list(values):
+        return values.tolist() if numpy is not None and isinstance(values, numpy.ndarray) else list(values)
+
+
+class OrderRow(Mapping):
+    """
+    Read-only dict-like view of one order of an OrderTable.
+    """
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        """
+        :type table: OrderTable
+        :type index: int
+        """
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, column):
+        if column not in self._table:
+            raise KeyError(column)
+        return self._table.get_value(self._index, column)
+
+    def __iter__(self):
+        return iter(self._table.columns)
+
+    def __len__(self):
+        return len(self._table.columns)
+
+    def to_dict(self):
+        """
+        :rtype: dict
+        """
+        return dict(self.items())
+
+    def __repr__(self):
+        return 'OrderRow({!r})'.format(self.to_dict())
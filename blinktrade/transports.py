@@ -0,0 +1,97 @@
+import datetime
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from blinktrade.decoders import get_accept_encoding
+
+
+class HttpTransport(object):
+    """
+    Keep-alive HTTP transport backed by a pooled requests.Session.
+
+    A single instance can be shared by several clients, so every request to the same host reuses the already
+    established TCP/TLS connections instead of opening a new one. Compressed responses are requested explicitly.
+
+    Responses get a timings dict with the seconds spent waiting for the response headers (wait) and reading the
+    body (download).
+    """
+    DEFAULT_POOL_SIZE = 10
+    DEFAULT_CONNECT_TIMEOUT = 3.05
+    DEFAULT_READ_TIMEOUT = 10
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, max_retries=0, session=None):
+        """
+        :param pool_size: connections kept per host, only applied to the session created by the transport
+        :type pool_size: int
+        :type connect_timeout: float
+        :type read_timeout: float
+        :param max_retries: only applied to the session created by the transport
+        :type max_retries: int
+        :param session: used as it is, its adapters are left untouched
+        :type session: requests.Session
+        """
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        if session is None:
+            session = requests.Session()
+            session.headers['Accept-Encoding'] = get_accept_encoding()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=max_retries)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+
+    def get(self, url, **kwargs):
+        """
+        :type url: basestring
+        :rtype: requests.Response
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        return self._timed(self.session.get, url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """
+        :type url: basestring
+        :rtype: requests.Response
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        return self._timed(self.session.post, url, **kwargs)
+
+    @staticmethod
+    def _timed(send, url, **kwargs):
+        started = time.perf_counter()
+        response = send(url, **kwargs)
+        elapsed = getattr(response, 'elapsed', None)
+        if isinstance(elapsed, datetime.timedelta):
+            wait = elapsed.total_seconds()
+            response.timings = {'wait': wait, 'download': max(time.perf_counter() - started - wait, 0.0)}
+        return response
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_shared_transport = None
+_shared_transport_lock = threading.Lock()
+
+
+def get_shared_transport():
+    """
+    Returns a process wide transport, created on the first call, to be shared by all clients that ask for it.
+
+    :rtype: HttpTransport
+    """
+    global _shared_transport
+    with _shared_transport_lock:
+        if _shared_transport is None:
+            _shared_transport = HttpTransport()
+    return _shared_transport
@@ -35,6 +35,9 @@ setup(
     packages=find_packages(),
     install_requires=['requests'],
     extras_require={
+        'async': ['aiohttp'],
+        'fast': ['orjson'],
+        'numpy': ['numpy'],
         'test': ['coverage', 'mock', 'nose'],
     },
 )
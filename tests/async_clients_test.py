@@ -0,0 +1,194 @@
+import ast
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+import mock
+
+import blinktrade
+from blinktrade import consts, exceptions
+from blinktrade.async_clients import AsyncAuthClient, AsyncOpenClient, MarketDataStream
+
+
+class FakeResponse(object):
+    def __init__(self, payload):
+        self.payload = payload
+
+    async def read(self):
+        return json.dumps(self.payload).encode('utf-8')
+
+
+class FakeAsyncTransport(object):
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = []
+
+    async def get(self, url, **kwargs):
+        self.calls.append(('GET', url, kwargs))
+        await asyncio.sleep(0)
+        return FakeResponse(self.payload)
+
+    async def post(self, url, **kwargs):
+        self.calls.append(('POST', url, kwargs))
+        await asyncio.sleep(0)
+        return FakeResponse(self.payload)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+ORDER_RESPONSE = {
+    u'Status': 200,
+    u'Description': u'OK',
+    u'Responses': [
+        {
+            u'OrderID': 1459144180001,
+            u'OrdStatus': u'0',
+            u'CumQty': 0,
+            u'Symbol': u'BTCBRL',
+            u'OrderQty': 3130000,
+            u'LeavesQty': 3130000,
+            u'MsgType': u'8',
+            u'Price': 217500000000,
+            u'Side': u'1',
+            u'ClOrdID': 1467403664,
+        },
+        {
+            u'MsgType': u'U3',
+            u'4': {u'BRL_locked': 5500000000},
+            u'ClientID': 90856083
+        }
+    ]
+}
+
+
+class AsyncOpenClientTestCase(TestCase):
+    def test_it_gets_ticker(self):
+        transport = FakeAsyncTransport({'pair': 'BTCBRL', 'last': 2150.0})
+        client = AsyncOpenClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, transport=transport
+        )
+        ticker = run(client.get_ticker())
+        self.assertEqual(ticker.get('last'), 2150.0)
+        self.assertIn(consts.MarketInformation.TICKER, transport.calls[0][1])
+
+    def test_it_gets_trades_concurrently(self):
+        transport = FakeAsyncTransport([{'tid': 1, 'price': 2300.0}])
+        client = AsyncOpenClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, transport=transport
+        )
+
+        async def fetch_all():
+            return await asyncio.gather(*[client.get_trade_list(since_ts=ts) for ts in range(200)])
+
+        results = run(fetch_all())
+        self.assertEqual(len(results), 200)
+        self.assertIn('?since=199', transport.calls[-1][1])
+
+
+class AsyncAuthClientTestCase(TestCase):
+    def _make_client(self, payload):
+        return AsyncAuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            transport=FakeAsyncTransport(payload),
+        )
+
+    def test_it_get_balance(self):
+        client = self._make_client({u'Responses': [{u'MsgType': u'U3', u'4': {u'BRL': 100000000}}]})
+        balance = run(client.get_balance())
+        self.assertEqual(balance.get('BRL'), 1.0)
+
+    def test_it_places_a_limited_buy_order(self):
+        client = self._make_client(ORDER_RESPONSE)
+        order_response = run(client.buy_bitcoins_with_limited_order(2000, 5))
+        self.assertEqual(order_response[0].get('Price'), 2175.0)
+        self.assertEqual(order_response[1].get('BRL_locked'), 55.0)
+        self.assertEqual(json.loads(client.transport.calls[0][2]['data'])['MsgType'], consts.MessageType.PLACE_ORDER)
+        self.assertIn('Signature', client.transport.calls[0][2]['headers'])
+
+    def test_it_cancels_an_order(self):
+        client = self._make_client(ORDER_RESPONSE)
+        order_response = run(client.cancel_order(order_id='1467403664'))
+        self.assertEqual(order_response[0].get('OrderQty'), 0.0313)
+
+    def test_it_raises_exception_for_rejected_order(self):
+        client = self._make_client({u'Responses': [{u'MsgType': u'8', u'OrdStatus': u'8'}]})
+        self.assertRaises(
+            exceptions.OrderRejectedException, run, client.sell_bitcoins_with_limited_order(2000, 5)
+        )
+
+    def test_it_get_pending_orders(self):
+        client = self._make_client({u'Responses': [{
+            u'MsgType': u'U5',
+            u'Columns': [u'ClOrdID', u'OrderQty', u'Price'],
+            u'OrdListGrp': [[u'2961106', 3130000, 217500000000]],
+        }]})
+        order_response = list(run(client.get_pending_orders()))
+        self.assertEqual(order_response[0].get('Price'), 2175.0)
+
+
+class MarketDataStreamTestCase(TestCase):
+    def setUp(self):
+        chunks = [b'[[1467037014, 2300.0], ', b'[1467037288, 2302.5], ', b'[1467037290, 2303.0]]', b'']
+        self.response = mock.Mock()
+        self.response.content.read = mock.Mock(side_effect=lambda size: self._read(chunks))
+        self.stream = MarketDataStream(self._open_response, None, 16)
+
+    @staticmethod
+    async def _read(chunks):
+        return chunks.pop(0)
+
+    async def _open_response(self):
+        return self.response
+
+    def test_it_releases_the_connection_when_left_early(self):
+        async def read_first():
+            async with self.stream as stream:
+                async for item in stream:
+                    return item
+
+        self.assertEqual(run(read_first()), [1467037014, 2300.0])
+        self.response.release.assert_called_once_with()
+
+    def test_it_releases_the_connection_once_read_to_the_end(self):
+        async def read_all():
+            return [item async for item in self.stream]
+
+        self.assertEqual(len(run(read_all())), 3)
+        self.response.release.assert_called_once_with()
+
+
+class SyncClientModulesTestCase(TestCase):
+    def test_it_keeps_coroutines_out_of_the_modules_imported_by_the_sync_client(self):
+        # clients.py must stay importable on Python 3.4, which has no async/await syntax
+        output = subprocess.check_output([sys.executable, '-c', (
+            'import sys, blinktrade.clients; '
+            'print("\\n".join(module.__file__ for name, module in sys.modules.items() '
+            'if name.startswith("blinktrade")))'
+        )])
+        paths = output.decode('utf-8').split()
+        self.assertTrue(any(path.endswith('clients.py') for path in paths))
+        for path in paths:
+            self.assertFalse(self._has_async_syntax(path), path)
+
+    def test_it_keeps_coroutines_in_the_async_modules(self):
+        package_dir = os.path.dirname(blinktrade.__file__)
+        for name in os.listdir(package_dir):
+            if name.endswith('.py') and not name.startswith('async_') and name != 'streaming.py':
+                path = os.path.join(package_dir, name)
+                self.assertFalse(self._has_async_syntax(path), path)
+
+    @staticmethod
+    def _has_async_syntax(path):
+        async_nodes = (ast.AsyncFunctionDef, ast.AsyncFor, ast.AsyncWith, ast.Await)
+        with open(path) as module_file:
+            tree = ast.parse(module_file.read())
+        return any(isinstance(node, async_nodes) for node in ast.walk(tree))
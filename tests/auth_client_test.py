@@ -1,9 +1,12 @@
+import hashlib
+import hmac
+import json
 from unittest import TestCase
 
 import mock
 import time
 from datetime import datetime
-from blinktrade import clients, consts, exceptions
+from blinktrade import clients, consts, exceptions, nonces
 
 
 class AuthClientTestCase(TestCase):
@@ -432,9 +435,8 @@ class AuthClientTestCase(TestCase):
         self.assertIsInstance(value, int)
         self.assertGreater(value, 0)
 
-    @mock.patch('blinktrade.clients.requests')
-    @mock.patch('blinktrade.clients.datetime')
-    def test_it_sends_request(self, mocked_datetime, mocked_request):
+    @mock.patch('blinktrade.nonces.datetime')
+    def test_it_sends_request(self, mocked_datetime):
         dt = datetime(2016, 8, 1, 15, 0, 0)
         mocked_datetime.utcnow.return_value = dt
         nonce = str(int(
@@ -443,18 +445,36 @@ class AuthClientTestCase(TestCase):
         ))
         self.assertIsInstance(nonce, str)
 
-        mocked_request.post = mock.MagicMock()
+        transport = mock.MagicMock()
+        transport.post.return_value.content = b'{}'
         client = clients.AuthClient(
             consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            transport=transport, nonce_provider=nonces.MonotonicNonceProvider(),
         )
         msg = {'msg_key': 'msg_value'}
         client._send_request(msg)
         self.assertIn(
-            consts.ENVIRONMENT_TO_SERVER_MAP[consts.Environment.PRODUCTION], mocked_request.post.call_args[0][0]
+            consts.ENVIRONMENT_TO_SERVER_MAP[consts.Environment.PRODUCTION], transport.post.call_args[0][0]
         )
-        self.assertEqual(msg, mocked_request.post.call_args[1]['json'])
-        self.assertEqual('key', mocked_request.post.call_args[1]['headers']['APIKey'])
-        self.assertEqual(nonce, mocked_request.post.call_args[1]['headers']['Nonce'])
+        self.assertEqual(msg, json.loads(transport.post.call_args[1]['data']))
+        self.assertEqual('key', transport.post.call_args[1]['headers']['APIKey'])
+        self.assertEqual(nonce, transport.post.call_args[1]['headers']['Nonce'])
         self.assertIn(
-            consts.ENVIRONMENT_TO_SERVER_MAP[consts.Environment.PRODUCTION], mocked_request.post.call_args[0][0]
+            consts.ENVIRONMENT_TO_SERVER_MAP[consts.Environment.PRODUCTION], transport.post.call_args[0][0]
         )
+
+    def test_it_signs_the_nonce_with_the_secret(self):
+        expected = hmac.new(b'secret', b'1470063600000000', digestmod=hashlib.sha256).hexdigest()
+        self.assertEqual(self.client._get_signature('1470063600000000'), expected)
+        self.assertEqual(self.client._get_signature('1470063600000000'), expected)
+
+    def test_it_serializes_place_order_messages_from_a_template(self):
+        msg = self.client._make_place_order_msg(consts.OrderSide.SELL, consts.OrderType.LIMITED_ORDER, 2000, 0.5)
+        self.assertTrue(self.client._can_use_place_order_template(msg))
+        self.assertEqual(json.loads(self.client._serialize_msg(msg).decode('utf-8')), msg)
+
+    def test_it_serializes_unexpected_place_order_messages_with_json(self):
+        msg = self.client._make_place_order_msg(consts.OrderSide.SELL, consts.OrderType.LIMITED_ORDER, 2000, 0.5)
+        msg['Price'] = 2000.5
+        self.assertFalse(self.client._can_use_place_order_template(msg))
+        self.assertEqual(json.loads(self.client._serialize_msg(msg).decode('utf-8')), msg)
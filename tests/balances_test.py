@@ -0,0 +1,92 @@
+from unittest import TestCase
+
+import mock
+
+from blinktrade import balances, clients, consts
+from blinktrade.async_clients import AsyncAuthClient
+from blinktrade.records import Balance
+from benchmarks import fixtures
+from tests.async_clients_test import FakeAsyncTransport, run
+
+
+class BalanceCacheTestCase(TestCase):
+    def setUp(self):
+        self.clock = mock.Mock(return_value=0)
+        self.cache = balances.BalanceCache(max_staleness=5, clock=self.clock)
+
+    def test_it_serves_the_snapshot_until_it_is_too_old(self):
+        self.assertEqual(self.cache.get(), None)
+        self.cache.update({'BRL': 1.0, 'BTC': 3.0})
+        self.clock.return_value = 4.9
+        self.assertEqual(self.cache.get(), {'BRL': 1.0, 'BTC': 3.0})
+        self.assertEqual(self.cache.get(max_staleness=0), None)
+        self.clock.return_value = 5
+        self.assertEqual(self.cache.get(), None)
+        self.assertEqual(self.cache.get_stats(), {'hits': 1, 'misses': 3, 'version': 1, 'age': 5})
+
+    def test_it_merges_partial_updates_without_refreshing_the_snapshot_age(self):
+        self.cache.update({'BRL': 1.0, 'BRL_locked': 2.0})
+        self.clock.return_value = 3
+        self.cache.update({'BRL_locked': 55.0}, partial=True)
+        self.assertEqual(self.cache.get(), {'BRL': 1.0, 'BRL_locked': 55.0})
+        self.assertEqual(self.cache.get_age(), 3)
+        self.assertEqual(self.cache.updated_at, 3)
+        self.assertEqual(self.cache.version, 2)
+
+    def test_it_does_not_serve_partial_updates_alone(self):
+        self.cache.update({'BRL_locked': 55.0}, partial=True)
+        self.assertEqual(self.cache.get(), None)
+
+    def test_it_keeps_updates_newer_than_the_request_of_a_snapshot(self):
+        self.cache.update({'BRL': 1.0, 'BRL_locked': 2.0})
+        base_version = self.cache.version
+        self.cache.update({'BRL_locked': 55.0}, partial=True)
+        self.cache.update({'BRL': 1.0, 'BRL_locked': 2.0, 'BTC': 3.0}, base_version=base_version)
+        self.assertEqual(self.cache.get(), {'BRL': 1.0, 'BRL_locked': 55.0, 'BTC': 3.0})
+
+    def test_it_invalidates_the_snapshot(self):
+        self.cache.update({'BRL': 1.0})
+        self.cache.invalidate()
+        self.assertEqual(self.cache.get(), None)
+
+
+class BalanceCacheClientTestCase(TestCase):
+    def setUp(self):
+        self.cache = balances.BalanceCache(max_staleness=60)
+
+    def _make_client(self, **kwargs):
+        return clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            balance_cache=self.cache, **kwargs
+        )
+
+    def test_it_answers_get_balance_from_the_cache(self):
+        client = self._make_client()
+        with mock.patch.object(client, '_send_request', return_value=fixtures.make_balance_response()) as send:
+            first = client.get_balance()
+            second = client.get_balance()
+            client.get_balance(max_staleness=0)
+        self.assertEqual(send.call_count, 2)
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+
+    def test_it_updates_the_cache_from_order_responses(self):
+        client = self._make_client(use_records=True)
+        with mock.patch.object(client, '_send_request', return_value=fixtures.make_balance_response()):
+            client.get_balance()
+        with mock.patch.object(client, '_send_request', return_value=fixtures.make_order_response()):
+            client.buy_bitcoins_with_limited_order(2175, 0.0313)
+        balance = client.get_balance()
+        self.assertIsInstance(balance, Balance)
+        self.assertEqual(balance['BRL_locked'], 55.0)
+        self.assertEqual(balance['BTC'], 3.0)
+
+    def test_it_answers_async_get_balance_from_the_cache(self):
+        transport = FakeAsyncTransport(fixtures.make_balance_response())
+        client = AsyncAuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            transport=transport, balance_cache=self.cache,
+        )
+        first = run(client.get_balance())
+        self.assertEqual(run(client.get_balance()), first)
+        self.assertEqual(len(transport.calls), 1)
@@ -0,0 +1,38 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from benchmarks import hot_paths
+
+
+class HotPathsBenchmarkTestCase(TestCase):
+    def test_it_runs_every_benchmark(self):
+        results = hot_paths.run(repeat=1, scale=0.001)
+        self.assertEqual(set(results), set(hot_paths.get_benchmarks(hot_paths.make_client())))
+        for result in results.values():
+            self.assertGreater(result['seconds'], 0)
+            self.assertGreater(result['peak_bytes'], 0)
+
+    def test_it_reports_time_and_memory_regressions(self):
+        baseline = {'parse': {'seconds': 1.0, 'peak_bytes': 1000}, 'sign': {'seconds': 1.0, 'peak_bytes': 1000}}
+        results = {
+            'parse': {'seconds': 2.0, 'peak_bytes': 1000},
+            'sign': {'seconds': 1.2, 'peak_bytes': 2000},
+            'new': {'seconds': 9.0, 'peak_bytes': 9000},
+        }
+        self.assertEqual(
+            hot_paths.compare(results, baseline), [('parse', 'seconds', 2.0), ('sign', 'peak_bytes', 2.0)],
+        )
+
+    def test_it_keeps_one_baseline_per_environment(self):
+        path = tempfile.mkdtemp()
+        try:
+            baseline_path = os.path.join(path, 'baseline.json')
+            self.assertEqual(hot_paths.load_baseline(baseline_path), {})
+            hot_paths.save_baseline({'parse': {'seconds': 1.0, 'peak_bytes': 1000}}, baseline_path)
+            hot_paths.save_baseline({'parse': {'seconds': 2.0, 'peak_bytes': 3000}}, baseline_path, 'other')
+            self.assertEqual(hot_paths.load_baseline(baseline_path), {'parse': {'seconds': 1.0, 'peak_bytes': 1000}})
+            self.assertEqual(hot_paths.load_baseline(baseline_path, 'other')['parse']['peak_bytes'], 3000)
+        finally:
+            shutil.rmtree(path)
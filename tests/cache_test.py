@@ -0,0 +1,122 @@
+import json
+import threading
+from unittest import TestCase
+
+import mock
+
+from blinktrade import clients, consts
+from blinktrade.async_clients import AsyncOpenClient
+from blinktrade.async_cache import AsyncMarketDataCache
+from blinktrade.cache import MarketDataCache
+from tests.async_clients_test import FakeAsyncTransport, run
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class MarketDataCacheTestCase(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.transport = mock.MagicMock()
+        self.transport.get.side_effect = lambda url: self._make_response({'call': self.transport.get.call_count})
+
+    @staticmethod
+    def _make_response(payload):
+        return mock.Mock(content=json.dumps(payload).encode('utf-8'))
+
+    def _make_client(self, cache, currency=consts.Currency.BRAZILIAN_REAIS):
+        return clients.OpenClient(
+            consts.Environment.PRODUCTION, currency, consts.Broker.FOXBIT, transport=self.transport, cache=cache
+        )
+
+    def test_it_serves_fresh_entries_from_cache(self):
+        cache = MarketDataCache(clock=self.clock)
+        client = self._make_client(cache)
+        self.assertEqual(client.get_ticker(), {'call': 1})
+        self.assertEqual(client.get_ticker(), {'call': 1})
+        self.assertEqual(self.transport.get.call_count, 1)
+        self.assertEqual(cache.get_stats()['hits'], 1)
+        self.assertEqual(cache.get_stats()['misses'], 1)
+
+    def test_it_keys_entries_by_currency_type_and_params(self):
+        cache = MarketDataCache(clock=self.clock)
+        self._make_client(cache).get_trade_list(since_ts=1)
+        self._make_client(cache).get_trade_list(since_ts=2)
+        self._make_client(cache, consts.Currency.CHILEAN_PESOS).get_trade_list(since_ts=1)
+        self._make_client(cache).get_order_book()
+        self.assertEqual(self.transport.get.call_count, 4)
+
+    def test_it_expires_entries_by_endpoint_ttl(self):
+        cache = MarketDataCache(ttls={consts.MarketInformation.TICKER: 5}, clock=self.clock)
+        client = self._make_client(cache)
+        client.get_ticker()
+        client.get_order_book()
+        self.clock.now += 1
+        client.get_ticker()
+        client.get_order_book()
+        self.assertEqual(self.transport.get.call_count, 3)
+        self.clock.now += 5
+        self.assertEqual(client.get_ticker(), {'call': 4})
+
+    def test_it_evicts_least_recently_used_entries(self):
+        cache = MarketDataCache(max_size=2, clock=self.clock)
+        client = self._make_client(cache)
+        client.get_ticker()
+        client.get_order_book()
+        client.get_ticker()
+        client.get_trade_list()
+        client.get_ticker()
+        self.assertEqual(self.transport.get.call_count, 3)
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+        self.assertEqual(cache.get_stats()['size'], 2)
+
+    def test_it_serves_stale_entries_while_revalidating(self):
+        cache = MarketDataCache(stale_while_revalidate=True, clock=self.clock)
+        client = self._make_client(cache)
+        client.get_ticker()
+        self.clock.now += 10
+        with mock.patch('blinktrade.cache.threading.Thread') as mocked_thread:
+            self.assertEqual(client.get_ticker(), {'call': 1})
+            self.assertEqual(client.get_ticker(), {'call': 1})
+        self.assertEqual(mocked_thread.call_count, 1)
+        target, args = mocked_thread.call_args[1]['target'], mocked_thread.call_args[1]['args']
+        target(*args)
+        self.assertEqual(client.get_ticker(), {'call': 2})
+        self.assertEqual(cache.get_stats()['stale_hits'], 2)
+
+    def test_it_refreshes_in_a_background_thread(self):
+        cache = MarketDataCache(stale_while_revalidate=True, clock=self.clock)
+        client = self._make_client(cache)
+        client.get_ticker()
+        self.clock.now += 10
+        refreshed = threading.Event()
+        self.transport.get.side_effect = lambda url: refreshed.set() or self._make_response({'call': 'refreshed'})
+        self.assertEqual(client.get_ticker(), {'call': 1})
+        self.assertTrue(refreshed.wait(1))
+
+    def test_it_does_not_serve_entries_older_than_max_stale(self):
+        cache = MarketDataCache(stale_while_revalidate=True, max_stale=1, clock=self.clock)
+        client = self._make_client(cache)
+        client.get_ticker()
+        self.clock.now += 10
+        self.assertEqual(client.get_ticker(), {'call': 2})
+
+
+class AsyncMarketDataCacheTestCase(TestCase):
+    def test_it_caches_async_market_data(self):
+        cache = AsyncMarketDataCache()
+        client = AsyncOpenClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT,
+            transport=FakeAsyncTransport({'pair': 'BTCBRL'}), cache=cache,
+        )
+
+        async def get_twice():
+            return await client.get_ticker(), await client.get_ticker()
+
+        self.assertEqual(run(get_twice()), ({'pair': 'BTCBRL'}, {'pair': 'BTCBRL'}))
+        self.assertEqual(len(client.transport.calls), 1)
@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+from unittest import TestCase
+
+import mock
+
+from blinktrade.candles import CandleAggregator, build_candles, build_candles_from_store
+from blinktrade.stores import TradeStore
+
+TRADES = [
+    {'tid': 1, 'date': 1467037200, 'price': 2300.0, 'amount': 1.0, 'side': 'sell'},
+    {'tid': 2, 'date': 1467037230, 'price': 2310.0, 'amount': 1.0, 'side': 'buy'},
+    {'tid': 3, 'date': 1467037250, 'price': 2290.0, 'amount': 2.0, 'side': 'sell'},
+    {'tid': 4, 'date': 1467037260, 'price': 2305.0, 'amount': 0.5, 'side': 'buy'},
+    {'tid': 5, 'date': 1467037330, 'price': 2320.0, 'amount': 1.5, 'side': 'buy'},
+]
+
+
+class CandleAggregatorTestCase(TestCase):
+    def setUp(self):
+        self.aggregator = CandleAggregator(resolutions=(1, 60, 3600))
+        self.aggregator.add_trades(TRADES)
+
+    def test_it_builds_candles_of_every_resolution(self):
+        self.assertEqual(len(self.aggregator.get_candles(1)), 5)
+        self.assertEqual(len(self.aggregator.get_candles(60)), 3)
+        self.assertEqual(len(self.aggregator.get_candles(3600)), 1)
+
+    def test_it_computes_ohlcv(self):
+        candle = self.aggregator.get_candles(60)[0]
+        self.assertEqual(candle.start, 1467037200)
+        self.assertEqual((candle.open, candle.high, candle.low, candle.close), (2300.0, 2310.0, 2290.0, 2290.0))
+        self.assertEqual(candle.volume, 4.0)
+        self.assertEqual(candle.count, 3)
+        self.assertAlmostEqual(candle.vwap, (2300.0 + 2310.0 + 2 * 2290.0) / 4)
+
+    def test_it_updates_the_current_candle_incrementally(self):
+        self.aggregator.add_trade({'tid': 6, 'date': 1467037335, 'price': 2330.0, 'amount': 1.0})
+        current = self.aggregator.get_current_candle(60)
+        self.assertEqual(current.to_dict()['high'], 2330.0)
+        self.assertEqual(current.count, 2)
+
+    def test_it_adds_late_trades_to_retained_candles(self):
+        self.aggregator.add_trade({'tid': 6, 'date': 1467037201, 'price': 2280.0, 'amount': 1.0})
+        self.assertEqual(self.aggregator.get_candles(60)[0].low, 2280.0)
+        self.assertEqual(len(self.aggregator.get_candles(60)), 3)
+
+    def test_it_keeps_a_bounded_number_of_candles(self):
+        aggregator = CandleAggregator(resolutions=(1,), max_candles=2)
+        aggregator.add_trades(TRADES)
+        self.assertEqual([candle.start for candle in aggregator.get_candles(1)], [1467037260, 1467037330])
+
+
+class BuildCandlesTestCase(TestCase):
+    def _build(self):
+        return build_candles(
+            [trade['date'] for trade in TRADES],
+            [trade['price'] for trade in TRADES],
+            [trade['amount'] for trade in TRADES],
+            60,
+        )
+
+    def _assert_same_as_incremental(self, candles):
+        aggregator = CandleAggregator(resolutions=(60,))
+        aggregator.add_trades(TRADES)
+        expected = [candle.to_dict() for candle in aggregator.get_candles(60)]
+        for name in expected[0]:
+            for value, expected_candle in zip(candles[name], expected):
+                self.assertAlmostEqual(value, expected_candle[name])
+        self.assertEqual(len(candles['start']), len(expected))
+
+    def test_it_builds_candles_in_bulk(self):
+        self._assert_same_as_incremental(self._build())
+
+    @mock.patch('blinktrade.candles.numpy', None)
+    def test_it_builds_candles_in_bulk_without_numpy(self):
+        self._assert_same_as_incremental(self._build())
+
+    def test_it_builds_no_candles_from_no_trades(self):
+        self.assertEqual(len(build_candles([], [], [], 60)['start']), 0)
+
+    def test_it_builds_candles_from_a_trade_store(self):
+        path = tempfile.mkdtemp()
+        try:
+            with TradeStore(path) as store:
+                store.append(TRADES)
+                self._assert_same_as_incremental(build_candles_from_store(store, 60))
+                self.assertEqual(list(build_candles_from_store(store, 60, 1467037260)['count']), [1, 1])
+        finally:
+            shutil.rmtree(path)
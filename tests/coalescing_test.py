@@ -0,0 +1,260 @@
+import asyncio
+import json
+import threading
+import time
+from unittest import TestCase
+
+import mock
+
+from blinktrade import clients, consts
+from blinktrade.balances import BalanceCache
+from blinktrade.async_clients import AsyncAuthClient, AsyncOpenClient
+from blinktrade.async_coalescing import AsyncSingleFlight
+from blinktrade.coalescing import SingleFlight
+from blinktrade.orders import OpenOrderCache
+from blinktrade.records import Balance, Order
+from benchmarks import fixtures
+from tests.async_clients_test import FakeAsyncTransport, run
+
+
+class SingleFlightTestCase(TestCase):
+    def _run_in_threads(self, func, count=10):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(func())) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_it_coalesces_concurrent_market_data_requests(self):
+        transport = mock.MagicMock()
+        transport.get.side_effect = lambda url: time.sleep(0.1) or mock.Mock(content=json.dumps({'pair': 'BTCBRL'}))
+        client = clients.OpenClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT,
+            transport=transport, single_flight=SingleFlight(),
+        )
+        results = self._run_in_threads(client.get_ticker)
+        self.assertEqual(transport.get.call_count, 1)
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(client.single_flight.coalesced, 9)
+
+    def test_it_coalesces_read_only_auth_requests(self):
+        single_flight = SingleFlight()
+        client = clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            single_flight=single_flight,
+        )
+        response = {u'Responses': [{u'MsgType': u'U3', u'4': {u'BRL': 100000000}}]}
+        with mock.patch.object(client, '_send_request', side_effect=lambda _: time.sleep(0.1) or response) as send:
+            results = self._run_in_threads(client.get_balance, count=5)
+            self._run_in_threads(client.get_pending_orders, count=5)
+        self.assertEqual(send.call_count, 2)
+        self.assertEqual(results[0], {'BRL': 1.0})
+
+    def test_it_decodes_the_shared_response_with_the_records_setting_of_each_client(self):
+        single_flight = SingleFlight()
+        dict_client = self._make_auth_client(single_flight)
+        record_client = self._make_auth_client(single_flight, use_records=True)
+        balance_response = {u'Responses': [{u'MsgType': u'U3', u'4': {u'BRL': 100000000}}]}
+        dict_balance, record_balance = self._coalesce_two_clients(
+            dict_client, record_client, lambda client: client.get_balance(), balance_response,
+        )
+        self.assertEqual(dict_balance, {'BRL': 1.0})
+        self.assertIsInstance(record_balance, Balance)
+        self.assertEqual(record_balance.to_dict(), {'BRL': 1.0})
+
+        dict_orders, record_orders = self._coalesce_two_clients(
+            dict_client, record_client, lambda client: client.get_pending_orders(),
+            fixtures.make_order_status_response(2),
+        )
+        self.assertEqual([type(order) for order in dict_orders], [dict, dict])
+        self.assertTrue(all(isinstance(order, Order) for order in record_orders))
+        self.assertEqual([order.to_dict() for order in record_orders], dict_orders)
+        self.assertEqual(single_flight.calls, 2)
+
+    def test_it_decodes_the_shared_response_with_the_satoshi_mode_of_each_client(self):
+        single_flight = SingleFlight()
+        client = self._make_auth_client(single_flight)
+        satoshi_client = self._make_auth_client(single_flight, satoshi_mode=True)
+        balance_response = {u'Responses': [{u'MsgType': u'U3', u'4': {u'BRL': 100000000}}]}
+        balance, satoshi_balance = self._coalesce_two_clients(
+            client, satoshi_client, lambda c: c.get_balance(), balance_response,
+        )
+        self.assertEqual(balance, {'BRL': 1.0})
+        self.assertEqual(satoshi_balance, {'BRL': 100000000})
+
+        table, satoshi_table = self._coalesce_two_clients(
+            client, satoshi_client, lambda c: c.get_pending_orders(as_table=True),
+            fixtures.make_order_status_response(2),
+        )
+        self.assertEqual(list(table['Price']), [2175.0, 2175.0])
+        self.assertEqual(list(satoshi_table['Price']), [217500000000, 217500000000])
+        self.assertEqual(single_flight.coalesced, 2)
+
+    def test_it_updates_the_order_cache_of_each_coalesced_client(self):
+        single_flight = SingleFlight()
+        leader = self._make_auth_client(single_flight, order_cache=OpenOrderCache())
+        follower = self._make_auth_client(single_flight, order_cache=OpenOrderCache())
+        self._coalesce_two_clients(
+            leader, follower, lambda client: client.get_pending_orders(), fixtures.make_order_status_response(2),
+        )
+        for client in (leader, follower):
+            self.assertEqual(len(client.order_cache), 2)
+            self.assertEqual(client.order_cache.get_by_order_id(1459144231835)['ClOrdID'], '2961107')
+
+    def test_it_updates_the_balance_cache_of_each_coalesced_client(self):
+        single_flight = SingleFlight()
+        leader = self._make_auth_client(single_flight, balance_cache=BalanceCache())
+        follower = self._make_auth_client(single_flight, balance_cache=BalanceCache())
+        response = {u'Responses': [{u'MsgType': u'U3', u'4': {u'BRL': 100000000, u'BTC': 50000000}}]}
+        self._coalesce_two_clients(
+            leader, follower, lambda client: client.get_balance(), response,
+            # an update received by the follower after it joined the request is newer than the shared response
+            in_flight=lambda: follower.balance_cache.update({'BTC': 0.25}, partial=True),
+        )
+        self.assertEqual(leader.balance_cache.get(), {'BRL': 1.0, 'BTC': 0.5})
+        self.assertEqual(follower.balance_cache.get(), {'BRL': 1.0, 'BTC': 0.25})
+
+    @staticmethod
+    def _make_auth_client(single_flight, **kwargs):
+        return clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            single_flight=single_flight, **kwargs
+        )
+
+    @staticmethod
+    def _coalesce_two_clients(leader, follower, call, response, in_flight=None):
+        """
+        Makes the same call on both clients while the request of the leader is in flight, so the follower joins it.
+        in_flight is called once both are waiting for the response.
+        """
+        sending, release = threading.Event(), threading.Event()
+
+        def send(msg):
+            sending.set()
+            release.wait(1)
+            return response
+
+        results = {}
+        with mock.patch.object(leader, '_send_request', side_effect=send), \
+                mock.patch.object(follower, '_send_request', side_effect=send) as follower_send:
+            coalesced = leader.single_flight.coalesced
+            threads = [threading.Thread(target=lambda c=client: results.setdefault(c, call(c)))
+                       for client in (leader, follower)]
+            threads[0].start()
+            sending.wait(1)
+            threads[1].start()
+            while leader.single_flight.coalesced == coalesced:
+                time.sleep(0.001)
+            if in_flight is not None:
+                in_flight()
+            release.set()
+            for thread in threads:
+                thread.join()
+        assert not follower_send.called
+        return results[leader], results[follower]
+
+    def test_it_does_not_coalesce_different_keys(self):
+        single_flight = SingleFlight()
+        self.assertEqual(single_flight.do(('a',), lambda: 1), 1)
+        self.assertEqual(single_flight.do(('a',), lambda: 2), 2)
+        self.assertEqual(single_flight.calls, 2)
+
+    def test_it_shares_exceptions_with_waiters(self):
+        single_flight = SingleFlight()
+        errors = []
+
+        def fail():
+            time.sleep(0.1)
+            raise ValueError('failed')
+
+        def call():
+            try:
+                single_flight.do(('key',), fail)
+            except ValueError as e:
+                errors.append(e)
+
+        self._run_in_threads(call, count=3)
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(single_flight.calls, 1)
+
+    def test_it_shares_base_exceptions_with_waiters(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+        errors = []
+
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise SystemExit(1)
+
+        def lead():
+            try:
+                single_flight.do(('key',), fail)
+            except SystemExit as e:
+                errors.append(e)
+
+        def wait():
+            started.wait()
+            try:
+                errors.append(single_flight.do(('key',), lambda: 'not the leader'))
+            except SystemExit as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=lead), threading.Thread(target=wait)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(all(isinstance(error, SystemExit) for error in errors))
+        self.assertEqual(single_flight.coalesced, 1)
+
+
+class AsyncSingleFlightTestCase(TestCase):
+    def test_it_coalesces_concurrent_market_data_requests(self):
+        client = AsyncOpenClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT,
+            transport=FakeAsyncTransport({'pair': 'BTCBRL'}), single_flight=AsyncSingleFlight(),
+        )
+
+        async def fetch_all():
+            return await asyncio.gather(*[client.get_order_book() for _ in range(50)])
+
+        results = run(fetch_all())
+        self.assertEqual(len(client.transport.calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_it_coalesces_read_only_auth_requests(self):
+        client = AsyncAuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            transport=FakeAsyncTransport({u'Responses': [{u'MsgType': u'U3', u'4': {u'BRL': 100000000}}]}),
+            single_flight=AsyncSingleFlight(),
+        )
+
+        async def fetch_all():
+            return await asyncio.gather(*[client.get_balance() for _ in range(50)])
+
+        results = run(fetch_all())
+        self.assertEqual(len(client.transport.calls), 1)
+        self.assertEqual(results[-1], {'BRL': 1.0})
+
+    def test_it_updates_the_balance_cache_of_each_coalesced_client(self):
+        single_flight = AsyncSingleFlight()
+        response = {u'Responses': [{u'MsgType': u'U3', u'4': {u'BRL': 100000000}}]}
+        auth_clients = [
+            AsyncAuthClient(
+                consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+                transport=FakeAsyncTransport(response), single_flight=single_flight, balance_cache=BalanceCache(),
+            )
+            for _ in range(2)
+        ]
+
+        async def fetch_all():
+            return await asyncio.gather(*[client.get_balance() for client in auth_clients])
+
+        self.assertEqual(run(fetch_all()), [{'BRL': 1.0}, {'BRL': 1.0}])
+        self.assertEqual(single_flight.coalesced, 1)
+        self.assertEqual([client.balance_cache.get() for client in auth_clients], [{'BRL': 1.0}, {'BRL': 1.0}])
@@ -0,0 +1,164 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase, skipIf
+
+import mock
+
+from blinktrade import async_transports, clients, consts, decoders, transports
+from blinktrade.async_clients import AsyncOpenClient
+from tests.async_clients_test import run
+
+ORDER_BOOK = {
+    'pair': 'BTCBRL',
+    'bids': [[2100.0, 1.50000005, 1], [2096.07, 12.0, 90824262], [2096.06, 4.8612554, 90803493]],
+    'asks': [[2200.0, 2.50000005, 2], [2125.9, 0.708, 90824262]],
+}
+TRADES = [
+    {'tid': 1, 'date': 1470063600, 'price': 2150.0, 'amount': 0.5, 'side': 'buy'},
+    {'tid': 2, 'date': 1470063601, 'price': 2150.12345678, 'amount': 12, 'side': 'sell'},
+]
+
+
+def split(content, size):
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+
+def parse(keys, chunks):
+    parser = decoders.JsonArrayStreamParser(keys)
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    items.extend(parser.feed(b'', final=True))
+    return parser, items
+
+
+class GzipHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    accept_encoding = None
+
+    def do_GET(self):
+        GzipHandler.accept_encoding = self.headers.get('Accept-Encoding')
+        payload = ORDER_BOOK if consts.MarketInformation.ORDER_BOOK in self.path else TRADES
+        body = gzip.compress(json.dumps(payload).encode('utf-8'))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class JsonDecoderTestCase(TestCase):
+    def test_it_decodes_bytes_with_every_available_decoder(self):
+        for name in ('json', 'orjson', 'ujson'):
+            if getattr(decoders, name) is None:
+                continue
+            self.assertEqual(decoders.get_json_decoder(name)(json.dumps(TRADES).encode('utf-8')), TRADES)
+
+    @skipIf(decoders.orjson is None, 'orjson is not installed')
+    def test_it_prefers_orjson_when_it_is_installed(self):
+        self.assertIs(decoders.get_json_decoder(), decoders.orjson.loads)
+        with mock.patch('blinktrade.decoders.orjson', None):
+            self.assertIs(decoders.get_json_decoder(), decoders._stdlib_loads)
+
+    def test_it_rejects_unavailable_decoders(self):
+        with mock.patch('blinktrade.decoders.ujson', None):
+            self.assertRaises(ValueError, decoders.get_json_decoder, 'ujson')
+
+    def test_it_uses_the_client_decoder(self):
+        transport = mock.MagicMock()
+        transport.get.return_value.content = b'{"last": 2150.0}'
+        json_decoder = mock.Mock(return_value={'last': 1.0})
+        client = clients.OpenClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT,
+            transport=transport, json_decoder=json_decoder,
+        )
+        self.assertEqual(client.get_ticker(), {'last': 1.0})
+        json_decoder.assert_called_once_with(b'{"last": 2150.0}')
+
+
+class JsonArrayStreamParserTestCase(TestCase):
+    def test_it_parses_a_root_array_in_any_chunk_size(self):
+        content = json.dumps(TRADES, indent=2).encode('utf-8')
+        for size in (1, 7, len(content)):
+            _, items = parse(None, split(content, size))
+            self.assertEqual([trade for _, trade in items], TRADES)
+
+    def test_it_parses_the_arrays_of_an_object_in_any_chunk_size(self):
+        content = json.dumps(ORDER_BOOK).encode('utf-8')
+        for size in (1, 5, len(content)):
+            parser, items = parse(['bids', 'asks'], split(content, size))
+            self.assertEqual([row for key, row in items if key == 'bids'], ORDER_BOOK['bids'])
+            self.assertEqual([row for key, row in items if key == 'asks'], ORDER_BOOK['asks'])
+            self.assertEqual(parser.fields, {'pair': 'BTCBRL'})
+
+    def test_it_does_not_cut_numbers_split_between_chunks(self):
+        _, items = parse(None, [b'[12', b'34, 5', b'6]'])
+        self.assertEqual(items, [(None, 1234), (None, 56)])
+
+    def test_it_decodes_multibyte_characters_split_between_chunks(self):
+        content = json.dumps([{'name': u'S\xe3o Paulo'}], ensure_ascii=False).encode('utf-8')
+        _, items = parse(None, split(content, 1))
+        self.assertEqual(items, [(None, {'name': u'S\xe3o Paulo'})])
+
+    def test_it_returns_items_as_soon_as_they_are_complete(self):
+        parser = decoders.JsonArrayStreamParser()
+        self.assertEqual(parser.feed(b'[{"tid": 1}, {"tid"'), [(None, {'tid': 1})])
+        self.assertEqual(parser.feed(b': 2}]'), [(None, {'tid': 2})])
+
+    def test_it_rejects_incomplete_bodies(self):
+        self.assertRaises(ValueError, parse, None, [b'[{"tid": 1}, {"tid"'])
+        self.assertRaises(ValueError, parse, None, [b'{"tid": 1}'])
+
+
+class StreamingClientTestCase(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), GzipHandler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _make_client(self, client_class, transport):
+        client = client_class(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, transport=transport
+        )
+        client.environment_server = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        return client
+
+    def test_it_streams_compressed_order_books_and_trades(self):
+        with transports.HttpTransport() as transport:
+            client = self._make_client(clients.OpenClient, transport)
+            client.STREAM_CHUNK_SIZE = 16
+            order_book = list(client.iter_order_book())
+            trades = list(client.iter_trade_list())
+        self.assertIn('gzip', GzipHandler.accept_encoding)
+        self.assertEqual(order_book[0], ('bids', ORDER_BOOK['bids'][0]))
+        self.assertEqual(len(order_book), 5)
+        self.assertEqual(trades, TRADES)
+
+    @skipIf(async_transports.aiohttp is None, 'aiohttp is not installed')
+    def test_it_streams_with_the_async_client(self):
+        async def collect():
+            async with async_transports.AsyncHttpTransport() as transport:
+                client = self._make_client(AsyncOpenClient, transport)
+                client.STREAM_CHUNK_SIZE = 16
+                order_book, trades = [], []
+                async for item in client.iter_order_book():
+                    order_book.append(item)
+                async for trade in client.iter_trade_list():
+                    trades.append(trade)
+                return order_book, trades
+
+        order_book, trades = run(collect())
+        self.assertIn('gzip', GzipHandler.accept_encoding)
+        self.assertEqual(order_book[-1], ('asks', ORDER_BOOK['asks'][-1]))
+        self.assertEqual(trades, TRADES)
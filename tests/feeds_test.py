@@ -0,0 +1,94 @@
+import itertools
+from unittest import TestCase
+
+import mock
+import requests
+
+from blinktrade.async_feeds import AsyncTradeFeed
+from blinktrade.feeds import TradeFeed
+from tests.async_clients_test import run
+
+FIRST_PAGE = [
+    {'tid': 1, 'date': 1467037014, 'price': 2300.0, 'amount': 1.0, 'side': 'sell'},
+    {'tid': 2, 'date': 1467037288, 'price': 2302.5, 'amount': 1.0, 'side': 'buy'},
+]
+SECOND_PAGE = [
+    {'tid': 2, 'date': 1467037288, 'price': 2302.5, 'amount': 1.0, 'side': 'buy'},
+    {'tid': 3, 'date': 1467037288, 'price': 2303.0, 'amount': 0.5, 'side': 'buy'},
+]
+
+
+class TradeFeedTestCase(TestCase):
+    def setUp(self):
+        self.client = mock.Mock()
+        self.sleep = mock.Mock()
+
+    def test_it_yields_each_trade_once_and_moves_the_cursor(self):
+        self.client.get_trade_list.side_effect = [FIRST_PAGE, SECOND_PAGE]
+        feed = TradeFeed(self.client, since=100, sleep=self.sleep)
+        trades = list(itertools.islice(feed, 3))
+        self.assertEqual([trade['tid'] for trade in trades], [1, 2, 3])
+        self.assertEqual(self.client.get_trade_list.call_args_list, [mock.call(100), mock.call(1467037288)])
+        self.assertEqual(feed.since, 1467037288)
+
+    def test_it_waits_the_poll_interval_when_there_are_no_new_trades(self):
+        self.client.get_trade_list.side_effect = [FIRST_PAGE, FIRST_PAGE, SECOND_PAGE]
+        feed = TradeFeed(self.client, poll_interval=2, sleep=self.sleep)
+        list(itertools.islice(feed, 3))
+        self.assertEqual(self.sleep.call_args_list, [mock.call(2)] * 3)
+
+    def test_it_waits_the_poll_interval_when_every_poll_returns_trades(self):
+        self.client.get_trade_list.side_effect = [FIRST_PAGE, SECOND_PAGE]
+        feed = TradeFeed(self.client, poll_interval=2, sleep=self.sleep)
+        list(itertools.islice(feed, 3))
+        self.assertEqual(self.sleep.call_args_list, [mock.call(2), mock.call(2)])
+
+    def test_it_backs_off_after_failures(self):
+        error = requests.ConnectionError()
+        self.client.get_trade_list.side_effect = [error, error, error, FIRST_PAGE]
+        feed = TradeFeed(self.client, poll_interval=1, max_backoff=5, sleep=self.sleep)
+        list(itertools.islice(feed, 1))
+        self.assertEqual(self.sleep.call_args_list, [mock.call(2), mock.call(4), mock.call(5), mock.call(1)])
+        self.assertEqual(feed.failures, 0)
+
+    def test_it_keeps_a_bounded_window_of_seen_ids(self):
+        feed = TradeFeed(self.client, window_size=2)
+        new_trades = feed._get_new_trades([{'tid': tid, 'date': tid} for tid in range(10)])
+        self.assertEqual(len(new_trades), 10)
+        self.assertEqual(feed._seen_ids, {8, 9})
+
+    def test_it_stops(self):
+        self.client.get_trade_list.return_value = FIRST_PAGE
+        feed = TradeFeed(self.client, sleep=self.sleep)
+        for _ in feed:
+            feed.stop()
+        self.assertFalse(feed.running)
+
+
+class AsyncTradeFeedTestCase(TestCase):
+    def test_it_yields_each_trade_once(self):
+        pages = iter([FIRST_PAGE, OSError(), SECOND_PAGE])
+        sleeps = []
+
+        async def get_trade_list(since):
+            page = next(pages)
+            if isinstance(page, Exception):
+                raise page
+            return page
+
+        async def sleep(seconds):
+            sleeps.append(seconds)
+
+        client = mock.Mock(get_trade_list=get_trade_list)
+        feed = AsyncTradeFeed(client, sleep=sleep)
+
+        async def consume():
+            trades = []
+            async for trade in feed:
+                trades.append(trade['tid'])
+                if len(trades) == 3:
+                    feed.stop()
+            return trades
+
+        self.assertEqual(run(consume()), [1, 2, 3])
+        self.assertEqual(sleeps, [1.0, 2.0, 1.0])
@@ -0,0 +1,207 @@
+import asyncio
+import threading
+import time
+from unittest import TestCase
+
+import mock
+import requests
+
+from blinktrade import clients, consts, hedging
+from blinktrade.async_clients import AsyncOpenClient
+from blinktrade.async_hedging import AsyncHedgingPolicy
+from tests.async_clients_test import FakeAsyncTransport, run
+
+
+class SlowThenFastFetch(object):
+    """
+    The first call blocks until released, the following ones answer at once.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call == 1:
+            self.release.wait(5)
+            return 'slow'
+        return 'fast'
+
+
+class HedgingPolicyTestCase(TestCase):
+    def setUp(self):
+        self.policy = hedging.HedgingPolicy(initial_delay=0.02, min_delay=0.01, backoff=0)
+
+    def tearDown(self):
+        self.policy.close()
+
+    def test_it_does_not_hedge_fast_requests(self):
+        fetch = mock.Mock(return_value='ticker')
+        self.assertEqual(self.policy.call(fetch, 'ticker'), 'ticker')
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(self.policy.get_stats()['hedged'], 0)
+        self.assertEqual(self.policy.get_stats()['latency']['ticker']['count'], 1)
+
+    def test_it_sends_a_duplicate_of_slow_requests_and_uses_the_first_answer(self):
+        fetch = SlowThenFastFetch()
+        try:
+            self.assertEqual(self.policy.call(fetch), 'fast')
+        finally:
+            fetch.release.set()
+        self.assertEqual(fetch.calls, 2)
+        self.assertEqual(self.policy.hedged, 1)
+        self.assertEqual(self.policy.hedges_won, 1)
+
+    def test_it_records_the_latency_of_the_slower_request_too(self):
+        fetch = SlowThenFastFetch()
+        try:
+            self.assertEqual(self.policy.call(fetch, 'ticker'), 'fast')
+            time.sleep(0.05)
+        finally:
+            fetch.release.set()
+        latency = self.policy.latencies['ticker']
+        for _ in range(100):
+            if latency.count == 2:
+                break
+            time.sleep(0.01)
+        self.assertEqual(latency.count, 2)
+        self.assertGreaterEqual(latency.max, 0.05)
+
+    def test_it_does_not_count_the_wait_for_a_free_worker(self):
+        policy = hedging.HedgingPolicy(initial_delay=1, max_workers=1)
+        self.addCleanup(policy.close)
+
+        def fetch():
+            time.sleep(0.05)
+            return 'ticker'
+
+        threads = [threading.Thread(target=policy.call, args=(fetch, 'ticker')) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(policy.latencies['ticker'].count, 3)
+        self.assertLess(policy.latencies['ticker'].max, 0.1)
+        self.assertEqual(policy.hedged, 0)
+
+    def test_it_waits_for_the_other_request_when_one_fails(self):
+        fetch = mock.Mock(side_effect=[ValueError('boom'), 'book'])
+
+        def slow_fetch():
+            time.sleep(0.05)
+            return fetch()
+
+        self.assertEqual(self.policy.call(slow_fetch), 'book')
+
+    def test_it_uses_a_percentile_of_the_latencies_as_delay(self):
+        self.policy.min_samples = 10
+        self.policy.max_delay = 1.0
+        for millis in range(1, 101):
+            self.policy._record_latency('order_book', millis / 1000.0)
+        self.assertAlmostEqual(self.policy.get_delay('order_book'), 0.095, delta=0.095 / 16)
+        self.assertEqual(self.policy.get_delay('ticker'), 0.02)
+        self.policy._record_latency('trades', 60)
+        self.policy.min_samples = 1
+        self.assertEqual(self.policy.get_delay('trades'), 1.0)
+
+    def test_it_retries_connection_errors(self):
+        fetch = mock.Mock(side_effect=[requests.exceptions.ConnectionError(), ConnectionResetError(), 'ticker'])
+        self.assertEqual(self.policy.call(fetch), 'ticker')
+        self.assertEqual(self.policy.retried, 2)
+
+    def test_it_raises_once_out_of_retries(self):
+        fetch = mock.Mock(side_effect=requests.exceptions.ConnectionError())
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.policy.call(fetch)
+        self.assertEqual(fetch.call_count, 3)
+
+    def test_it_does_not_retry_other_errors(self):
+        fetch = mock.Mock(side_effect=ValueError())
+        with self.assertRaises(ValueError):
+            self.policy.call(fetch)
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_it_jitters_the_back_off(self):
+        self.policy.backoff = 0.1
+        self.policy.max_backoff = 0.3
+        with mock.patch('random.uniform', return_value=0.05) as uniform:
+            self.assertEqual(self.policy.get_backoff(0), 0.05)
+            self.policy.get_backoff(5)
+        self.assertEqual(uniform.call_args_list, [mock.call(0, 0.1), mock.call(0, 0.3)])
+
+
+class AsyncHedgingPolicyTestCase(TestCase):
+    def test_it_hedges_and_cancels_the_slower_request(self):
+        policy = AsyncHedgingPolicy(initial_delay=0.01)
+        cancelled = []
+
+        async def fetch_slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def fetch_fast():
+            return 'fast'
+
+        fetches = [fetch_slow, fetch_fast]
+
+        async def main():
+            result = await policy.call(lambda: fetches.pop(0)(), 'ticker')
+            await asyncio.sleep(0)
+            return result
+
+        self.assertEqual(run(main()), 'fast')
+        self.assertEqual(cancelled, [True])
+        self.assertEqual(policy.get_stats()['hedges_won'], 1)
+        latency = policy.get_stats()['latency']['ticker']
+        self.assertEqual(latency['count'], 2)
+        self.assertGreaterEqual(latency['max'], 0.01)
+
+    def test_it_retries_connection_errors(self):
+        policy = AsyncHedgingPolicy(backoff=0)
+        results = [ConnectionRefusedError(), 'ticker']
+
+        async def fetch():
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        self.assertEqual(run(policy.call(fetch)), 'ticker')
+        self.assertEqual(policy.retried, 1)
+
+
+class HedgingClientTestCase(TestCase):
+    def test_it_hedges_open_client_market_data(self):
+        policy = mock.Mock()
+        policy.call.side_effect = lambda fetch, key: fetch()
+        transport = mock.Mock()
+        transport.get.return_value.content = b'{"last": 2150.0}'
+        client = clients.OpenClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT,
+            transport=transport, hedging=policy,
+        )
+        self.assertEqual(client.get_ticker(), {'last': 2150.0})
+        self.assertEqual(policy.call.call_args[0][1], consts.MarketInformation.TICKER)
+
+    def test_it_hedges_async_open_client_market_data(self):
+        policy = AsyncHedgingPolicy()
+        transport = FakeAsyncTransport({'last': 2150.0})
+        client = AsyncOpenClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT,
+            transport=transport, hedging=policy,
+        )
+        self.assertEqual(run(client.get_ticker()), {'last': 2150.0})
+        self.assertEqual(policy.get_stats()['latency'][consts.MarketInformation.TICKER]['count'], 1)
+
+    def test_it_never_applies_to_auth_clients(self):
+        with self.assertRaises(TypeError):
+            clients.AuthClient(
+                consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+                hedging=hedging.HedgingPolicy(),
+            )
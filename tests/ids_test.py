@@ -0,0 +1,137 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+
+import mock
+
+from blinktrade import clients, consts, ids
+from blinktrade.ids import SnowflakeIdGenerator, get_default_id_generator
+
+
+def generate_ids(lock_dir, count, queue):
+    generator = SnowflakeIdGenerator(lock_dir=lock_dir)
+    queue.put([generator.next_id() for _ in range(count)])
+
+
+class SnowflakeIdGeneratorTestCase(TestCase):
+    def setUp(self):
+        self.lock_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.lock_dir)
+
+    def test_it_generates_increasing_ids_that_fit_in_53_bits(self):
+        generator = SnowflakeIdGenerator(lock_dir=self.lock_dir)
+        ids = [generator.next_id() for _ in range(10000)]
+        self.assertEqual(ids, sorted(set(ids)))
+        self.assertLess(ids[-1], 2 ** 53)
+
+    def test_it_generates_unique_ids_across_threads(self):
+        generator = SnowflakeIdGenerator(lock_dir=self.lock_dir)
+        ids = []
+
+        def generate():
+            ids.extend(generator.next_id() for _ in range(2000))
+
+        threads = [threading.Thread(target=generate) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(ids)), 16000)
+
+    def test_it_claims_a_different_worker_for_each_generator(self):
+        generators = [SnowflakeIdGenerator(lock_dir=self.lock_dir) for _ in range(3)]
+        self.assertEqual(sorted(generator.worker_id for generator in generators), [0, 1, 2])
+        generators[1].close()
+        self.assertEqual(SnowflakeIdGenerator(lock_dir=self.lock_dir).worker_id, 1)
+
+    def test_it_generates_unique_ids_across_processes(self):
+        queue = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=generate_ids, args=(self.lock_dir, 2000, queue)) for _ in range(3)
+        ]
+        for process in processes:
+            process.start()
+        ids = [generated_id for _ in processes for generated_id in queue.get(timeout=10)]
+        for process in processes:
+            process.join()
+        self.assertEqual(len(set(ids)), 6000)
+
+    def test_it_keeps_ids_unique_when_the_clock_goes_backwards(self):
+        now = [1500000000.0]
+        generator = SnowflakeIdGenerator(worker_id=3, clock=lambda: now[0])
+        first_id = generator.next_id()
+        now[0] -= 10
+        self.assertGreater(generator.next_id(), first_id)
+
+    def test_it_waits_for_the_next_millisecond_when_the_sequence_overflows(self):
+        now = [1500000000.0]
+
+        def sleep(seconds):
+            now[0] += seconds
+
+        generator = SnowflakeIdGenerator(worker_id=0, clock=lambda: now[0], sleep=sleep)
+        generated_ids = [generator.next_id() for _ in range(generator.max_sequence + 2)]
+        self.assertEqual(len(set(generated_ids)), len(generated_ids))
+        self.assertEqual(generated_ids[-1] >> 12, (generated_ids[0] >> 12) + 1)
+        self.assertGreaterEqual(now[0], 1500000000.001)
+
+    def test_it_never_runs_ahead_of_the_clock(self):
+        now = [1500000000.0]
+        generator = SnowflakeIdGenerator(worker_id=0, clock=lambda: now[0], sleep=lambda seconds: None)
+        for _ in range(generator.max_sequence + 1):
+            generator.next_id()
+        now[0] += 0.001
+        generator.next_id()
+        self.assertEqual(generator._last_timestamp, generator._get_timestamp())
+
+    def test_it_falls_back_to_the_process_id_when_every_slot_is_in_use(self):
+        generators = [SnowflakeIdGenerator(lock_dir=self.lock_dir) for _ in range(32)]
+        with mock.patch.object(ids.logger, 'warning') as warning:
+            generator = SnowflakeIdGenerator(lock_dir=self.lock_dir)
+        self.assertEqual(warning.call_count, 1)
+        self.assertEqual(generator.worker_id, os.getpid() & generator.max_worker_id)
+        for other in generators:
+            other.close()
+
+    def test_it_skips_lock_files_it_cannot_open(self):
+        with mock.patch('blinktrade.ids.open', side_effect=IOError('Permission denied'), create=True):
+            with mock.patch.object(ids.logger, 'warning') as warning:
+                generator = SnowflakeIdGenerator(lock_dir=self.lock_dir)
+        self.assertEqual(warning.call_count, 1)
+        self.assertEqual(generator.worker_id, os.getpid() & generator.max_worker_id)
+
+    def test_it_keeps_the_lock_files_of_each_user_apart(self):
+        generator = SnowflakeIdGenerator(worker_id=0)
+        self.assertIn(str(os.getuid()), generator.lock_dir)
+
+    def test_it_rejects_invalid_worker_ids(self):
+        self.assertRaises(ValueError, SnowflakeIdGenerator, worker_id=32)
+
+
+class AuthClientIdTestCase(TestCase):
+    def test_it_uses_the_default_generator_for_request_ids(self):
+        client = clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+        )
+        self.assertIs(client._id_generator, None)
+        self.assertIs(client.id_generator, get_default_id_generator())
+        first_msg = client._make_place_order_msg(consts.OrderSide.BUY, consts.OrderType.LIMITED_ORDER, 2000, 1)
+        second_msg = client._make_place_order_msg(consts.OrderSide.BUY, consts.OrderType.LIMITED_ORDER, 2000, 1)
+        self.assertNotEqual(first_msg['ClOrdID'], second_msg['ClOrdID'])
+
+    def test_it_correlates_balance_responses_with_the_request_id(self):
+        client = clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            id_generator=SnowflakeIdGenerator(worker_id=0),
+        )
+        msg = client._make_balance_msg()
+        response = {u'Responses': [
+            {u'MsgType': u'U3', u'BalanceReqID': msg['BalanceReqID'] - 1, u'4': {u'BRL': 100000000}},
+            {u'MsgType': u'U3', u'BalanceReqID': msg['BalanceReqID'], u'4': {u'BRL': 200000000}},
+        ]}
+        self.assertEqual(client._parse_balance_response(response, msg), {'BRL': 2.0})
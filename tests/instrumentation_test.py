@@ -0,0 +1,141 @@
+import threading
+from http.server import ThreadingHTTPServer
+from unittest import TestCase, skipIf
+
+import mock
+
+from blinktrade import async_transports, clients, consts, instrumentation, transports
+from blinktrade.async_clients import AsyncOpenClient
+from tests.async_clients_test import FakeAsyncTransport, run
+from tests.transports_test import StandInHandler
+
+
+class LatencyHistogramTestCase(TestCase):
+    def test_it_maps_values_to_buckets_within_the_precision(self):
+        histogram = instrumentation.LatencyHistogram()
+        previous_index = 0
+        for micros in list(range(0, 5000)) + [10 ** exponent for exponent in range(4, 12)]:
+            index = histogram._get_index(micros)
+            upper_bound = histogram._get_upper_bound(index)
+            self.assertGreaterEqual(index, previous_index)
+            self.assertGreaterEqual(upper_bound, micros)
+            self.assertLessEqual(upper_bound - micros, micros / 16.0 + 1)
+            previous_index = index
+
+    def test_it_computes_percentiles_and_max(self):
+        histogram = instrumentation.LatencyHistogram()
+        for millis in range(1, 1001):
+            histogram.record(millis / 1000.0)
+        stats = histogram.get_stats()
+        self.assertEqual(stats['count'], 1000)
+        self.assertAlmostEqual(stats['p50'], 0.5, delta=0.5 / 16)
+        self.assertAlmostEqual(stats['p99'], 0.99, delta=0.99 / 16)
+        self.assertEqual(stats['max'], 1.0)
+        self.assertAlmostEqual(stats['mean'], 0.5005)
+
+    def test_it_has_no_percentiles_before_the_first_value(self):
+        self.assertEqual(instrumentation.LatencyHistogram().get_stats()['p50'], None)
+
+
+class InstrumentationTestCase(TestCase):
+    def setUp(self):
+        self.instrumentation = instrumentation.Instrumentation()
+        self.pre_request_hook = mock.Mock()
+        self.post_request_hook = mock.Mock()
+        self.instrumentation.add_pre_request_hook(self.pre_request_hook)
+        self.instrumentation.add_post_request_hook(self.post_request_hook)
+
+    def _make_auth_client(self, transport):
+        return clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            transport=transport, instrumentation=self.instrumentation,
+        )
+
+    def test_it_instruments_tapi_messages(self):
+        transport = mock.Mock()
+        transport.post.return_value = mock.Mock(content=b'{"Responses": []}', status_code=200, timings={'wait': 0.01})
+        client = self._make_auth_client(transport)
+        client.get_balance()
+        info = self.post_request_hook.call_args[0][0]
+        self.assertIs(self.pre_request_hook.call_args[0][0], info)
+        self.assertEqual((info.endpoint, info.msg_type, info.method), ('tapi', consts.MessageType.BALANCE, 'POST'))
+        self.assertEqual(info.status, 200)
+        self.assertEqual(info.request_size, len(transport.post.call_args[1]['data']))
+        self.assertEqual(info.response_size, len(b'{"Responses": []}'))
+        self.assertEqual(
+            set(info.timings), {'prepare', 'transport', 'wait', 'decode', 'total'},
+        )
+        stats = self.instrumentation.recorder.get_stats()
+        self.assertEqual(stats[('tapi', consts.MessageType.BALANCE)]['count'], 1)
+
+    def test_it_records_failed_requests(self):
+        transport = mock.Mock()
+        transport.post.side_effect = IOError('connection reset')
+        client = self._make_auth_client(transport)
+        self.assertRaises(IOError, client.cancel_order, 1)
+        info = self.post_request_hook.call_args[0][0]
+        self.assertIsInstance(info.error, IOError)
+        self.assertEqual(info.msg_type, consts.MessageType.CANCEL_ORDER)
+        self.assertIn('total', info.timings)
+
+    def test_it_does_not_let_hooks_break_requests(self):
+        self.pre_request_hook.side_effect = ValueError
+        transport = mock.Mock()
+        transport.post.return_value = mock.Mock(content=b'{"Responses": []}', status_code=200)
+        with mock.patch.object(instrumentation.logger, 'exception') as log_exception:
+            self._make_auth_client(transport).get_balance()
+        self.assertTrue(log_exception.called)
+        self.assertTrue(self.post_request_hook.called)
+
+    def test_it_instruments_market_data_against_a_local_server(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            with transports.HttpTransport() as transport:
+                client = clients.OpenClient(
+                    consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT,
+                    transport=transport, instrumentation=self.instrumentation,
+                )
+                client.environment_server = 'http://127.0.0.1:{}'.format(server.server_address[1])
+                client.get_ticker()
+        finally:
+            server.shutdown()
+            server.server_close()
+        info = self.post_request_hook.call_args[0][0]
+        self.assertEqual((info.endpoint, info.msg_type, info.status), (consts.MarketInformation.TICKER, None, 200))
+        self.assertGreater(info.response_size, 0)
+        self.assertTrue({'transport', 'wait', 'download', 'decode', 'total'} <= set(info.timings))
+
+    def test_it_instruments_the_async_client(self):
+        client = AsyncOpenClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT,
+            transport=FakeAsyncTransport({'pair': 'BTCBRL'}), instrumentation=self.instrumentation,
+        )
+        run(client.get_order_book())
+        info = self.post_request_hook.call_args[0][0]
+        self.assertEqual(info.endpoint, consts.MarketInformation.ORDER_BOOK)
+        self.assertEqual(info.response_size, len(b'{"pair": "BTCBRL"}'))
+
+    @skipIf(async_transports.aiohttp is None, 'aiohttp is not installed')
+    def test_it_measures_connection_phases_with_aiohttp(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        async def get_timings():
+            async with async_transports.AsyncHttpTransport() as transport:
+                url = 'http://127.0.0.1:{}/'.format(server.server_address[1])
+                first = await transport.get(url)
+                second = await transport.get(url)
+                return first.timings, second.timings
+
+        try:
+            first, second = run(get_timings())
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertTrue({'connect', 'wait', 'download'} <= set(first))
+        self.assertNotIn('connect', second)
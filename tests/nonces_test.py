@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from unittest import TestCase
+
+import mock
+
+from blinktrade import clients, consts, nonces
+
+
+def generate_nonces(path, count, queue):
+    provider = nonces.SharedNonceProvider('key', path=path)
+    queue.put([int(provider.get_nonce()) for _ in range(count)])
+
+
+class MonotonicNonceProviderTestCase(TestCase):
+    @mock.patch('blinktrade.nonces.datetime')
+    def test_it_never_repeats_a_nonce_when_the_clock_stands_still(self, mocked_datetime):
+        mocked_datetime.utcnow.return_value = datetime(2016, 8, 1, 15, 0, 0)
+        provider = nonces.MonotonicNonceProvider()
+        values = [int(provider.get_nonce()) for _ in range(3)]
+        self.assertEqual(values, [values[0], values[0] + 1, values[0] + 2])
+
+    def test_it_is_strictly_increasing_across_threads(self):
+        provider = nonces.MonotonicNonceProvider()
+        values = []
+
+        def generate():
+            values.extend(int(provider.get_nonce()) for _ in range(1000))
+
+        threads = [threading.Thread(target=generate) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(values)), 4000)
+
+    def test_it_shares_the_provider_of_a_key(self):
+        first_client = clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+        )
+        second_client = clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.CHILEAN_PESOS, consts.Broker.FOXBIT, 'key', 'secret',
+        )
+        self.assertIs(first_client.nonce_provider, second_client.nonce_provider)
+
+
+class SharedNonceProviderTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'nonce.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_it_continues_from_the_stored_nonce(self):
+        provider = nonces.SharedNonceProvider('key', path=self.path)
+        last_nonce = int(provider.get_nonce())
+        provider.close()
+        with open(self.path, 'r+b') as counter_file:
+            counter_file.write(nonces.SharedNonceProvider._COUNTER.pack(last_nonce + 10 ** 9))
+        self.assertEqual(int(nonces.SharedNonceProvider('key', path=self.path).get_nonce()), last_nonce + 10 ** 9 + 1)
+
+    @mock.patch('blinktrade.nonces.tempfile.gettempdir')
+    def test_it_names_the_counter_file_after_the_key(self, mocked_gettempdir):
+        mocked_gettempdir.return_value = self.directory
+        provider = nonces.SharedNonceProvider('key')
+        self.assertEqual(os.path.dirname(provider.path), self.directory)
+        self.assertNotIn('key', os.path.basename(provider.path))
+        self.assertNotEqual(provider.path, nonces.SharedNonceProvider('another_key').path)
+
+    def test_it_is_strictly_increasing_across_processes(self):
+        queue = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=generate_nonces, args=(self.path, 1000, queue)) for _ in range(3)
+        ]
+        for process in processes:
+            process.start()
+        results = [queue.get(timeout=10) for _ in processes]
+        for process in processes:
+            process.join()
+        for values in results:
+            self.assertEqual(values, sorted(values))
+        self.assertEqual(len({value for values in results for value in values}), 3000)
@@ -115,18 +115,29 @@ class OpenClientTestCase(TestCase):
             'invalid_broker'
         )
 
-    @mock.patch('blinktrade.clients.requests')
-    def test_it_gets_market_data(self, mocked_request):
-        mocked_request.get = mock.MagicMock()
+    def test_it_gets_market_data(self):
+        transport = mock.MagicMock()
+        transport.get.return_value.content = b'[]'
         client = clients.OpenClient(
-            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, transport=transport
         )
         trades_since_param = '?since=0'
         client._get_market_data(consts.MarketInformation.TRADES, trades_since_param)
         self.assertIn(
-            consts.ENVIRONMENT_TO_SERVER_MAP[consts.Environment.PRODUCTION], mocked_request.get.call_args[0][0]
+            consts.ENVIRONMENT_TO_SERVER_MAP[consts.Environment.PRODUCTION], transport.get.call_args[0][0]
+        )
+        self.assertIn(clients.OpenClient.API_VERSION, transport.get.call_args[0][0])
+        self.assertIn(consts.Currency.BRAZILIAN_REAIS, transport.get.call_args[0][0])
+        self.assertIn(consts.MarketInformation.TRADES, transport.get.call_args[0][0])
+        self.assertIn(trades_since_param, transport.get.call_args[0][0])
+
+    def test_it_shares_a_transport_between_clients(self):
+        transport = mock.MagicMock()
+        open_client = clients.OpenClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, transport=transport
+        )
+        auth_client = clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            transport=transport,
         )
-        self.assertIn(clients.OpenClient.API_VERSION, mocked_request.get.call_args[0][0])
-        self.assertIn(consts.Currency.BRAZILIAN_REAIS, mocked_request.get.call_args[0][0])
-        self.assertIn(consts.MarketInformation.TRADES, mocked_request.get.call_args[0][0])
-        self.assertIn(trades_since_param, mocked_request.get.call_args[0][0])
+        self.assertIs(open_client.transport, auth_client.transport)
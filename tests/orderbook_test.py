@@ -0,0 +1,107 @@
+from unittest import TestCase
+
+import mock
+
+from blinktrade import orderbook
+from blinktrade.orderbook import BookSide, LocalOrderBook, OrderBook, OrderBookDelta
+
+ORDER_BOOK_RESPONSE = {
+    'bids': [[2100.0, 1.5, 1], [2096.07, 12.0, 90824262], [2096.06, 4.8612554, 90803493]],
+    'pair': 'BTCBRL',
+    'asks': [[2200.0, 2.5, 2], [2125.9, 0.708, 90824262], [2125.91, 4.55290567, 90800515]],
+}
+
+
+class OrderBookTestCase(TestCase):
+    def setUp(self):
+        self.order_book = OrderBook.from_response(ORDER_BOOK_RESPONSE)
+
+    def test_it_sorts_levels_from_best_to_worst(self):
+        self.assertEqual(list(self.order_book.bids.prices), [2100.0, 2096.07, 2096.06])
+        self.assertEqual(list(self.order_book.asks.prices), [2125.9, 2125.91, 2200.0])
+        self.assertEqual(list(self.order_book.asks.user_ids), [90824262, 90800515, 2])
+
+    def test_it_gets_best_prices(self):
+        self.assertEqual(self.order_book.pair, 'BTCBRL')
+        self.assertEqual(self.order_book.best_bid, 2100.0)
+        self.assertEqual(self.order_book.best_ask, 2125.9)
+        self.assertAlmostEqual(self.order_book.spread, 25.9)
+        self.assertAlmostEqual(self.order_book.mid_price, 2112.95)
+
+    def test_it_gets_depth(self):
+        self.assertAlmostEqual(self.order_book.depth(BookSide.BIDS), 18.3612554)
+        self.assertAlmostEqual(self.order_book.depth(BookSide.BIDS, levels=2), 13.5)
+        self.assertAlmostEqual(self.order_book.depth(BookSide.BIDS, price=2096.07), 13.5)
+        self.assertAlmostEqual(self.order_book.depth(BookSide.ASKS, price=2125.91), 5.26090567)
+        self.assertEqual(self.order_book.depth(BookSide.ASKS, price=2000), 0.0)
+
+    def test_it_gets_vwap_and_slippage(self):
+        self.assertAlmostEqual(self.order_book.vwap(BookSide.BIDS, 1), 2100.0)
+        vwap = (1.5 * 2100.0 + 2 * 2096.07) / 3.5
+        self.assertAlmostEqual(self.order_book.vwap(BookSide.BIDS, 3.5), vwap)
+        self.assertAlmostEqual(self.order_book.slippage(BookSide.BIDS, 3.5), 2100.0 - vwap)
+        self.assertIsNone(self.order_book.vwap(BookSide.ASKS, 100))
+        self.assertRaises(ValueError, self.order_book.vwap, BookSide.ASKS, 0)
+
+    def test_it_gets_imbalance(self):
+        self.assertAlmostEqual(self.order_book.imbalance(levels=1), (1.5 - 0.708) / (1.5 + 0.708))
+
+    def test_it_handles_an_empty_book(self):
+        order_book = OrderBook.from_response({'pair': 'BTCBRL', 'bids': [], 'asks': []})
+        self.assertIsNone(order_book.best_bid)
+        self.assertIsNone(order_book.spread)
+        self.assertEqual(order_book.depth(BookSide.ASKS), 0.0)
+        self.assertEqual(order_book.imbalance(), 0.0)
+
+    def test_it_rejects_invalid_side(self):
+        self.assertRaises(ValueError, self.order_book.depth, 'invalid_side')
+
+
+@mock.patch('blinktrade.orderbook.numpy', None)
+class ArrayOrderBookTestCase(OrderBookTestCase):
+    def setUp(self):
+        with mock.patch('blinktrade.orderbook.numpy', None):
+            super(ArrayOrderBookTestCase, self).setUp()
+
+    def test_it_uses_array_module(self):
+        self.assertIsNone(orderbook.numpy)
+        self.assertEqual(self.order_book.bids.prices.typecode, 'd')
+
+
+class LocalOrderBookTestCase(TestCase):
+    def setUp(self):
+        self.local_book = LocalOrderBook()
+        self.initial_deltas = self.local_book.update(ORDER_BOOK_RESPONSE)
+
+    def test_it_adds_every_level_of_the_first_snapshot(self):
+        self.assertEqual(len(self.initial_deltas), 6)
+        self.assertTrue(all(delta.action == OrderBookDelta.ADD for delta in self.initial_deltas))
+        self.assertEqual(self.local_book.pair, 'BTCBRL')
+        self.assertEqual(self.local_book.best_bid, 2100.0)
+        self.assertEqual(self.local_book.best_ask, 2125.9)
+        self.assertEqual(self.local_book.get_levels(BookSide.BIDS, 2), [(2100.0, 1.5), (2096.07, 12.0)])
+
+    def test_it_emits_only_changed_levels(self):
+        deltas = self.local_book.update({
+            'pair': 'BTCBRL',
+            'bids': [[2101.0, 1.0, 3], [2100.0, 1.5, 1], [2096.07, 10.0, 90824262], [2096.07, 1.0, 4]],
+            'asks': [[2200.0, 2.5, 2], [2125.9, 0.708, 90824262], [2125.91, 4.55290567, 90800515]],
+        })
+        self.assertEqual(sorted(deltas), sorted([
+            OrderBookDelta(BookSide.BIDS, OrderBookDelta.ADD, 2101.0, 1.0),
+            OrderBookDelta(BookSide.BIDS, OrderBookDelta.UPDATE, 2096.07, 11.0),
+            OrderBookDelta(BookSide.BIDS, OrderBookDelta.REMOVE, 2096.06, 0),
+        ]))
+        self.assertEqual(self.local_book.best_bid, 2101.0)
+        self.assertEqual(self.local_book.version, 2)
+
+    def test_it_returns_no_deltas_for_the_same_snapshot(self):
+        self.assertEqual(self.local_book.update(ORDER_BOOK_RESPONSE), [])
+
+    def test_it_replicates_a_book_from_deltas(self):
+        replica = LocalOrderBook('BTCBRL')
+        replica.apply(self.initial_deltas)
+        replica.apply(self.local_book.update({'pair': 'BTCBRL', 'bids': [[2100.0, 2.0, 1]], 'asks': []}))
+        self.assertEqual(replica.get_levels(BookSide.BIDS), [(2100.0, 2.0)])
+        self.assertEqual(replica.get_levels(BookSide.ASKS), [])
+        self.assertEqual(replica.to_order_book().depth(BookSide.BIDS), 2.0)
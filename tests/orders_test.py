@@ -0,0 +1,142 @@
+from unittest import TestCase
+
+import mock
+
+from blinktrade import clients, consts, orders
+from blinktrade.async_clients import AsyncAuthClient
+from blinktrade.async_orders import AsyncOpenOrderCache
+from benchmarks import fixtures
+from tests.async_clients_test import FakeAsyncTransport, run
+
+
+def make_order(cl_ord_id, order_id, status=consts.OrderStatus.NEW, side=consts.OrderSide.BUY, price=2175.0,
+               leaves_qty=0.0313, cum_qty=0.0):
+    return {
+        'ClOrdID': cl_ord_id, 'OrderID': order_id, 'OrdStatus': status, 'Side': side, 'Price': price,
+        'LeavesQty': leaves_qty, 'CumQty': cum_qty,
+    }
+
+
+class OpenOrderCacheTestCase(TestCase):
+    def setUp(self):
+        self.clock = mock.Mock(return_value=0)
+        self.cache = orders.OpenOrderCache(reconcile_interval=30, clock=self.clock)
+
+    def test_it_indexes_open_orders_by_ids_and_price(self):
+        first = make_order(1, 101)
+        second = make_order('2', 102)
+        self.cache.update_orders([first, second, {'BRL': 1.0}])
+        self.assertEqual(len(self.cache), 2)
+        self.assertIs(self.cache.get('1'), first)
+        self.assertIn(2, self.cache)
+        self.assertIs(self.cache.get_by_order_id(102), second)
+        self.assertEqual(self.cache.get_orders_at_price(consts.OrderSide.BUY, 2175.0), [first, second])
+        self.assertEqual(self.cache.get_orders_at_price(consts.OrderSide.SELL, 2175.0), [])
+
+    def test_it_moves_updated_orders_to_their_new_price(self):
+        self.cache.update(make_order(1, 101))
+        change = self.cache.update(make_order(1, 101, status=consts.OrderStatus.PARTIALLY_FILL, price=2180.0))
+        self.assertEqual(change.action, orders.OrderChange.UPDATE)
+        self.assertEqual(self.cache.get_orders_at_price(consts.OrderSide.BUY, 2175.0), [])
+        self.assertEqual(len(self.cache.get_orders_at_price(consts.OrderSide.BUY, 2180.0)), 1)
+
+    def test_it_removes_cancelled_and_filled_orders(self):
+        self.cache.update_orders([make_order(1, 101), make_order(2, 102), make_order(3, 103)])
+        changes = self.cache.update_orders([
+            make_order(9, 101, status=consts.OrderStatus.CANCELLED),
+            make_order(2, 102, status=consts.OrderStatus.FILL, leaves_qty=0),
+            make_order(3, 103, status=consts.OrderStatus.PARTIALLY_FILL, leaves_qty=0),
+        ])
+        self.assertEqual([(change.action, change.cl_ord_id) for change in changes], [
+            (orders.OrderChange.REMOVE, '1'), (orders.OrderChange.REMOVE, '2'), (orders.OrderChange.REMOVE, '3'),
+        ])
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.get_by_order_id(101), None)
+        self.assertEqual(self.cache.update(make_order(4, 104, status=consts.OrderStatus.FILL)), None)
+
+    def test_it_reconciles_with_the_pending_orders(self):
+        self.cache.update_orders([make_order(1, 101), make_order(2, 102)])
+        client = mock.Mock()
+
+        def iter_pending_orders(page_size):
+            self.cache.update(make_order(3, 103))
+            return iter([make_order('2', 102, price=2180.0), make_order('4', 104)])
+
+        client.iter_pending_orders.side_effect = iter_pending_orders
+        self.assertTrue(self.cache.is_reconcile_due())
+        changes = self.cache.reconcile(client)
+        self.assertEqual(sorted((change.action, change.cl_ord_id) for change in changes), [
+            (orders.OrderChange.ADD, '4'), (orders.OrderChange.REMOVE, '1'), (orders.OrderChange.UPDATE, '2'),
+        ])
+        self.assertEqual(sorted(order['OrderID'] for order in self.cache), [102, 103, 104])
+        self.assertFalse(self.cache.is_reconcile_due())
+        self.clock.return_value = 30
+        self.assertTrue(self.cache.is_reconcile_due())
+
+    def test_it_keeps_changes_made_while_reconciling(self):
+        self.cache.update_orders([make_order(1, 101), make_order(2, 102)])
+        client = mock.Mock()
+
+        def iter_pending_orders(page_size):
+            # the listing is read before the cancel and the fill reports arrive
+            listing = [make_order(1, 101), make_order(2, 102)]
+            self.cache.update(make_order(1, 101, status=consts.OrderStatus.CANCELLED, leaves_qty=0))
+            self.cache.update(make_order(2, 102, status=consts.OrderStatus.PARTIALLY_FILL, cum_qty=0.01))
+            self.cache.update_orders(listing)
+            return iter(listing)
+
+        client.iter_pending_orders.side_effect = iter_pending_orders
+        self.assertEqual(self.cache.reconcile(client), [])
+        self.assertNotIn(1, self.cache)
+        self.assertEqual(self.cache.get(2)['CumQty'], 0.01)
+        self.assertEqual(self.cache._removed, {})
+
+    def test_it_ignores_rows_older_than_the_cached_order(self):
+        self.cache.update(make_order(1, 101, status=consts.OrderStatus.PARTIALLY_FILL, cum_qty=0.01))
+        self.assertEqual(self.cache.update(make_order(1, 101)), None)
+        self.assertEqual(self.cache.get(1)['CumQty'], 0.01)
+
+
+class OrderCacheClientTestCase(TestCase):
+    def setUp(self):
+        self.cache = orders.OpenOrderCache()
+        self.client = clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            order_cache=self.cache,
+        )
+
+    def test_it_updates_the_cache_from_order_responses(self):
+        with mock.patch.object(self.client, '_send_request', return_value=fixtures.make_order_response(2)):
+            self.client.buy_bitcoins_with_limited_order(2175, 0.0313)
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.get(1467403664)['Price'], 2175.0)
+
+        cancel_response = fixtures.make_order_response(1)
+        cancel_response['Responses'][0].update(OrdStatus=consts.OrderStatus.CANCELLED, LeavesQty=0)
+        with mock.patch.object(self.client, '_send_request', return_value=cancel_response):
+            self.client.cancel_order(1467403664)
+        self.assertEqual(self.cache.get(1467403664), None)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_it_updates_the_cache_from_order_status_tables(self):
+        response = fixtures.make_order_status_response(3)
+        with mock.patch.object(self.client, '_send_request', return_value=response):
+            self.client.get_pending_orders(as_table=True)
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(self.cache.get_by_order_id(1459144231835)['ClOrdID'], '2961107')
+        self.assertEqual(len(self.cache.get_orders_at_price(consts.OrderSide.BUY, 2175.0)), 3)
+
+    def test_it_reconciles_with_an_async_client(self):
+        cache = AsyncOpenOrderCache()
+        client = AsyncAuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            transport=FakeAsyncTransport(fixtures.make_order_status_response(2)), order_cache=cache,
+        )
+        cache.update(make_order(1, 101))
+        changes = run(cache.reconcile(client))
+        # the client already stored the listed orders, so only the removal is left to the reconciliation
+        self.assertEqual([change.action for change in changes], [orders.OrderChange.REMOVE])
+        self.assertEqual(sorted(cache.get(cl_ord_id)['OrderID'] for cl_ord_id in ('2961106', '2961107')), [
+            1459144231834, 1459144231835,
+        ])
+        self.assertNotIn(1, cache)
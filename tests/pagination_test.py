@@ -0,0 +1,117 @@
+import threading
+import time
+from unittest import TestCase
+
+import mock
+
+from blinktrade import clients, consts
+from blinktrade.async_clients import AsyncAuthClient
+from blinktrade.pagination import Page, PageIterator
+from tests.async_clients_test import FakeAsyncTransport, run
+
+
+def make_orders_response(page, page_size, total, max_page_size=None):
+    page_size = min(page_size, max_page_size or page_size)
+    rows = [[str(row), 3130000, 217500000000] for row in range(page * page_size, min(total, (page + 1) * page_size))]
+    return {u'Responses': [{
+        u'MsgType': u'U5',
+        u'Page': page,
+        u'PageSize': page_size,
+        u'Columns': [u'ClOrdID', u'OrderQty', u'Price'],
+        u'OrdListGrp': rows,
+    }, {
+        u'MsgType': u'U3',
+        u'4': {u'BRL': 100000000},
+    }]}
+
+
+class PageIteratorTestCase(TestCase):
+    def test_it_iterates_over_every_page(self):
+        fetch_page = mock.Mock(side_effect=lambda page, page_size: list(range(page * 2, min(5, page * 2 + 2))))
+        self.assertEqual(list(PageIterator(fetch_page, page_size=2)), [0, 1, 2, 3, 4])
+        self.assertEqual(fetch_page.call_count, 3)
+
+    def test_it_fetches_pages_only_when_needed_without_prefetch(self):
+        fetch_page = mock.Mock(side_effect=lambda page, page_size: [page] * page_size)
+        iterator = iter(PageIterator(fetch_page, page_size=2, prefetch=0))
+        next(iterator)
+        self.assertEqual(fetch_page.call_count, 1)
+
+    def test_it_stops_after_an_empty_last_page(self):
+        fetch_page = mock.Mock(side_effect=[[1, 2], []])
+        self.assertEqual(list(PageIterator(fetch_page, page_size=2)), [1, 2])
+
+    def test_it_uses_the_page_size_applied_by_the_server(self):
+        fetch_page = mock.Mock(side_effect=[Page([1, 2], page_size=2), Page([3, 4], page_size=2), Page([5], 2)])
+        self.assertEqual(list(PageIterator(fetch_page, page_size=5)), [1, 2, 3, 4, 5])
+        self.assertEqual(fetch_page.call_count, 3)
+
+    def test_it_prefetches_the_next_page_in_background(self):
+        fetched = []
+        prefetched = threading.Event()
+
+        def fetch_page(page, page_size):
+            fetched.append(page)
+            if page == 1:
+                prefetched.set()
+            return [page] * page_size
+
+        iterator = iter(PageIterator(fetch_page, page_size=2, prefetch=1))
+        self.assertEqual(next(iterator), 0)
+        self.assertTrue(prefetched.wait(1))
+        time.sleep(0.05)
+        self.assertLessEqual(len(fetched), 3)
+
+    def test_it_raises_errors_of_the_background_fetch(self):
+        fetch_page = mock.Mock(side_effect=[[1, 2], ValueError('failed')])
+        iterator = iter(PageIterator(fetch_page, page_size=2))
+        self.assertEqual([next(iterator), next(iterator)], [1, 2])
+        self.assertRaises(ValueError, next, iterator)
+
+
+class AuthClientPaginationTestCase(TestCase):
+    def test_it_iterates_over_every_pending_order(self):
+        client = clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+        )
+        with mock.patch.object(client, '_send_request', side_effect=lambda msg: make_orders_response(
+            msg['Page'], msg['PageSize'], total=7,
+        )) as send:
+            orders = list(client.iter_pending_orders(page_size=3, prefetch=2))
+        self.assertEqual([order['ClOrdID'] for order in orders], [str(row) for row in range(7)])
+        self.assertEqual(orders[0]['Price'], 2175.0)
+        self.assertEqual(send.call_count, 3)
+        self.assertEqual(send.call_args[0][0]['Filter'], ['has_leaves_qty eq 1'])
+
+    def test_it_iterates_over_every_order_when_the_server_caps_the_page_size(self):
+        client = clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+        )
+        with mock.patch.object(client, '_send_request', side_effect=lambda msg: make_orders_response(
+            msg['Page'], msg['PageSize'], total=45, max_page_size=20,
+        )) as send:
+            orders = list(client.iter_pending_orders(page_size=50, prefetch=0))
+        self.assertEqual([order['ClOrdID'] for order in orders], [str(row) for row in range(45)])
+        self.assertEqual(send.call_count, 3)
+
+    def test_it_iterates_over_every_executed_order_asynchronously(self):
+        client = AsyncAuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            transport=FakeAsyncTransport(None),
+        )
+        requested_pages = []
+
+        async def send_request(msg):
+            requested_pages.append(msg['Page'])
+            return make_orders_response(msg['Page'], msg['PageSize'], total=7)
+
+        async def consume():
+            orders = []
+            async for order in client.iter_executed_orders(page_size=3, prefetch=3):
+                orders.append(order['ClOrdID'])
+            return orders
+
+        with mock.patch.object(client, '_send_request', side_effect=send_request):
+            orders = run(consume())
+        self.assertEqual(orders, [str(row) for row in range(7)])
+        self.assertEqual(requested_pages[:3], [0, 1, 2])
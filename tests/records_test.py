@@ -0,0 +1,99 @@
+import pickle
+import sys
+from unittest import TestCase
+
+import mock
+
+from blinktrade import clients, consts, records
+from blinktrade.async_clients import AsyncOpenClient
+from tests.async_clients_test import FakeAsyncTransport, run
+
+TICKER = {
+    'pair': 'BTCBRL', 'high': 2500.0, 'low': 2000.0, 'last': 2150.0, 'vol': 100.0, 'vol_brl': 25000.00000005,
+    'buy': 2100.0, 'sell': 2200.0,
+}
+TRADES = [{'tid': 1, 'date': 1470063600, 'price': 2150.0, 'amount': 0.5, 'side': 'buy'}]
+
+
+class RecordTestCase(TestCase):
+    def test_it_supports_attribute_and_dict_access(self):
+        ticker = records.Ticker.from_dict(TICKER)
+        self.assertIsInstance(ticker, records.Ticker)
+        self.assertEqual(ticker.last, 2150.0)
+        self.assertEqual(ticker['vol_brl'], 25000.00000005)
+        self.assertEqual(ticker.get('missing'), None)
+        self.assertEqual(ticker, TICKER)
+        self.assertEqual(ticker.to_dict(), TICKER)
+        self.assertEqual(set(ticker.keys()), set(TICKER))
+        self.assertRaises(KeyError, ticker.__getitem__, 'missing')
+
+    def test_it_reuses_the_class_of_a_key_set(self):
+        first = records.Trade.from_dict({'tid': 1, 'price': 1.0})
+        second = records.Trade.from_dict({'tid': 2, 'price': 2.0})
+        self.assertIs(type(first), type(second))
+        self.assertIsNot(type(first), type(records.Trade.from_dict({'tid': 3})))
+        self.assertIs(type(records.Trade.from_dict(first)), type(first))
+
+    def test_it_keeps_keys_that_cannot_be_slots(self):
+        record = records.Balance.from_dict({'BRL': 1.0, '4': 2.0, 'keys': 3.0})
+        self.assertEqual(record['4'], 2.0)
+        self.assertEqual(record['keys'], 3.0)
+        self.assertEqual(len(record), 3)
+        self.assertTrue(callable(record.keys))
+
+    def test_it_updates_values_like_a_dict(self):
+        order = records.Order.from_dict({'ClOrdID': 1, 'Price': 217500000000})
+        order['Price'] = 2175.0
+        order['OrdStatus'] = '0'
+        self.assertEqual(order.Price, 2175.0)
+        self.assertEqual(order['OrdStatus'], '0')
+
+    def test_it_can_be_pickled(self):
+        ticker = records.Ticker.from_dict(TICKER)
+        self.assertEqual(pickle.loads(pickle.dumps(ticker)), ticker)
+
+    def test_it_takes_less_memory_than_a_dict(self):
+        ticker = records.Ticker.from_dict(TICKER)
+        self.assertFalse(hasattr(ticker, '__dict__'))
+        self.assertLess(sys.getsizeof(ticker), sys.getsizeof(dict(TICKER)))
+
+
+class ClientRecordsTestCase(TestCase):
+    def _make_open_client(self, transport):
+        return clients.OpenClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT,
+            transport=transport, use_records=True,
+        )
+
+    def test_it_returns_ticker_and_trade_records(self):
+        transport = mock.MagicMock()
+        client = self._make_open_client(transport)
+        with mock.patch.object(client, '_fetch_market_data', side_effect=[dict(TICKER), [dict(TRADES[0])]]):
+            self.assertIsInstance(client.get_ticker(), records.Ticker)
+            trades = client.get_trade_list()
+        self.assertIsInstance(trades[0], records.Trade)
+        self.assertEqual(trades, TRADES)
+
+    def test_it_returns_records_from_the_async_client(self):
+        client = AsyncOpenClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT,
+            transport=FakeAsyncTransport(TICKER), use_records=True,
+        )
+        self.assertEqual(run(client.get_ticker()).vol_brl, 25000.00000005)
+
+    @mock.patch('blinktrade.clients.AuthClient._send_request', return_value={u'Responses': [
+        {u'MsgType': u'8', u'OrderID': 1, u'ClOrdID': 2, u'OrdStatus': u'0', u'Price': 217500000000,
+         u'OrderQty': 3130000},
+        {u'MsgType': u'U3', u'4': {u'BRL_locked': 5500000000}},
+    ]})
+    def test_it_returns_order_and_balance_records(self, _):
+        client = clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            use_records=True,
+        )
+        order, balance = client.buy_bitcoins_with_limited_order(2175, 0.0313)
+        self.assertIsInstance(order, records.Order)
+        self.assertEqual(order.Price, 2175.0)
+        self.assertEqual(order['OrderQty'], 0.0313)
+        self.assertIsInstance(balance, records.Balance)
+        self.assertEqual(balance.BRL_locked, 55.0)
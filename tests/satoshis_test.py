@@ -0,0 +1,68 @@
+import json
+from decimal import Decimal
+from unittest import TestCase
+
+import mock
+
+from blinktrade import clients, consts, satoshis
+
+ORDER_RESPONSE = {u'Responses': [
+    {u'MsgType': u'8', u'OrderID': 1, u'ClOrdID': 2, u'OrdStatus': u'0', u'Price': 217500000000,
+     u'OrderQty': 3130000, u'LeavesQty': 3130000},
+    {u'MsgType': u'U3', u'4': {u'BRL_locked': 5500000000}},
+]}
+
+
+class SatoshiConversionTestCase(TestCase):
+    def test_it_converts_amounts_to_satoshis_exactly(self):
+        self.assertEqual(satoshis.to_satoshis(0.0313), 3130000)
+        self.assertEqual(satoshis.to_satoshis(Decimal('2175.12345678')), 217512345678)
+        self.assertEqual(satoshis.to_satoshis('0.00000001'), 1)
+        self.assertEqual(satoshis.to_satoshis(2), 200000000)
+        self.assertIsNone(satoshis.to_satoshis(None))
+
+    def test_it_rejects_amounts_with_more_than_8_decimal_places(self):
+        self.assertRaises(ValueError, satoshis.to_satoshis, 0.123456789)
+
+    def test_it_converts_satoshis_to_decimals_exactly(self):
+        self.assertEqual(satoshis.from_satoshis(217512345678), Decimal('2175.12345678'))
+        self.assertIsNone(satoshis.from_satoshis(None))
+
+    def test_it_only_accepts_integer_satoshis(self):
+        self.assertEqual(satoshis.validate_satoshis(3130000), 3130000)
+        self.assertRaises(TypeError, satoshis.validate_satoshis, 0.0313)
+        self.assertRaises(TypeError, satoshis.validate_satoshis, True)
+
+
+class SatoshiModeTestCase(TestCase):
+    def setUp(self):
+        self.client = clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            satoshi_mode=True,
+        )
+
+    def test_it_places_orders_with_integer_satoshis(self):
+        with mock.patch.object(self.client, '_send_request', return_value=ORDER_RESPONSE) as send_request:
+            order, balance = self.client.buy_bitcoins_with_limited_order(217500000000, 3130000)
+        msg = send_request.call_args[0][0]
+        self.assertEqual((msg['Price'], msg['OrderQty']), (217500000000, 3130000))
+        self.assertEqual(json.loads(self.client._serialize_msg(msg))['Price'], 217500000000)
+        self.assertEqual(order['Price'], 217500000000)
+        self.assertEqual(order['LeavesQty'], 3130000)
+        self.assertEqual(balance, {u'BRL_locked': 5500000000})
+
+    def test_it_uses_the_market_order_price_in_satoshis(self):
+        with mock.patch.object(self.client, '_send_request', return_value=ORDER_RESPONSE) as send_request:
+            self.client.buy_bitcoins_with_market_order(3130000)
+        self.assertEqual(send_request.call_args[0][0]['Price'], 1000000)
+
+    def test_it_rejects_float_amounts(self):
+        self.assertRaises(TypeError, self.client.sell_bitcoins_with_limited_order, 2175.0, 3130000)
+
+    def test_it_keeps_order_table_columns_in_satoshis(self):
+        response = {u'Responses': [{
+            u'MsgType': u'U5', u'Columns': [u'ClOrdID', u'Price'], u'OrdListGrp': [[u'1', 217500000000]],
+        }]}
+        with mock.patch.object(self.client, '_send_request', return_value=response):
+            table = self.client.get_pending_orders(as_table=True)
+        self.assertEqual(table[0]['Price'], 217500000000)
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+from unittest import TestCase
+
+import mock
+
+from blinktrade import clients, consts, exceptions, scheduling
+from blinktrade.async_clients import AsyncAuthClient
+from blinktrade.async_scheduling import AsyncRequestScheduler
+from tests.async_clients_test import FakeAsyncTransport, run
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketTestCase(TestCase):
+    def test_it_allows_bursts_and_refills_at_the_rate(self):
+        clock = FakeClock()
+        bucket = scheduling.TokenBucket(2, 2, clock)
+        bucket.consume()
+        bucket.consume()
+        self.assertEqual(bucket.get_wait(), 0.5)
+        clock.now = 0.25
+        self.assertEqual(bucket.get_wait(), 0.25)
+        clock.now = 10
+        self.assertEqual(bucket.get_wait(), 0)
+        self.assertEqual(bucket._tokens, 2)
+
+    def test_it_rejects_non_positive_rates(self):
+        with self.assertRaises(ValueError):
+            scheduling.TokenBucket(0)
+
+
+class RequestSchedulerTestCase(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def _make_scheduler(self, **kwargs):
+        scheduler = scheduling.RequestScheduler(rate=1, burst=1, clock=self.clock, **kwargs)
+        scheduler.bucket.consume()
+        return scheduler
+
+    def test_it_grants_messages_by_priority_and_then_by_arrival(self):
+        scheduler = self._make_scheduler()
+        msg_types = [
+            consts.MessageType.GET_ORDERS, consts.MessageType.PLACE_ORDER, consts.MessageType.BALANCE,
+            consts.MessageType.CANCEL_ORDER, consts.MessageType.PLACE_ORDER,
+        ]
+        entries = [scheduler._enqueue(msg_type) for msg_type in msg_types]
+        granted = []
+        for _ in msg_types:
+            self.clock.now += 1
+            with scheduler._lock:
+                self.assertEqual(scheduler._dispatch(), 1.0 if len(granted) < len(msg_types) - 1 else None)
+            granted.extend(entry for entry in entries if entry.granted and entry not in granted)
+        self.assertEqual([entries.index(entry) for entry in granted], [3, 1, 4, 0, 2])
+
+    def test_it_raises_when_the_queue_is_full(self):
+        scheduler = self._make_scheduler(max_queue_depth=2)
+        scheduler._enqueue(consts.MessageType.BALANCE)
+        scheduler._enqueue(consts.MessageType.BALANCE)
+        with self.assertRaises(exceptions.RequestQueueFullException) as context:
+            scheduler._enqueue(consts.MessageType.CANCEL_ORDER)
+        self.assertEqual(context.exception.details, {'depth': 2, 'msg_type': consts.MessageType.CANCEL_ORDER})
+        self.assertEqual(scheduler.get_stats()['rejected'], 1)
+        self.assertEqual(scheduler.get_stats()['max_depth'], 2)
+
+    def test_it_does_not_hold_other_messages_behind_an_empty_msg_type_bucket(self):
+        scheduler = scheduling.RequestScheduler(
+            rate=10, burst=10, msg_type_limits={consts.MessageType.PLACE_ORDER: (1, 1)}, clock=self.clock,
+        )
+        first_order = scheduler._enqueue(consts.MessageType.PLACE_ORDER)
+        second_order = scheduler._enqueue(consts.MessageType.PLACE_ORDER)
+        balance = scheduler._enqueue(consts.MessageType.BALANCE)
+        with scheduler._lock:
+            self.assertEqual(scheduler._dispatch(), 1.0)
+        self.assertEqual([first_order.granted, second_order.granted, balance.granted], [True, False, True])
+        self.clock.now = 1
+        with scheduler._lock:
+            self.assertEqual(scheduler._dispatch(), None)
+        self.assertTrue(second_order.granted)
+
+    def test_it_blocks_threads_until_their_turn_and_records_the_queue_wait(self):
+        scheduler = scheduling.RequestScheduler(rate=50, burst=1)
+        sent = []
+        lock = threading.Lock()
+
+        def send(index):
+            with lock:
+                sent.append(index)
+            return index
+
+        threads = [
+            threading.Thread(target=scheduler.run, args=(consts.MessageType.BALANCE, lambda index=index: send(index)))
+            for index in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(sorted(sent), list(range(5)))
+        stats = scheduler.get_stats()
+        self.assertEqual(stats['dispatched'], 5)
+        self.assertEqual(stats['depth'], 0)
+        self.assertEqual(stats['queue_wait'][consts.MessageType.BALANCE]['count'], 5)
+        self.assertGreaterEqual(stats['queue_wait'][consts.MessageType.BALANCE]['max'], 0.05)
+        self.assertEqual(scheduler.run(consts.MessageType.BALANCE, lambda: 'sent'), 'sent')
+
+
+class AsyncRequestSchedulerTestCase(TestCase):
+    def test_it_sends_waiting_cancels_first(self):
+        scheduler = AsyncRequestScheduler(rate=20, burst=1)
+        sent = []
+
+        async def send(msg_type):
+            sent.append(msg_type)
+
+        async def main():
+            await asyncio.gather(*[
+                scheduler.run(msg_type, lambda msg_type=msg_type: send(msg_type))
+                for msg_type in (
+                    consts.MessageType.PLACE_ORDER, consts.MessageType.GET_ORDERS, consts.MessageType.CANCEL_ORDER,
+                )
+            ])
+
+        run(main())
+        self.assertEqual(sent, [
+            consts.MessageType.PLACE_ORDER, consts.MessageType.CANCEL_ORDER, consts.MessageType.GET_ORDERS,
+        ])
+        self.assertEqual(scheduler.get_stats()['dispatched'], 3)
+
+    def test_it_leaves_the_queue_when_cancelled(self):
+        scheduler = AsyncRequestScheduler(rate=0.01, burst=1)
+        scheduler.bucket.consume()
+
+        async def main():
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(scheduler.run(consts.MessageType.BALANCE, mock.Mock()), 0.01)
+
+        run(main())
+        self.assertEqual(scheduler.get_depth(), 0)
+
+
+class SchedulerClientTestCase(TestCase):
+    def test_it_sends_auth_client_messages_through_the_scheduler(self):
+        scheduler = mock.Mock()
+        scheduler.run.side_effect = lambda msg_type, send: send()
+        transport = mock.Mock()
+        transport.post.return_value.content = b'{"Responses": []}'
+        client = clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            transport=transport, scheduler=scheduler,
+        )
+        client._send_request(client._make_cancel_order_msg(1))
+        self.assertEqual(scheduler.run.call_args[0][0], consts.MessageType.CANCEL_ORDER)
+        self.assertEqual(transport.post.call_count, 1)
+
+    def test_it_sends_async_auth_client_messages_through_the_scheduler(self):
+        scheduler = AsyncRequestScheduler()
+        transport = FakeAsyncTransport({'Responses': []})
+        client = AsyncAuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            transport=transport, scheduler=scheduler,
+        )
+        run(client._send_request(client._make_balance_msg()))
+        self.assertEqual(len(transport.calls), 1)
+        self.assertEqual(scheduler.get_stats()['queue_wait'][consts.MessageType.BALANCE]['count'], 1)
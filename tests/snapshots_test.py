@@ -0,0 +1,65 @@
+import json
+import threading
+import time
+from unittest import TestCase
+
+import mock
+
+from blinktrade import async_snapshots, consts, snapshots
+from tests.async_clients_test import FakeAsyncTransport, run
+
+
+class SlowTransport(object):
+    def __init__(self, delay):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        return mock.Mock(content=json.dumps({'url': url}).encode('utf-8'))
+
+
+class MarketSnapshotClientTestCase(TestCase):
+    def test_it_gets_every_market_by_default(self):
+        client = snapshots.MarketSnapshotClient(
+            consts.Environment.PRODUCTION, consts.Broker.FOXBIT, transport=SlowTransport(0)
+        )
+        snapshot = client.get_snapshot()
+        self.assertIsInstance(snapshot['timestamp'], float)
+        self.assertEqual(set(snapshot['markets']), set(consts.CURRENCIES_CHOICES))
+        market = snapshot['markets'][consts.Currency.BRAZILIAN_REAIS]
+        self.assertIn('/BRL/ticker', market['ticker']['url'])
+        self.assertIn('/BRL/orderbook', market['order_book']['url'])
+        self.assertIn('/BRL/trades?since=0', market['trades']['url'])
+
+    def test_it_fetches_markets_concurrently_with_bounded_parallelism(self):
+        transport = SlowTransport(0.05)
+        client = snapshots.MarketSnapshotClient(
+            consts.Environment.PRODUCTION, consts.Broker.FOXBIT,
+            currencies=[consts.Currency.BRAZILIAN_REAIS, consts.Currency.CHILEAN_PESOS], max_workers=3,
+            transport=transport,
+        )
+        start = time.time()
+        client.get_snapshot()
+        self.assertLess(time.time() - start, 6 * transport.delay)
+        self.assertEqual(transport.max_in_flight, 3)
+
+
+class AsyncMarketSnapshotClientTestCase(TestCase):
+    def test_it_gets_a_snapshot(self):
+        client = async_snapshots.AsyncMarketSnapshotClient(
+            consts.Environment.PRODUCTION, consts.Broker.FOXBIT,
+            currencies=[consts.Currency.BRAZILIAN_REAIS, consts.Currency.CHILEAN_PESOS], max_workers=2,
+            transport=FakeAsyncTransport({'pair': 'BTCBRL'}),
+        )
+        snapshot = run(client.get_snapshot(since_ts=10))
+        self.assertEqual(snapshot['markets'][consts.Currency.CHILEAN_PESOS]['ticker'], {'pair': 'BTCBRL'})
+        self.assertEqual(len(client.transport.calls), 6)
+        self.assertTrue(any('?since=10' in call[1] for call in client.transport.calls))
@@ -0,0 +1,118 @@
+import mmap
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import mock
+
+from blinktrade.stores import TradeStore
+
+
+def make_trades(count, start_tid=1, start_date=1467037000):
+    return [
+        {
+            'tid': tid,
+            'date': start_date + tid // 3,
+            'price': 2300.5,
+            'amount': 0.29,
+            'side': 'buy' if tid % 2 else 'sell',
+        }
+        for tid in range(start_tid, start_tid + count)
+    ]
+
+
+class TradeStoreTestCase(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.store = TradeStore(os.path.join(self.path, 'trades'), index_step=4)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.path)
+
+    def test_it_appends_and_reads_trades(self):
+        self.assertEqual(self.store.append(make_trades(10)), 10)
+        self.assertEqual(len(self.store), 10)
+        trades = list(self.store.iter_trades())
+        self.assertEqual(trades[0], make_trades(1)[0])
+        self.assertEqual(list(self.store.get_column('price')), [230050000000] * 10)
+        self.assertEqual(list(self.store.get_column('amount')), [29000000] * 10)
+        self.assertEqual(list(self.store.get_column('side'))[:2], [1, 2])
+
+    def test_it_skips_trades_already_stored(self):
+        self.store.append(make_trades(10))
+        self.assertEqual(self.store.append(make_trades(15)), 5)
+        self.assertEqual(list(self.store.get_column('tid')), list(range(1, 16)))
+
+    def test_it_rejects_trades_out_of_timestamp_order(self):
+        self.store.append(make_trades(10))
+        self.assertRaises(ValueError, self.store.append, make_trades(1, start_tid=11, start_date=0))
+
+    def test_it_searches_time_ranges(self):
+        self.store.append(make_trades(30))
+        dates = list(self.store.get_column('date'))
+        for timestamp in range(dates[0] - 1, dates[-1] + 2):
+            self.assertEqual(self.store.search(timestamp), sum(1 for date in dates if date < timestamp))
+            self.assertEqual(self.store.search(timestamp, 'right'), sum(1 for date in dates if date <= timestamp))
+        trades = list(self.store.iter_trades(dates[5], dates[20]))
+        self.assertTrue(all(dates[5] <= trade['date'] < dates[20] for trade in trades))
+        self.assertEqual(len(trades), sum(1 for date in dates if dates[5] <= date < dates[20]))
+
+    def test_it_extends_the_index_without_remapping_on_every_append(self):
+        with mock.patch('blinktrade.stores.mmap.mmap', wraps=mmap.mmap) as map_column:
+            for start_tid in range(1, 31, 3):
+                self.store.append(make_trades(3, start_tid=start_tid))
+            self.assertEqual(map_column.call_count, 0)
+            self.assertEqual(self.store.last_tid, 30)
+            self.assertEqual(list(self.store.get_column('tid')), list(range(1, 31)))
+            self.assertEqual(map_column.call_count, len(TradeStore.COLUMNS))
+        dates = list(self.store.get_column('date'))
+        self.assertEqual(self.store._index, dates[::4])
+
+    def test_it_closes_the_maps(self):
+        self.store.append(make_trades(10))
+        self.assertEqual(len(list(self.store.iter_trades())), 10)
+        maps = list(self.store._maps.values())
+        self.store.append(make_trades(1, start_tid=11))
+        self.assertEqual(self.store.last_timestamp, make_trades(11)[-1]['date'])
+        list(self.store.iter_trades())
+        self.assertTrue(all(column_map.closed for column_map in maps))
+        maps = list(self.store._maps.values())
+        self.store.close()
+        self.assertTrue(all(column_map.closed for column_map in maps))
+
+    def test_it_reopens_an_existing_store(self):
+        self.store.append(make_trades(10))
+        self.store.close()
+        self.store = TradeStore(self.store.path, index_step=4)
+        self.assertEqual(len(self.store), 10)
+        self.assertEqual(self.store.last_tid, 10)
+
+    def test_it_drops_partially_written_rows_when_reopening(self):
+        self.store.append(make_trades(10))
+        self.store.close()
+        with open(os.path.join(self.store.path, 'date.bin'), 'ab') as date_file:
+            date_file.write(b'\0' * 8)
+        self.store = TradeStore(self.store.path)
+        self.assertEqual(len(self.store), 10)
+        self.assertEqual(self.store.append(make_trades(1, start_tid=11)), 1)
+        self.assertEqual(list(self.store.iter_trades())[-1]['tid'], 11)
+
+    def test_it_syncs_from_the_last_stored_timestamp(self):
+        self.store.append(make_trades(3))
+        client = mock.Mock()
+        client.get_trade_list.return_value = make_trades(5)
+        self.assertEqual(self.store.sync(client), 2)
+        client.get_trade_list.assert_called_once_with(make_trades(3)[-1]['date'])
+
+    def test_it_handles_an_empty_store(self):
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual(self.store.search(100), 0)
+        self.assertEqual(list(self.store.iter_trades()), [])
+        self.assertEqual(len(self.store.get_column('date')), 0)
+
+    @mock.patch('blinktrade.stores.numpy', None)
+    def test_it_returns_memoryviews_without_numpy(self):
+        self.store.append(make_trades(3))
+        self.assertIsInstance(self.store.get_column('tid'), memoryview)
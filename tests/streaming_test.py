@@ -0,0 +1,243 @@
+import asyncio
+import json
+import logging
+from unittest import TestCase, skipIf
+
+from blinktrade import balances, clients, consts, exceptions, orders
+from blinktrade.streaming import StreamingClient, StreamUpdate
+from benchmarks import fixtures
+from tests.async_clients_test import run
+
+try:
+    from aiohttp import web
+except ImportError:  # pragma: no cover
+    web = None
+
+FULL_REFRESH = {
+    'MsgType': 'W',
+    'Symbol': 'BTCBRL',
+    'MDFullGrp': [
+        {'MDEntryType': '0', 'MDEntryPositionNo': 1, 'MDEntryPx': 210000000000, 'MDEntrySize': 150000000, 'UserID': 1},
+        {'MDEntryType': '0', 'MDEntryPositionNo': 2, 'MDEntryPx': 209000000000, 'MDEntrySize': 50000000, 'UserID': 3},
+        {'MDEntryType': '1', 'MDEntryPositionNo': 1, 'MDEntryPx': 220000000000, 'MDEntrySize': 250000000, 'UserID': 2},
+    ],
+}
+
+INCREMENTAL_REFRESH = {
+    'MsgType': 'X',
+    'MDIncGrp': [
+        {'MDUpdateAction': '0', 'MDEntryType': '0', 'MDEntryPositionNo': 1, 'MDEntryPx': 211000000000,
+         'MDEntrySize': 100000000, 'UserID': 4},
+        {'MDUpdateAction': '2', 'MDEntryType': '0', 'MDEntryPositionNo': 3},
+        {'MDUpdateAction': '1', 'MDEntryType': '1', 'MDEntryPositionNo': 1, 'MDEntryPx': 219000000000,
+         'MDEntrySize': 250000000, 'UserID': 2},
+        {'MDUpdateAction': '0', 'MDEntryType': '2', 'MDEntryPx': 215000000000, 'MDEntrySize': 100000000},
+    ],
+}
+
+SECURITY_STATUS = {
+    'MsgType': 'f', 'Market': 'BLINK', 'Symbol': 'BTCBRL', 'LastPx': 215000000000, 'HighPx': 250000000000,
+    'LowPx': 200000000000, 'BestBid': 210000000000, 'BestAsk': 220000000000, 'SellVolume': 10000000000,
+    'BuyVolume': 2500000000000,
+}
+
+
+class StandInGateway(object):
+    """
+    Local WebSocket server answering subscriptions and logins as the BlinkTrade gateway does.
+    """
+    def __init__(self, drop_first_connection=False, login_status=consts.UserStatus.LOGGED_IN):
+        self.drop_first_connection = drop_first_connection
+        self.login_status = login_status
+        self.received = []
+        self.connections = 0
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/trade/', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.url = 'http://127.0.0.1:{}/trade/'.format(port)
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def handle(self, request):
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self.connections += 1
+        async for message in websocket:
+            msg = json.loads(message.data)
+            self.received.append(msg)
+            for reply in self.get_replies(msg):
+                await websocket.send_str(json.dumps(reply))
+            if self.drop_first_connection and self.connections == 1 and msg['MsgType'] == 'V':
+                await websocket.close()
+        return websocket
+
+    def get_replies(self, msg):
+        if msg['MsgType'] == consts.MessageType.LOGIN:
+            yield {'MsgType': 'BF', 'UserReqID': msg['UserReqID'], 'UserStatus': self.login_status}
+            if self.login_status == consts.UserStatus.LOGGED_IN:
+                for reply in fixtures.make_order_response()['Responses']:
+                    yield reply
+        elif msg['MsgType'] == consts.MessageType.MARKET_DATA_REQUEST:
+            yield dict(FULL_REFRESH, MDReqID=msg['MDReqID'])
+            yield INCREMENTAL_REFRESH
+        elif msg['MsgType'] == consts.MessageType.SECURITY_STATUS_REQUEST:
+            yield dict(SECURITY_STATUS, SecurityStatusReqID=msg['SecurityStatusReqID'])
+
+
+def make_client():
+    return clients.AuthClient(
+        consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+        order_cache=orders.OpenOrderCache(), balance_cache=balances.BalanceCache(),
+    )
+
+
+@skipIf(web is None, 'aiohttp is not installed')
+class StreamingClientTestCase(TestCase):
+    def _stream(self, gateway, count, **kwargs):
+        client = kwargs.pop('client', None) or make_client()
+
+        async def main():
+            await gateway.start()
+            stream = StreamingClient(client, url=gateway.url, reconnect_delay=0.01, **kwargs)
+            try:
+                await stream.subscribe_ticker()
+                await stream.subscribe_order_book()
+                updates = []
+                async with stream:
+                    async for update in stream:
+                        updates.append(update)
+                        if len(updates) == count:
+                            break
+                return stream, updates
+            finally:
+                await gateway.stop()
+
+        return run(main())
+
+    def test_it_streams_the_ticker_and_the_order_book(self):
+        stream, updates = self._stream(StandInGateway(), 3, client=clients.OpenClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT,
+        ))
+        self.assertEqual([update.kind for update in updates], [
+            StreamUpdate.TICKER, StreamUpdate.ORDER_BOOK, StreamUpdate.ORDER_BOOK,
+        ])
+        self.assertEqual(updates[0].data, {
+            'pair': 'BTCBRL', 'last': 2150.0, 'high': 2500.0, 'low': 2000.0, 'buy': 2100.0, 'sell': 2200.0,
+            'vol': 100.0, 'vol_brl': 25000.0,
+        })
+        self.assertEqual(stream.order_book, {
+            'pair': 'BTCBRL',
+            'bids': [[2110.0, 1.0, 4], [2100.0, 1.5, 1]],
+            'asks': [[2190.0, 2.5, 2]],
+        })
+
+    def test_it_streams_execution_reports_into_the_client_caches(self):
+        client = make_client()
+        client.balance_cache.update({'BRL': 1.0, 'BRL_locked': 0.0})
+        gateway = StandInGateway()
+        stream, updates = self._stream(gateway, 5, client=client, username='key', password='secret')
+        self.assertEqual(gateway.received[0]['MsgType'], consts.MessageType.LOGIN)
+        self.assertEqual(gateway.received[0]['Username'], 'key')
+        self.assertEqual(gateway.received[0]['BrokerID'], 4)
+        kinds = [update.kind for update in updates]
+        self.assertIn(StreamUpdate.EXECUTION_REPORT, kinds)
+        self.assertIn(StreamUpdate.BALANCE, kinds)
+        report = updates[kinds.index(StreamUpdate.EXECUTION_REPORT)].data
+        self.assertEqual(report['Price'], 2175.0)
+        self.assertIs(client.order_cache.get(report['ClOrdID']), report)
+        self.assertEqual(client.get_balance(), {'BRL': 1.0, 'BRL_locked': 55.0})
+
+    def test_it_reconnects_and_resubscribes(self):
+        gateway = StandInGateway(drop_first_connection=True)
+        stream, updates = self._stream(gateway, 5)
+        self.assertEqual(gateway.connections, 2)
+        self.assertEqual(stream.connections, 2)
+        self.assertEqual([msg['MsgType'] for msg in gateway.received], ['e', 'V', 'e', 'V'])
+
+    def test_it_reconnects_when_a_heartbeat_fails(self):
+        gateway = StandInGateway()
+
+        class FailingHeartbeatStream(StreamingClient):
+            heartbeat_failures = 1
+
+            async def _send(self, websocket, msg):
+                if msg['MsgType'] == consts.MessageType.HEARTBEAT and self.heartbeat_failures:
+                    self.heartbeat_failures -= 1
+                    raise ConnectionResetError('heartbeat failed')
+                await websocket.send_str(json.dumps(msg))
+
+        async def main():
+            await gateway.start()
+            stream = FailingHeartbeatStream(make_client(), url=gateway.url, heartbeat_interval=0.05,
+                                            reconnect_delay=0.01)
+            try:
+                await stream.subscribe_ticker()
+                async with stream:
+                    while gateway.connections < 2 or len(gateway.received) < 2:
+                        await asyncio.sleep(0.01)
+                return stream
+            finally:
+                await gateway.stop()
+
+        with self.assertLogs('blinktrade.streaming', logging.WARNING) as logs:
+            stream = run(asyncio.wait_for(main(), 5))
+        self.assertEqual(stream.connections, 2)
+        self.assertIn('heartbeat failed', logs.output[0])
+        self.assertEqual([msg['MsgType'] for msg in gateway.received], ['e', 'e'])
+
+    def test_it_calls_callbacks(self):
+        received = []
+
+        async def on_order_book(order_book):
+            received.append(len(order_book['bids']))
+
+        client = make_client()
+        stream = StreamingClient(client, url='http://unused')
+        stream.add_callback(StreamUpdate.TICKER, received.append)
+        stream.add_callback(StreamUpdate.ORDER_BOOK, on_order_book)
+
+        async def main():
+            stream._queue = asyncio.Queue(1)
+            await stream._dispatch(dict(SECURITY_STATUS))
+            await stream._dispatch(dict(FULL_REFRESH))
+            await stream._dispatch({'MsgType': 'unknown'})
+
+        run(main())
+        self.assertEqual(received[0]['last'], 2150.0)
+        self.assertEqual(received[1], 2)
+        self.assertEqual(stream.dropped, 1)
+
+    def test_it_keeps_streaming_when_a_callback_fails(self):
+        received = []
+
+        async def fail(ticker):
+            raise ValueError('callback failed')
+
+        stream = StreamingClient(make_client(), url='http://unused')
+        stream.add_callback(StreamUpdate.TICKER, fail)
+        stream.add_callback(StreamUpdate.TICKER, received.append)
+
+        async def main():
+            stream._queue = asyncio.Queue()
+            await stream._dispatch(dict(SECURITY_STATUS))
+            await stream._dispatch(dict(SECURITY_STATUS))
+            return stream._queue.qsize()
+
+        with self.assertLogs('blinktrade.streaming', logging.ERROR) as logs:
+            self.assertEqual(run(main()), 2)
+        self.assertEqual(len(received), 2)
+        self.assertEqual(len(logs.records), 2)
+
+    def test_it_raises_rejected_logins(self):
+        gateway = StandInGateway(login_status=consts.UserStatus.INVALID_PASSWORD)
+        with self.assertRaises(exceptions.StreamLoginRejectedException):
+            self._stream(gateway, 10, username='key', password='wrong')
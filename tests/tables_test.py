@@ -0,0 +1,85 @@
+from unittest import TestCase
+
+import mock
+
+from blinktrade import clients, consts, tables
+from blinktrade.async_clients import AsyncAuthClient
+from tests.async_clients_test import FakeAsyncTransport, run
+
+COLUMNS = [u'ClOrdID', u'OrderID', u'OrdStatus', u'LeavesQty', u'OrderQty', u'Price', u'AvgPx']
+RESPONSE = {
+    u'Status': 200,
+    u'Responses': [{
+        u'MsgType': u'U5',
+        u'Page': 0,
+        u'PageSize': 20,
+        u'Columns': COLUMNS,
+        u'OrdListGrp': [
+            [u'2961106', 1459144231834, u'0', 3130000, 3130000, 217500000000, 0],
+            [u'2961107', 1459144231835, u'1', 1000000, 3000000, 220000000000, 219000000000],
+        ],
+    }],
+}
+
+
+class OrderTableTestCase(TestCase):
+    def setUp(self):
+        self.table = tables.OrderTable.from_order_status_responses(
+            RESPONSE['Responses'], clients.AuthClient.SATOSHI_COLUMNS,
+        )
+
+    def test_it_stores_the_orders_by_column(self):
+        self.assertEqual(len(self.table), 2)
+        self.assertEqual(self.table.columns, COLUMNS)
+        self.assertEqual(list(self.table['ClOrdID']), [u'2961106', u'2961107'])
+        self.assertEqual(list(self.table.get_column('Price')), [2175.0, 2200.0])
+
+    def test_it_returns_rows_as_dict_views(self):
+        row = self.table[-1]
+        self.assertIsInstance(row, tables.OrderRow)
+        self.assertEqual(row['LeavesQty'], 0.01)
+        self.assertIsInstance(row['LeavesQty'], float)
+        self.assertEqual(row.get('Missing', 'default'), 'default')
+        self.assertRaises(IndexError, self.table.__getitem__, 2)
+
+    def test_it_matches_the_list_of_dicts(self):
+        client = clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+        )
+        expected = client._parse_order_response({u'Responses': [dict(RESPONSE['Responses'][0])]})
+        self.assertEqual(self.table.to_dicts(), expected)
+        self.assertEqual([row for row in self.table], expected)
+
+    def test_it_keeps_none_values_without_numpy(self):
+        response = {u'Columns': [u'Price'], u'OrdListGrp': [[None], [100000000]]}
+        with mock.patch('blinktrade.tables.numpy', None):
+            table = tables.OrderTable.from_order_status_responses([response], [u'Price'])
+        self.assertEqual(table['Price'], [None, 1.0])
+
+    def test_it_merges_responses_with_different_columns(self):
+        responses = [
+            {u'Columns': [u'ClOrdID'], u'OrdListGrp': [[u'1']]},
+            {u'Columns': [u'ClOrdID', u'Price'], u'OrdListGrp': [[u'2', 100000000]]},
+        ]
+        table = tables.OrderTable.from_order_status_responses(responses, [u'Price'])
+        self.assertEqual(table.to_dicts(), [{u'ClOrdID': u'1', u'Price': None}, {u'ClOrdID': u'2', u'Price': 1.0}])
+
+
+class AuthClientOrderTableTestCase(TestCase):
+    @mock.patch('blinktrade.clients.AuthClient._send_request', return_value=RESPONSE)
+    def test_it_gets_pending_orders_as_a_table(self, _):
+        client = clients.AuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+        )
+        table = client.get_pending_orders(as_table=True)
+        self.assertIsInstance(table, tables.OrderTable)
+        self.assertEqual(table[0]['Price'], 2175.0)
+        self.assertIsInstance(client.get_pending_orders(), list)
+
+    def test_it_gets_executed_orders_as_a_table_with_the_async_client(self):
+        client = AsyncAuthClient(
+            consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT, 'key', 'secret',
+            transport=FakeAsyncTransport(RESPONSE),
+        )
+        table = run(client.get_executed_orders(as_table=True))
+        self.assertEqual(list(table['OrderQty']), [0.0313, 0.03])
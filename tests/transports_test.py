@@ -0,0 +1,73 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import TestCase
+
+import mock
+import requests
+from requests.adapters import HTTPAdapter
+
+from blinktrade import clients, consts, transports
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    connections = set()
+
+    def do_GET(self):
+        self.connections.add(self.client_address)
+        body = json.dumps({'pair': 'BTCBRL', 'last': 2150.0}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpTransportTestCase(TestCase):
+    def test_it_mounts_a_pooled_adapter(self):
+        transport = transports.HttpTransport(pool_size=25)
+        adapter = transport.session.get_adapter('https://api.blinktrade.com')
+        self.assertEqual(adapter._pool_connections, 25)
+        self.assertEqual(adapter._pool_maxsize, 25)
+
+    def test_it_keeps_the_adapters_of_a_given_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(max_retries=3)
+        session.mount('https://', adapter)
+        transport = transports.HttpTransport(pool_size=25, session=session)
+        self.assertIs(transport.session.get_adapter('https://api.blinktrade.com'), adapter)
+
+    def test_it_applies_default_timeouts(self):
+        session = mock.MagicMock()
+        transport = transports.HttpTransport(connect_timeout=1, read_timeout=2, session=session)
+        transport.get('https://api.blinktrade.com')
+        transport.post('https://api.blinktrade.com', json={})
+        self.assertEqual(session.get.call_args[1]['timeout'], (1, 2))
+        self.assertEqual(session.post.call_args[1]['timeout'], (1, 2))
+
+    def test_it_returns_the_same_shared_transport(self):
+        self.assertIs(transports.get_shared_transport(), transports.get_shared_transport())
+
+    def test_it_reuses_connections_against_a_local_server(self):
+        StandInHandler.connections = set()
+        server = HTTPServer(('127.0.0.1', 0), StandInHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            with transports.HttpTransport(pool_size=1) as transport:
+                client = clients.OpenClient(
+                    consts.Environment.PRODUCTION, consts.Currency.BRAZILIAN_REAIS, consts.Broker.FOXBIT,
+                    transport=transport,
+                )
+                client.environment_server = 'http://127.0.0.1:{}'.format(server.server_address[1])
+                for _ in range(5):
+                    self.assertEqual(client.get_ticker()['pair'], 'BTCBRL')
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(len(StandInHandler.connections), 1)